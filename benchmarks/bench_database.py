@@ -0,0 +1,68 @@
+"""
+Benchmark DatabaseClient load time and get_by_company_name lookup latency, from the
+CSV and from a compiled snapshot.
+
+Usage:
+    python -m benchmarks.bench_database [ROWS ...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.synthetic import generate_database_csv
+from src.database import DatabaseClient
+from src.snapshot import compile_snapshot
+
+DEFAULT_ROW_COUNTS = [10_000, 100_000, 1_000_000]
+LOOKUPS = 100_000
+
+
+def time_client(label: str, rows: int, load, queries: List[str]) -> None:
+    start = time.perf_counter()
+    client = load()
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        client.get_by_company_name(query)
+    lookup_ns = (time.perf_counter() - start) / len(queries) * 1e9
+
+    print(
+        f"{label:<8} rows={rows:>9,}  load={load_seconds:7.2f}s  "
+        f"lookup={lookup_ns:7.0f}ns/op"
+    )
+
+
+def bench(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "database.csv")
+        snapshot_path = os.path.join(tmp, "database.snap")
+        names = [
+            company["Company Name"] for company in generate_database_csv(path, rows)
+        ]
+        compile_snapshot(path, snapshot_path)
+
+        # Mix of exact, differently-cased and padded names, like real callers send
+        queries = [
+            random.choice((str.lower, str.upper, lambda n: f" {n} "))(
+                random.choice(names)
+            )
+            for _ in range(LOOKUPS)
+        ]
+        time_client("csv", rows, lambda: DatabaseClient(path), queries)
+        time_client(
+            "snapshot",
+            rows,
+            lambda: DatabaseClient(path, snapshot_file=snapshot_path),
+            queries,
+        )
+
+
+if __name__ == "__main__":
+    row_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROW_COUNTS
+    for row_count in row_counts:
+        bench(row_count)
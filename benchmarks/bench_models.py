@@ -0,0 +1,45 @@
+"""
+Benchmark building Company objects through the validating constructor against the
+fast paths that validate once and skip re-validation.
+
+Usage:
+    python -m benchmarks.bench_models [ROWS]
+"""
+
+import sys
+import time
+from typing import Callable
+
+from src.models import Company, parse_csv_record
+from src.pdf_service import PdfService
+
+DEFAULT_ROWS = 100_000
+
+
+def report(label: str, rows: int, build: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / rows * 1e6:8.2f}us/company")
+
+
+def bench(rows: int) -> None:
+    record = PdfService("TEST_KEY").extract("/home/coderpad/data/healthinc.pdf")
+    csv_rows = [{key: str(value) for key, value in record.items()} for _ in range(rows)]
+    records = [parse_csv_record(row) for row in csv_rows]
+
+    print(f"rows={rows:,}")
+    report("Company(csv_data)", rows, lambda: [Company(row) for row in csv_rows])
+    report(
+        "Company.from_csv", rows, lambda: [Company.from_csv(row) for row in csv_rows]
+    )
+    report("Company.validate_many", rows, lambda: Company.validate_many(csv_rows))
+    report(
+        "Company.from_record",
+        rows,
+        lambda: [Company.from_record(record) for record in records],
+    )
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS)
@@ -0,0 +1,82 @@
+"""
+Benchmark building a NameIndex and resolving misspelt names against it.
+
+Usage:
+    python -m benchmarks.bench_name_index [NAMES ...]
+"""
+
+import random
+import sys
+import time
+from typing import List, Set
+
+from src.name_index import NameIndex
+
+DEFAULT_NAME_COUNTS = [10_000, 100_000, 1_000_000]
+QUERIES = 2_000
+
+CONSONANTS = "bcdfghjklmnprstvwxyz"
+VOWELS = "aeiou"
+SUFFIXES = ["Inc", "LLC", "Co", "Corp", "Ltd", "Group", "Holdings", "Partners"]
+
+
+def made_up_word(rng: random.Random) -> str:
+    syllables = (
+        rng.choice(CONSONANTS) + rng.choice(VOWELS) + rng.choice(["", *CONSONANTS])
+        for _ in range(rng.randint(2, 3))
+    )
+    return "".join(syllables).title()
+
+
+def company_names(count: int, rng: random.Random) -> List[str]:
+    """
+    Make up distinct company names of two pronounceable words and a suffix, e.g.
+    "Bexolu Tirana LLC".
+    """
+    names: Set[str] = set()
+    while len(names) < count:
+        names.add(f"{made_up_word(rng)} {made_up_word(rng)} {rng.choice(SUFFIXES)}")
+    return sorted(names)
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    i = rng.randrange(len(name))
+    return rng.choice(
+        (
+            name[:i] + name[i + 1 :],  # dropped letter
+            name[:i] + name[i] + name[i:],  # doubled letter
+            name.lower(),  # different case
+            f"{name[:i]} {name[i:]}.",  # punctuation
+        )
+    )
+
+
+def bench(count: int) -> None:
+    rng = random.Random(0)
+    names = company_names(count, rng)
+    queries = [misspell(rng.choice(names), rng) for _ in range(QUERIES)]
+
+    start = time.perf_counter()
+    index = NameIndex(names)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = sum(index.best_match(query) is not None for query in queries)
+    lookup_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    start = time.perf_counter()
+    for query in queries:
+        index.top_k(query, k=5)
+    top_k_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    print(
+        f"names={count:>9,}  build={build_seconds:6.2f}s  "
+        f"best_match={lookup_us:8.0f}us/op  top_5={top_k_us:8.0f}us/op  "
+        f"resolved={found / len(queries):.0%}"
+    )
+
+
+if __name__ == "__main__":
+    name_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_NAME_COUNTS
+    for name_count in name_counts:
+        bench(name_count)
@@ -0,0 +1,316 @@
+"""
+Load test /compare against a PDF service stand-in with realistic latency and
+failures, to size worker counts and thread pools.
+
+The app is driven in-process through its ASGI interface, or over localhost with
+`--transport http`, by `--concurrency` clients sending `--requests` requests in
+all. Its PDF service is swapped through `get_pdf_service` for synthetic companies
+behind a `LatencyPdfService`, so every extraction takes a latency drawn from
+`--latency` and `--error-rate` of them fail.
+
+Latencies are given as seconds ("0.5"), "uniform:LOW:HIGH" or
+"lognormal:MEDIAN:SIGMA", e.g. "lognormal:0.8:0.6" for mostly sub-second calls
+with a tail past 5 seconds.
+
+Usage:
+    python -m benchmarks.loadtest [--transport asgi|http] [--concurrency N]
+        [--requests N] [--latency SPEC] [--error-rate R] [--threads N]
+        [--timeout S] [--hedge-after S] [--cache] [--out loadtest.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.run import git_commit
+from benchmarks.synthetic import SyntheticPdfService, generate_database_csv
+
+# The app reads its key at import time; the stand-in service doesn't check it
+os.environ.setdefault("API_KEY", "TEST_KEY")
+
+import httpx  # noqa: E402
+
+from src.async_pdf_service import AsyncPdfService  # noqa: E402
+from src.database import DatabaseClient  # noqa: E402
+from src.fake_pdf_service import (  # noqa: E402
+    LatencyPdfService,
+    lognormal_latency,
+    uniform_latency,
+)
+from src.main import (  # noqa: E402
+    PDF_HEDGE_AFTER,
+    PDF_TIMEOUT,
+    app,
+    get_async_pdf_service,
+    get_db_client,
+    get_pdf_service,
+    get_response_cache,
+)
+from src.pdf_cache import CachedPdfService  # noqa: E402
+from src.reconciliation import pdf_name  # noqa: E402
+from src.response_cache import ResponseCache  # noqa: E402
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    Parse a latency distribution, e.g. "0.2", "uniform:0.2:5" or "lognormal:0.8:0.6".
+
+    Attributes:
+        spec (str): the distribution and its parameters, in seconds.
+        rng (Random): the source of randomness.
+    """
+    kind, _, parameters = spec.partition(":")
+    try:
+        if not parameters:
+            seconds = float(kind)
+            return lambda: seconds
+        values = [float(value) for value in parameters.split(":")]
+        if kind == "uniform" and len(values) == 2:
+            return uniform_latency(*values, rng=rng)
+        if kind == "lognormal" and len(values) == 2:
+            return lognormal_latency(*values, rng=rng)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"Invalid latency {spec!r}")
+
+
+def percentile(samples: Sequence[float], p: float) -> float:
+    """
+    The nearest-rank percentile of some samples.
+
+    Attributes:
+        samples (Sequence): the samples, sorted.
+        p (float): the percentile, from 0 to 100.
+    """
+    if not samples:
+        return 0.0
+    return samples[max(0, math.ceil(p / 100 * len(samples)) - 1)]
+
+
+async def drive(
+    client: httpx.AsyncClient, paths: List[str], concurrency: int
+) -> List[Tuple[float, int]]:
+    """
+    Send requests from a number of concurrent clients, returning the latency and
+    status of each, with 0 for requests that got no response.
+
+    Attributes:
+        client (AsyncClient): the client to send the requests with.
+        paths (list): the paths to request, in order.
+        concurrency (int): the number of requests in flight at once.
+    """
+    pending = iter(paths)
+    samples: List[Tuple[float, int]] = []
+
+    async def worker() -> None:
+        for path in pending:
+            start = time.perf_counter()
+            try:
+                status = (await client.get(path)).status_code
+            except httpx.HTTPError:
+                status = 0
+            samples.append((time.perf_counter() - start, status))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+class _Server:
+    """
+    The app served by uvicorn over localhost from a background thread.
+    """
+
+    def __init__(self) -> None:
+        import uvicorn
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> str:
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("The server failed to start")
+            time.sleep(0.01)
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+
+def run(
+    transport: str,
+    concurrency: int,
+    requests: int,
+    rows: int,
+    latency: str,
+    error_rate: float,
+    threads: int,
+    timeout: Optional[float],
+    hedge_after: Optional[float],
+    cache: bool,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(threads) as pool:
+        csv_file = os.path.join(tmp, "database.csv")
+        companies = generate_database_csv(csv_file, rows, seed=seed)
+        db_client = DatabaseClient(csv_file)
+        stand_in = LatencyPdfService(
+            SyntheticPdfService(companies, mismatch_rate=0.1, seed=seed),
+            latency=parse_latency(latency, rng),
+            error_rate=error_rate,
+            rng=rng,
+        )
+        # Without the caches every request reaches the stand-in, as for new PDFs
+        pdf_service: Any = CachedPdfService(stand_in) if cache else stand_in
+        response_cache = ResponseCache(max_entries=1024 if cache else 0)
+        async_pdf_service = AsyncPdfService(
+            pdf_service, timeout=timeout, hedge_after=hedge_after, executor=pool
+        )
+
+        names = [rng.choice(companies)["Company Name"] for _ in range(requests)]
+        paths = [
+            str(httpx.URL("/compare", params={"company_name": n, "pdf": pdf_name(n)}))
+            for n in names
+        ]
+
+        app.dependency_overrides[get_db_client] = lambda: db_client
+        app.dependency_overrides[get_pdf_service] = lambda: pdf_service
+        app.dependency_overrides[get_async_pdf_service] = lambda: async_pdf_service
+        app.dependency_overrides[get_response_cache] = lambda: response_cache
+        try:
+            limits = httpx.Limits(max_connections=concurrency)
+            if transport == "http":
+                with _Server() as base_url:
+                    client = httpx.AsyncClient(
+                        base_url=base_url, limits=limits, timeout=None
+                    )
+                    samples, seconds = _timed(client, paths, concurrency)
+            else:
+                client = httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app, raise_app_exceptions=False),
+                    base_url="http://loadtest",
+                    limits=limits,
+                    timeout=None,
+                )
+                samples, seconds = _timed(client, paths, concurrency)
+        finally:
+            app.dependency_overrides.clear()
+
+    latencies = sorted(latency for latency, _ in samples)
+    statuses: Dict[str, int] = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(1 for _, status in samples if not 200 <= status < 400)
+    return {
+        "commit": git_commit(),
+        "parameters": {
+            "transport": transport,
+            "concurrency": concurrency,
+            "requests": requests,
+            "rows": rows,
+            "latency": latency,
+            "error_rate": error_rate,
+            "threads": threads,
+            "timeout": timeout,
+            "hedge_after": hedge_after,
+            "cache": cache,
+        },
+        "results": {
+            "seconds": round(seconds, 3),
+            "throughput_rps": round(len(samples) / seconds, 2),
+            "latency_ms": {
+                name: round(percentile(latencies, p) * 1000, 2)
+                for name, p in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+            },
+            "error_rate": round(errors / max(len(samples), 1), 4),
+            "statuses": statuses,
+            "pdf_service_calls": stand_in.calls,
+            "hedges": async_pdf_service.hedges,
+            "coalesced": async_pdf_service.coalesced,
+        },
+    }
+
+
+def _timed(
+    client: httpx.AsyncClient, paths: List[str], concurrency: int
+) -> Tuple[List[Tuple[float, int]], float]:
+    async def main() -> List[Tuple[float, int]]:
+        async with client:
+            return await drive(client, paths, concurrency)
+
+    start = time.perf_counter()
+    samples = asyncio.run(main())
+    return samples, time.perf_counter() - start
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Load test /compare against a slow, unreliable PDF service."
+    )
+    parser.add_argument("--transport", choices=["asgi", "http"], default="asgi")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--latency", default="lognormal:0.5:0.6")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--threads", type=int, default=32, help="threads running extractions"
+    )
+    parser.add_argument("--timeout", type=float, default=PDF_TIMEOUT)
+    parser.add_argument("--hedge-after", type=float, default=PDF_HEDGE_AFTER)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="keep the extraction and response caches, which repeat requests hit",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--out", help="where to write the JSON results (default stdout)"
+    )
+    args = parser.parse_args(argv)
+    try:
+        parse_latency(args.latency, random.Random())
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    results = run(
+        args.transport,
+        args.concurrency,
+        args.requests,
+        args.rows,
+        args.latency,
+        args.error_rate,
+        args.threads,
+        args.timeout,
+        args.hedge_after,
+        args.cache,
+        args.seed,
+    )
+    output = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Time each stage of the compare pipeline on synthetic data and write the results as
+JSON, so runs can be diffed between commits.
+
+Usage:
+    python -m benchmarks.run [--rows N] [--missing-columns CEO ...]
+        [--mismatch-rate R] [--requests N] [--out bench_output.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic import SyntheticPdfService, generate_database_csv
+
+# The app reads its key at import time; the synthetic service doesn't check it
+os.environ.setdefault("API_KEY", "TEST_KEY")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.database import DatabaseClient  # noqa: E402
+from src.main import app, get_db_client, get_pdf_service  # noqa: E402
+from src.models import Company  # noqa: E402
+from src.reconciliation import pdf_name, pdf_path  # noqa: E402
+
+
+def time_stage(operations: int, run: Callable[[], Any]) -> Dict[str, float]:
+    """
+    Time a stage that performs a number of operations.
+
+    Attributes:
+        operations (int): how many operations `run` performs, for the per-op figure.
+        run (Callable): the stage to time.
+    """
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    return {
+        "operations": operations,
+        "seconds": round(seconds, 6),
+        "us_per_op": round(seconds / max(operations, 1) * 1e6, 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    rows: int, missing_columns: List[str], mismatch_rate: float, requests: int
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = os.path.join(tmp, "database.csv")
+        companies = generate_database_csv(csv_file, rows, missing_columns)
+        pdf_service = SyntheticPdfService(companies, mismatch_rate=mismatch_rate)
+        rng = random.Random(0)
+        names = [rng.choice(companies)["Company Name"] for _ in range(requests)]
+
+        stages: Dict[str, Dict[str, float]] = {}
+        clients: List[DatabaseClient] = []
+        stages["load"] = time_stage(
+            rows, lambda: clients.append(DatabaseClient(csv_file))
+        )
+        db_client = clients[0]
+
+        stages["lookup"] = time_stage(
+            len(names),
+            lambda: [db_client.get_by_company_name(name) for name in names],
+        )
+        extracted = [pdf_service.extract(pdf_path(pdf_name(name))) for name in names]
+        current: List[Company] = []
+        new: List[Company] = []
+
+        def build() -> None:
+            current.extend(db_client.get_company(name) for name in names)
+            new.extend(Company.from_csv(record) for record in extracted)
+
+        stages["model_build"] = time_stage(2 * len(names), build)
+        stages["compare"] = time_stage(
+            len(names), lambda: [a.compare(b) for a, b in zip(current, new)]
+        )
+
+        app.dependency_overrides[get_db_client] = lambda: db_client
+        app.dependency_overrides[get_pdf_service] = lambda: pdf_service
+        try:
+            client = TestClient(app)
+
+            def end_to_end() -> None:
+                for name in names:
+                    response = client.get(
+                        "/compare", params={"company_name": name, "pdf": pdf_name(name)}
+                    )
+                    response.raise_for_status()
+
+            stages["end_to_end"] = time_stage(len(names), end_to_end)
+        finally:
+            app.dependency_overrides.clear()
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "parameters": {
+            "rows": rows,
+            "missing_columns": missing_columns,
+            "mismatch_rate": mismatch_rate,
+            "requests": requests,
+        },
+        "stages": stages,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Time each stage of the compare pipeline on synthetic data."
+    )
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--missing-columns", nargs="*", default=["CEO"])
+    parser.add_argument("--mismatch-rate", type=float, default=0.1)
+    parser.add_argument("--requests", type=int, default=1_000)
+    parser.add_argument(
+        "--out", help="where to write the JSON results (default stdout)"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.missing_columns, args.mismatch_rate, args.requests)
+    output = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
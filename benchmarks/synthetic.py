@@ -0,0 +1,129 @@
+"""
+Synthetic company data for benchmarks: a `database.csv` generator and a fake
+PdfService that returns the matching extracted records.
+"""
+
+import csv
+import os
+import random
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.constants import CSV_TO_COMPANY_FIELD_MAPPING
+from src.models import Company
+from src.reconciliation import pdf_name
+
+# Every column the real database and PDFs use, including ones outside the Company model
+COLUMNS = list(CSV_TO_COMPANY_FIELD_MAPPING) + ["Net Income Margin (%)"]
+
+INDUSTRIES = ["Technology", "Healthcare", "Retail", "Financial Services", "Energy"]
+LOCATIONS = ["San Francisco", "New York", "Chicago", "Boston", "Austin"]
+CEOS = ["Jane Smith", "Bob Johnson", "Alice Brown", "John Doe"]
+
+
+def _column_type(column: str) -> Any:
+    field = CSV_TO_COMPANY_FIELD_MAPPING.get(column)
+    return Company.model_fields[field].annotation if field else float
+
+
+def synthetic_company(i: int, rng: random.Random) -> Dict[str, Any]:
+    """
+    Make up the data of one company, with typed values as the PDF service returns.
+
+    Attributes:
+        i (int): the number of the company, used in its name.
+        rng (Random): the source of randomness.
+    """
+    company: Dict[str, Any] = {}
+    for column in COLUMNS:
+        column_type = _column_type(column)
+        if column == "Company Name":
+            company[column] = f"Company{i}"
+        elif column == "Industry":
+            company[column] = rng.choice(INDUSTRIES)
+        elif column == "Location":
+            company[column] = rng.choice(LOCATIONS)
+        elif column == "CEO":
+            company[column] = rng.choice(CEOS)
+        elif column_type is int:
+            company[column] = rng.randint(1, 10_000)
+        else:
+            company[column] = round(rng.uniform(0, 100), 2)
+    return company
+
+
+def generate_database_csv(
+    path: str,
+    rows: int,
+    missing_columns: Iterable[str] = (),
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Write a `database.csv` of synthetic companies and return their data.
+
+    Attributes:
+        path (str): where to write the CSV file.
+        rows (int): the number of companies to generate.
+        missing_columns (Iterable): columns to leave out, e.g. "CEO".
+        seed (int): the seed for the generated values.
+    """
+    rng = random.Random(seed)
+    companies = [synthetic_company(i, rng) for i in range(rows)]
+    missing = set(missing_columns)
+    columns = [column for column in COLUMNS if column not in missing]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(companies)
+    return companies
+
+
+class SyntheticPdfService:
+    """
+    A fake PdfService with a PDF per synthetic company, named like "company12".
+
+    A `mismatch_rate` share of the records have one field changed from the database,
+    so comparisons find a realistic number of differences.
+    """
+
+    def __init__(
+        self,
+        companies: Iterable[Dict[str, Any]],
+        mismatch_rate: float = 0.0,
+        seed: Optional[int] = 0,
+    ) -> None:
+        """
+        Initialize the fake service.
+
+        Attributes:
+            companies (Iterable): the data of the companies, as returned by the generator.
+            mismatch_rate (float): the share of records that differ from the database.
+            seed (int): the seed for choosing and changing the mismatched records.
+        """
+        rng = random.Random(seed)
+        self.records: Dict[str, Dict[str, Any]] = {}
+        for company in companies:
+            record = dict(company)
+            if rng.random() < mismatch_rate:
+                column = rng.choice(COLUMNS[1:])
+                value = record[column]
+                record[column] = (
+                    f"{value} (restated)" if isinstance(value, str) else value + 1
+                )
+            self.records[pdf_name(company["Company Name"])] = record
+        return None
+
+    def extract(self, file_path: str) -> Dict[str, Any]:
+        """
+        Extract data from a synthetic PDF.
+
+        Attributes:
+            file_path (str): the path of the PDF file, named after its company.
+        """
+        name, _ = os.path.splitext(os.path.basename(file_path))
+        record = self.records.get(name)
+        if record is None:
+            raise FileNotFoundError("Cannot extract data. Invalid file provided.")
+        return dict(record)
@@ -0,0 +1,103 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Hashable, Optional
+
+from src.pdf_cache import PdfExtractor
+
+
+class AsyncPdfService:
+    """
+    An asyncio adapter around a blocking PDF service.
+
+    Extractions run in an executor so they don't block the event loop. Concurrent
+    requests for the same file share a single call to the service, each caller can
+    give up after `timeout` seconds without cancelling it for the others, and a
+    call still running after `hedge_after` seconds is raced against a second one.
+    """
+
+    def __init__(
+        self,
+        service: PdfExtractor,
+        timeout: Optional[float] = None,
+        hedge_after: Optional[float] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """
+        Initialize the adapter.
+
+        Attributes:
+            service (PdfExtractor): the blocking PDF service to call.
+            timeout (float): seconds a caller waits for an extraction, or None to wait forever.
+            hedge_after (float): seconds before a duplicate call is started, or None to never hedge.
+            executor (Executor): where blocking calls run, the loop's default executor if None.
+        """
+        self.service = service
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.executor = executor
+        self.coalesced = 0
+        self.hedges = 0
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        return None
+
+    async def extract(self, file_path: str) -> dict[str, Any]:
+        """
+        Extract data from a PDF without blocking the event loop.
+
+        Raises TimeoutError if the extraction takes longer than the timeout.
+
+        Attributes:
+            file_path (str): the path of the PDF file to extract data from.
+        """
+        loop = asyncio.get_running_loop()
+        # In-flight calls are per loop, as tasks can't be awaited from another loop
+        key = (loop, file_path)
+        task = self._inflight.get(key)
+        if task is None:
+            task = loop.create_task(self._extract(file_path))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        else:
+            self.coalesced += 1
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"PDF extraction timed out after {self.timeout} seconds"
+            ) from None
+        # Callers sharing a call each get their own copy
+        return dict(result)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the error as retrieved even if every caller already timed out
+            task.exception()
+
+    async def _extract(self, file_path: str) -> dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self.service.extract, file_path=file_path)
+        first = loop.run_in_executor(self.executor, call)
+        if self.hedge_after is None:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        self.hedges += 1
+        pending = {first, loop.run_in_executor(self.executor, call)}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = error or future.exception()
+        raise error
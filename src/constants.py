@@ -1,3 +1,12 @@
+# Path of the CSV file backing the DatabaseClient
+DATABASE_CSV_PATH = "data/database.csv"
+
+# Where the PDF service expects a named PDF to live
+PDF_PATH_TEMPLATE = "/home/coderpad/data/{pdf}.pdf"
+
+# Most company/PDF pairs one batch comparison may ask for
+MAX_BATCH_ITEMS = 1000
+
 # Mapping of CSV column names to Company model field names
 CSV_TO_COMPANY_FIELD_MAPPING = {
     "Company Name": "company_name",
@@ -19,5 +28,4 @@ CSV_TO_COMPANY_FIELD_MAPPING = {
     "Location": "location",
     "CEO": "ceo",
     "Number of Employees": "number_of_employees",
-    "Current Ratio": "current_ratio",
 }
@@ -1,35 +1,484 @@
 import csv
-from typing import Dict, List
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Union,
+)
+
+from src.layered_dict import LayeredDict
+from src.models import Company, CompanyRecord, parse_csv_record
+from src.name_index import DEFAULT_THRESHOLD, NameIndex, NameMatch
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_company_name(company_name: str) -> str:
+    """
+    Normalize a company name into the key used by the lookup index.
+
+    Attributes:
+        company_name (str): the name of a company as given by a caller or the CSV.
+    """
+    return company_name.strip().casefold()
+
+
+class CompanyDatabase(Protocol):
+    """
+    The interface of a company database backend, e.g. `DatabaseClient` or
+    `src.sqlite_database.SqliteDatabaseClient`.
+    """
+
+    @property
+    def version(self) -> str:
+        """
+        Changes whenever the data does, e.g. to build cache keys.
+        """
+        ...
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]: ...
+
+    def get_by_company_name(
+        self, company_name: str, fuzzy: bool = False
+    ) -> Dict[str, Any]: ...
+
+    def get_company(self, company_name: str, fuzzy: bool = False) -> Company: ...
+
+    def resolve(self, company_name: str, limit: int = 5) -> List[NameMatch]: ...
+
+
+@dataclass
+class _Table:
+    """
+    One consistent version of the data. Reloads build a new table and swap it in
+    whole, so a lookup that read `_table` once never sees a half-applied reload.
+    """
+
+    version: str
+    rows: Sequence[Dict[str, Any]]
+    # Rows by normalized company name; None when the rows are a snapshot. Reloads
+    # copy them on write, so only the entries that changed are copied.
+    index: Optional[MutableMapping[str, Dict[str, str]]] = None
+    # Invalid rows keep their error, raised when the company is asked for
+    records: MutableMapping[str, Union[CompanyRecord, ValueError]] = field(
+        default_factory=dict
+    )
+    snapshot: Optional[Any] = None
+    name_index: Optional[NameIndex] = None
+    # The CSV's header and data lines, so a reload only parses the lines that changed
+    header: Optional[str] = None
+    lines: List[str] = field(default_factory=list)
 
 
 class DatabaseClient:
     """
     A quick database client that loads a CSV file into a list.
     Mimics a database client that could be used in a production environment.
+
+    Rows are indexed by their normalized company name when the file is loaded,
+    so lookups are a single dictionary access rather than a scan of the file.
+    Each row is also validated into a compact Company record at load time, so
+    `get_company` doesn't validate it again on every request.
+
+    Given a snapshot compiled from the current CSV (see `src.snapshot`), the client
+    memory-maps it instead of parsing the CSV, and rows are decoded as they are read.
+
+    Lookups match names exactly, up to case and surrounding whitespace. Asked to,
+    they resolve other names through a fuzzy name index (see `src.name_index`), so
+    "Finance LLC" or "HealthInc." find their company, and `resolve` lists the
+    candidates with their scores. The index is built with the rows, or on first use
+    when reading a snapshot.
+
+    `reload` (or `watch`, to poll for changes) picks up edits to the CSV, parsing
+    only the lines that were added or changed. A client reading a snapshot waits
+    for the snapshot to be recompiled instead (see `src.serve`), so processes
+    sharing it don't each parse the CSV.
     """
 
-    def __init__(self, csv_file: str) -> None:
+    def __init__(
+        self,
+        csv_file: str,
+        snapshot_file: Optional[str] = None,
+        name_match_threshold: Optional[float] = DEFAULT_THRESHOLD,
+    ) -> None:
         """
         Initialize the database client with the path to the CSV file.
 
         Attributes:
             csv_file (str): the path to the CSV file.
+            snapshot_file (str): an optional snapshot of the CSV file to load instead.
+            name_match_threshold (float): the similarity a fuzzy name match needs,
+                or None to only match names exactly.
         """
-        self.data: List[Dict[str, str]] = []
-        with open(csv_file, newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                self.data.append(row)
+        self.csv_file = csv_file
+        self.snapshot_file = snapshot_file
+        self._name_match_threshold = name_match_threshold
+        self._name_index_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+        version = _file_version(csv_file)
+        snapshot = self._open_snapshot(snapshot_file, csv_file)
+        if snapshot is not None:
+            self._table = _Table(version=version, rows=snapshot, snapshot=snapshot)
+        else:
+            self._table = self._load(version)
         return None
 
-    def get_by_company_name(self, company_name: str) -> dict[str, str] | LookupError:
+    @property
+    def version(self) -> str:
+        """
+        Identifies the data loaded (the CSV's size and modification time), so caches
+        of derived results know when it changes.
+        """
+        return self._table.version
+
+    @property
+    def data(self) -> Sequence[Dict[str, Any]]:
+        """
+        Every company's data, in file order.
+        """
+        return self._table.rows
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        """
+        Iterate over every company's data, in file order.
+        """
+        return iter(self._table.rows)
+
+    def warm_up(self) -> None:
+        """
+        Build now what would otherwise be built on first use: the fuzzy name index
+        of a snapshot, built on the first fuzzy lookup. Rows read from the CSV are
+        indexed and validated into Company records as they are loaded.
+        """
+        self._get_name_index(self._table)
+
+    @staticmethod
+    def _open_snapshot(snapshot_file: Optional[str], csv_file: str) -> Optional[Any]:
+        if not snapshot_file:
+            return None
+        # Imported here, as the snapshot module itself builds on this one
+        from src.snapshot import Snapshot
+
+        try:
+            snapshot = Snapshot(snapshot_file)
+        except (OSError, ValueError) as e:
+            logger.warning("Not using snapshot %s: %s", snapshot_file, e)
+            return None
+        if not snapshot.is_fresh(csv_file):
+            logger.warning("Snapshot %s is stale, loading %s", snapshot_file, csv_file)
+            return None
+        return snapshot
+
+    def get_by_company_name(
+        self, company_name: str, fuzzy: bool = False
+    ) -> dict[str, str] | LookupError:
         """
         Get a company's data by its name.
 
         Attributes:
             company_name (str): the name of a company to search.
+            fuzzy (bool): whether a name not on file may match the most similar one.
         """
-        for row in self.data:
-            if row["Company Name"].lower() == company_name.lower():
-                return row
-        raise LookupError(f"Company {company_name} not found in the database")
+        table = self._table
+        row = self._row(table, normalize_company_name(company_name))
+        if row is None and fuzzy:
+            key = self._closest(table, company_name)
+            row = None if key is None else self._row(table, key)
+        if row is None:
+            raise LookupError(f"Company {company_name} not found in the database")
+        return row
+
+    def get_company(self, company_name: str, fuzzy: bool = False) -> Company:
+        """
+        Get a company's data by its name, as a Company.
+
+        Attributes:
+            company_name (str): the name of a company to search.
+            fuzzy (bool): whether a name not on file may match the most similar one.
+        """
+        table = self._table
+        if table.snapshot is not None:
+            i = table.snapshot.find(normalize_company_name(company_name))
+            if i is None and fuzzy:
+                key = self._closest(table, company_name)
+                i = None if key is None else table.snapshot.find(key)
+            if i is None:
+                raise LookupError(f"Company {company_name} not found in the database")
+            # Valid values were coerced when the snapshot was compiled, and cells
+            # that weren't kept as strings, so invalid rows raise as they do here
+            return Company.from_csv(table.snapshot.typed_row(i))
+        key = normalize_company_name(company_name)
+        if key not in table.records and fuzzy:
+            key = self._closest(table, company_name)
+        record = None if key is None else table.records.get(key)
+        if record is None:
+            raise LookupError(f"Company {company_name} not found in the database")
+        if isinstance(record, ValueError):
+            raise ValueError(str(record))
+        return Company.from_record(record)
+
+    def resolve(self, company_name: str, limit: int = 5) -> List[NameMatch]:
+        """
+        Get the companies a name may mean, as their names on file with a similarity
+        score from 0 to 1, most similar first. A name on file (up to case and
+        surrounding whitespace) only matches itself, with a score of 1.
+
+        Attributes:
+            company_name (str): the name to resolve.
+            limit (int): the most matches to return.
+        """
+        table = self._table
+        row = self._row(table, normalize_company_name(company_name))
+        if row is not None:
+            return [NameMatch(row["Company Name"], 1.0)]
+        name_index = self._get_name_index(table)
+        if name_index is None:
+            return []
+        matches = []
+        for key, score in name_index.top_k(company_name, limit):
+            row = self._row(table, key)
+            if row is not None:
+                matches.append(NameMatch(row["Company Name"], score))
+        return matches
+
+    def reload(self) -> bool:
+        """
+        Load the CSV again if its size or modification time has changed, returning
+        whether it had.
+
+        Only added and changed lines are parsed and validated, and the new data is
+        swapped in at once, so lookups see either the old data or the new. A client
+        reading a snapshot keeps it until a snapshot of the new CSV is compiled.
+        """
+        with self._reload_lock:
+            version = _file_version(self.csv_file)
+            old = self._table
+            if version == old.version:
+                return False
+            if old.snapshot is not None:
+                new = self._reload_snapshot()
+                if new is None:
+                    return False
+            else:
+                new = self._load(version, old)
+                if _file_version(self.csv_file) != version:
+                    # Written to while being read; the next reload reads it again
+                    logger.info("%s changed while reloading it", self.csv_file)
+                    return False
+            self._table = new
+        logger.info(
+            "Reloaded %s: %d rows, version %s", self.csv_file, len(new.rows), version
+        )
+        return True
+
+    def watch(self, interval: float) -> None:
+        """
+        Poll the CSV for changes in a background thread, reloading it when it does.
+
+        Attributes:
+            interval (float): the seconds between polls.
+        """
+        if self._watcher is not None:
+            return None
+        self._stop_watching.clear()
+
+        def poll() -> None:
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    # E.g. the file is mid-rewrite; the next poll tries again
+                    logger.warning("Could not reload %s: %s", self.csv_file, e)
+
+        self._watcher = threading.Thread(target=poll, daemon=True)
+        self._watcher.start()
+        return None
+
+    def stop_watching(self) -> None:
+        """
+        Stop polling the CSV for changes.
+        """
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _reload_snapshot(self) -> Optional[_Table]:
+        from src.snapshot import Snapshot
+
+        try:
+            snapshot = Snapshot(self.snapshot_file)
+        except (OSError, ValueError):
+            # E.g. not compiled yet; the next reload tries again
+            return None
+        if not snapshot.is_fresh(self.csv_file):
+            return None
+        version = f"{snapshot.source['size']}-{snapshot.source['mtime_ns']}"
+        return _Table(version=version, rows=snapshot, snapshot=snapshot)
+
+    def _load(self, version: str, old: Optional[_Table] = None) -> _Table:
+        with open(self.csv_file, newline="") as f:
+            text = f.read()
+        header, _, body = text.partition("\n")
+        header = header.rstrip("\r")
+        # Blank lines hold no row, as for csv.DictReader
+        lines = [line for line in body.splitlines() if line]
+        columns = next(csv.reader([header]), [])
+        check_columns(self.csv_file, columns)
+
+        # Lines seen in the old table are reused as they were; the others are parsed
+        reuse = old is not None and old.header == header and old.index is not None
+        known = dict(zip(old.lines, old.rows)) if reuse else {}
+        new_lines = [line for line in lines if line not in known] if reuse else lines
+        parsed = list(csv.reader(new_lines))
+        width = len(columns)
+        if len(parsed) != len(new_lines) or any(len(v) != width for v in parsed):
+            # Quoted line breaks or ragged rows: lines aren't rows, parse the file
+            return self._load_file(version)
+        new_rows = [dict(zip(columns, values)) for values in parsed]
+
+        if not reuse:
+            table = _Table(version=version, rows=new_rows, index={}, header=header)
+            table.lines = lines
+            self._index_rows(table, new_rows)
+            self._build_name_index(table)
+            return table
+        known.update(zip(new_lines, new_rows))
+        rows = [known[line] for line in lines]
+        return self._apply_changes(old, version, header, lines, rows)
+
+    def _load_file(self, version: str) -> _Table:
+        with open(self.csv_file, newline="") as f:
+            reader = csv.DictReader(f)
+            check_columns(self.csv_file, reader.fieldnames or [])
+            rows = list(reader)
+        table = _Table(version=version, rows=rows, index={})
+        self._index_rows(table, rows)
+        self._build_name_index(table)
+        return table
+
+    @staticmethod
+    def _index_rows(table: _Table, rows: Iterable[Dict[str, str]]) -> None:
+        for row in rows:
+            key = normalize_company_name(row["Company Name"])
+            # Keep the first row for a name, matching the old linear scan
+            if key in table.index:
+                continue
+            table.index[key] = row
+            try:
+                table.records[key] = parse_csv_record(row)
+            except ValueError as e:
+                table.records[key] = e
+
+    def _apply_changes(
+        self,
+        old: _Table,
+        version: str,
+        header: str,
+        lines: List[str],
+        rows: List[Dict[str, str]],
+    ) -> _Table:
+        old_lines, new_lines = set(old.lines), set(lines)
+        changed = {
+            normalize_company_name(row["Company Name"])
+            for line, row in zip(old.lines, old.rows)
+            if line not in new_lines
+        }
+        changed.update(
+            normalize_company_name(row["Company Name"])
+            for line, row in zip(lines, rows)
+            if line not in old_lines
+        )
+
+        table = _Table(
+            version=version,
+            rows=rows,
+            index=LayeredDict.layer(old.index),
+            records=LayeredDict.layer(old.records),
+            header=header,
+            lines=lines,
+        )
+        for key in changed:
+            table.index.pop(key, None)
+            table.records.pop(key, None)
+        # The first row of each changed name, now that rows may have moved
+        self._index_rows(
+            table,
+            (
+                row
+                for row in rows
+                if normalize_company_name(row["Company Name"]) in changed
+            ),
+        )
+
+        if old.name_index is not None:
+            table.name_index = old.name_index.copy()
+            for key in changed:
+                if key in table.index:
+                    table.name_index.add(key)
+                else:
+                    table.name_index.remove(key)
+        logger.debug("Reload changed %d companies", len(changed))
+        return table
+
+    def _build_name_index(self, table: _Table) -> None:
+        if self._name_match_threshold is not None:
+            table.name_index = NameIndex(table.index, self._name_match_threshold)
+
+    @staticmethod
+    def _row(table: _Table, key: str) -> Optional[Dict[str, Any]]:
+        if table.snapshot is not None:
+            i = table.snapshot.find(key)
+            return None if i is None else table.snapshot[i]
+        return table.index.get(key)
+
+    def _closest(self, table: _Table, company_name: str) -> Optional[str]:
+        # The index key of the name most similar to one that isn't on file
+        name_index = self._get_name_index(table)
+        return None if name_index is None else name_index.best_match(company_name)
+
+    def _get_name_index(self, table: _Table) -> Optional[NameIndex]:
+        if table.name_index is None and table.snapshot is not None:
+            if self._name_match_threshold is None:
+                return None
+            with self._name_index_lock:
+                if table.name_index is None:
+                    table.name_index = NameIndex(
+                        (
+                            normalize_company_name(row["Company Name"])
+                            for row in table.snapshot
+                        ),
+                        self._name_match_threshold,
+                    )
+        return table.name_index
+
+
+def check_columns(csv_file: str, columns: Sequence[str]) -> None:
+    """
+    Check the columns read from a CSV file's header hold the company name, so an
+    empty or truncated file, e.g. one being rewritten, doesn't replace the data.
+
+    Attributes:
+        csv_file (str): the path to the CSV file, for the error.
+        columns (Sequence): the columns of the file's header.
+    """
+    if "Company Name" not in columns:
+        raise ValueError(f"{csv_file} has no header with a Company Name column")
+
+
+def _file_version(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
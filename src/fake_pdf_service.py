@@ -0,0 +1,93 @@
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Optional, Union
+
+from src.pdf_cache import PdfExtractor
+
+
+def uniform_latency(
+    low: float, high: float, rng: Optional[random.Random] = None
+) -> Callable[[], float]:
+    """
+    Latencies spread evenly between two bounds, for `LatencyPdfService`.
+
+    Attributes:
+        low (float): the shortest latency, in seconds.
+        high (float): the longest latency, in seconds.
+        rng (Random): the source of randomness.
+    """
+    rng = rng or random.Random()
+    return lambda: rng.uniform(low, high)
+
+
+def lognormal_latency(
+    median: float, sigma: float, rng: Optional[random.Random] = None
+) -> Callable[[], float]:
+    """
+    Log-normally distributed latencies, for `LatencyPdfService`: most calls take
+    about the median, and a long tail take many times longer.
+
+    Attributes:
+        median (float): the median latency, in seconds.
+        sigma (float): the spread of the tail, e.g. 0.5 for a p99 about 3x the median.
+        rng (Random): the source of randomness.
+    """
+    rng = rng or random.Random()
+    mu = math.log(median)
+    return lambda: rng.lognormvariate(mu, sigma)
+
+
+class LatencyPdfService:
+    """
+    A local stand-in for the external PDF service that answers like the wrapped
+    service, but only after a configurable delay, and fails a share of its calls.
+
+    Used to exercise timeouts, coalescing and hedging without the real service, and
+    to load test the API (see `benchmarks.loadtest`).
+    """
+
+    def __init__(
+        self,
+        service: PdfExtractor,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        error_rate: float = 0.0,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        """
+        Initialize the stand-in service.
+
+        Attributes:
+            service (PdfExtractor): the service providing the extracted data.
+            latency (float | Callable): seconds to wait per call, or a function returning them.
+            error_rate (float): the share of calls that fail with a ConnectionError.
+            rng (Random): the source of randomness for choosing the failed calls.
+        """
+        self.service = service
+        self.latency = latency if callable(latency) else (lambda: latency)
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        return None
+
+    def extract(self, file_path: str) -> dict[str, Any]:
+        """
+        Extract data from a PDF after waiting for the configured latency.
+
+        Raises ConnectionError for the share of calls set by `error_rate`.
+
+        Attributes:
+            file_path (str): the path of the PDF file to extract data from.
+        """
+        with self._lock:
+            self.calls += 1
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        time.sleep(self.latency())
+        if failed:
+            raise ConnectionError("The PDF service failed to respond")
+        return self.service.extract(file_path=file_path)
@@ -0,0 +1,504 @@
+"""
+An append-only store of the Company records extracted each quarter, so questions
+like "whose EBITDA changed since 2025Q1?" are answered without extracting old PDFs
+again.
+
+Records are buffered per quarter and written out as immutable segments, one file
+per batch. A segment is columnar: the companies' keys and each Company field are
+a separate zlib-compressed JSON array, so a query reads only the columns it asks
+about. `manifest.json` lists the segments of each quarter, and a per-company index
+of where each company's latest record for a quarter lives is rebuilt from the key
+columns when the store is opened.
+
+Several processes may write to one store, e.g. the workers of `src.serve` and a
+`src.reconcile --history` run: segment names are unique to their writer, and the
+manifest is only updated under a file lock, merging in what others have added.
+Queries merge in segments others have added since, so each process answers from
+every segment written; records still buffered by another process are only seen
+once it writes them out, which `flush_every` does periodically.
+
+Query a store from the command line with:
+
+    python -m src.history data/history --since 2025Q1 [--until 2025Q4] [--fields ebitda_millions]
+"""
+
+import argparse
+import datetime
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+import sys
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.database import normalize_company_name
+from src.models import COMPANY_FIELDS, Company, CompanyRecord
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"COHIST01"
+MANIFEST = "manifest.json"
+# Held while the manifest is read, merged and rewritten
+MANIFEST_LOCK = "manifest.lock"
+
+_QUARTER = re.compile(r"^(\d{4})-?Q([1-4])$", re.IGNORECASE)
+# Columns of a segment besides the Company fields
+_KEY = "_key"
+_DIGEST = "_digest"
+
+
+def parse_quarter(quarter: str) -> str:
+    """
+    Validate a quarter such as "2025Q1" (or "2025-q1"), returning it as "2025Q1".
+
+    Attributes:
+        quarter (str): the quarter to validate.
+    """
+    match = _QUARTER.match(quarter.strip())
+    if match is None:
+        raise ValueError(f"Invalid quarter {quarter!r}, expected e.g. 2025Q1")
+    return f"{match.group(1)}Q{match.group(2)}"
+
+
+def current_quarter(today: Optional[datetime.date] = None) -> str:
+    """
+    Get the calendar quarter of a date, today by default.
+
+    Attributes:
+        today (date): the date.
+    """
+    today = today or datetime.date.today()
+    return f"{today.year}Q{(today.month - 1) // 3 + 1}"
+
+
+def _record_digest(record: CompanyRecord) -> str:
+    encoded = json.dumps(record, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def write_segment(
+    path: str, quarter: str, rows: Sequence[Tuple[str, CompanyRecord]]
+) -> None:
+    """
+    Write a segment of records for a quarter.
+
+    Attributes:
+        path (str): where to write the segment.
+        quarter (str): the quarter of the records.
+        rows (Sequence): (company key, record) pairs.
+    """
+    columns: Dict[str, List[Any]] = {
+        _KEY: [key for key, _ in rows],
+        _DIGEST: [_record_digest(record) for _, record in rows],
+    }
+    for i, field in enumerate(COMPANY_FIELDS):
+        columns[field] = [record[i] for _, record in rows]
+
+    blobs = bytearray()
+    offsets = {}
+    for name, values in columns.items():
+        blob = zlib.compress(json.dumps(values, separators=(",", ":")).encode())
+        offsets[name] = [len(blobs), len(blob)]
+        blobs += blob
+    header = json.dumps(
+        {"quarter": quarter, "rows": len(rows), "columns": offsets}
+    ).encode()
+
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(blobs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
+class Segment:
+    """
+    A segment file, whose columns are read and decompressed one at a time.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Read a segment's header.
+
+        Raises ValueError if the file isn't a segment.
+
+        Attributes:
+            path (str): the path of the segment file.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a history segment")
+            (header_length,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_length))
+        self.quarter: str = header["quarter"]
+        self.rows: int = header["rows"]
+        self._columns: Dict[str, List[int]] = header["columns"]
+        self._data_start = len(MAGIC) + 8 + header_length
+        return None
+
+    def column(self, name: str) -> List[Any]:
+        """
+        Read and decompress one column.
+
+        Attributes:
+            name (str): a Company field, or "_key" for the companies' keys.
+        """
+        offset, length = self._columns[name]
+        with open(self.path, "rb") as f:
+            f.seek(self._data_start + offset)
+            return json.loads(zlib.decompress(f.read(length)))
+
+
+class HistoryStore:
+    """
+    An append-only store of Company records by company and quarter.
+
+    A company recorded again for a quarter replaces its earlier record in queries,
+    and a record equal to the latest one for its company and quarter is not
+    stored again. Records are held in memory until `segment_rows` of a quarter
+    build up, or `flush` is called, e.g. at shutdown; queries see them either way.
+    """
+
+    def __init__(
+        self, directory: str, segment_rows: int = 1024, cached_columns: int = 64
+    ) -> None:
+        """
+        Open the store, creating its directory if needed, and index its segments.
+
+        Attributes:
+            directory (str): the directory holding the manifest and segments.
+            segment_rows (int): the records of a quarter buffered before they are written.
+            cached_columns (int): the number of decompressed columns kept in memory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.cached_columns = cached_columns
+        self._lock = threading.Lock()
+        self._segments: List[Segment] = []
+        # The file names of the segments, to merge in those other writers add
+        self._segment_files: Set[str] = set()
+        # Segments by quarter, in the order they were written
+        self._by_quarter: Dict[str, List[int]] = {}
+        # Company key -> quarter -> (segment, row, digest) of its latest record
+        self._by_company: Dict[str, Dict[str, Tuple[int, int, str]]] = {}
+        # Records not written yet: quarter -> company key -> record
+        self._pending: Dict[str, Dict[str, CompanyRecord]] = {}
+        self._columns: OrderedDict[Tuple[int, str], List[Any]] = OrderedDict()
+        # The manifest's size and modification time when it was last merged in
+        self._manifest_version: Optional[Tuple[int, int]] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._stop_flushing = threading.Event()
+
+        self._refresh()
+        return None
+
+    def record(self, company_name: str, quarter: str, company: Company) -> bool:
+        """
+        Record the data of a company for a quarter, returning whether it was new.
+
+        Attributes:
+            company_name (str): the name of the company, as in the database.
+            quarter (str): the quarter of the data, e.g. "2025Q1".
+            company (Company): the data, e.g. as extracted from the quarter's PDF.
+        """
+        quarter = parse_quarter(quarter)
+        key = normalize_company_name(company_name)
+        record = company.to_record()
+        with self._lock:
+            latest = self._pending.get(quarter, {}).get(key)
+            if latest is not None:
+                if latest == record:
+                    return False
+            else:
+                location = self._by_company.get(key, {}).get(quarter)
+                if location is not None and location[2] == _record_digest(record):
+                    return False
+            pending = self._pending.setdefault(quarter, {})
+            pending[key] = record
+            if len(pending) >= self.segment_rows:
+                self._write(quarter)
+        return True
+
+    def flush(self) -> None:
+        """
+        Write every buffered record out to segments.
+        """
+        with self._lock:
+            for quarter in list(self._pending):
+                self._write(quarter)
+
+    def flush_every(self, interval: float) -> None:
+        """
+        Write buffered records out in a background thread every so often, so other
+        processes see them, and a crash loses at most the last interval's.
+
+        Attributes:
+            interval (float): the seconds between flushes.
+        """
+        if self._flusher is not None:
+            return None
+        self._stop_flushing.clear()
+
+        def flush() -> None:
+            while not self._stop_flushing.wait(interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    # E.g. the disk is full; the records stay buffered for the next try
+                    logger.warning("Could not flush %s: %s", self.directory, e)
+
+        self._flusher = threading.Thread(target=flush, daemon=True)
+        self._flusher.start()
+        return None
+
+    def stop_flushing(self) -> None:
+        """
+        Stop writing buffered records out in the background.
+        """
+        self._stop_flushing.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+
+    def quarters(self) -> List[str]:
+        """
+        Get every quarter with records, oldest first.
+        """
+        self._refresh()
+        with self._lock:
+            return sorted(set(self._by_quarter) | set(self._pending))
+
+    def get(self, company_name: str, quarter: str) -> Optional[Company]:
+        """
+        Get the latest record of a company for a quarter, if there is one.
+
+        Attributes:
+            company_name (str): the name of the company.
+            quarter (str): the quarter, e.g. "2025Q1".
+        """
+        return self.history(company_name).get(parse_quarter(quarter))
+
+    def history(self, company_name: str) -> Dict[str, Company]:
+        """
+        Get the latest record of a company for each quarter, oldest quarter first.
+
+        Attributes:
+            company_name (str): the name of the company.
+        """
+        key = normalize_company_name(company_name)
+        self._refresh()
+        with self._lock:
+            locations = dict(self._by_company.get(key, {}))
+            pending = {
+                quarter: records[key]
+                for quarter, records in self._pending.items()
+                if key in records
+            }
+        history = {}
+        for quarter in sorted(set(locations) | set(pending)):
+            record = pending.get(quarter)
+            if record is None:
+                segment, row, _ = locations[quarter]
+                record = tuple(
+                    self._column(segment, field)[row] for field in COMPANY_FIELDS
+                )
+            history[quarter] = Company.from_record(record)
+        return history
+
+    def changes(
+        self,
+        since: str,
+        until: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Find the fields whose values changed between two quarters, for each company
+        recorded in both, e.g. `changes("2025Q1", fields=["ebitda_millions"])`.
+
+        Only the columns of the fields asked about are read.
+
+        Attributes:
+            since (str): the earlier quarter.
+            until (str): the later quarter, the latest one recorded if None.
+            fields (Iterable): the Company fields to compare, or None for all of them.
+        """
+        since = parse_quarter(since)
+        if until is None:
+            quarters = self.quarters()
+            until = quarters[-1] if quarters else since
+        until = parse_quarter(until)
+        if fields is None:
+            selected = list(COMPANY_FIELDS)
+        else:
+            wanted = set(fields)
+            unknown = wanted - set(COMPANY_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            selected = [field for field in COMPANY_FIELDS if field in wanted]
+
+        columns = ["company_name", *(f for f in selected if f != "company_name")]
+        before = self._quarter_values(since, columns)
+        after = self._quarter_values(until, columns)
+        changes = {}
+        for key, new in after.items():
+            old = before.get(key)
+            if old is None:
+                continue
+            changed = {
+                field: {"From": old[field], "To": new[field]}
+                for field in selected
+                if old[field] != new[field]
+            }
+            if changed:
+                changes[new["company_name"]] = changed
+        return changes
+
+    def _quarter_values(
+        self, quarter: str, fields: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        # The latest values of some fields for every company recorded in a quarter
+        self._refresh()
+        with self._lock:
+            segments = list(self._by_quarter.get(quarter, []))
+            pending = dict(self._pending.get(quarter, {}))
+        values: Dict[str, Dict[str, Any]] = {}
+        for segment in segments:
+            keys = self._column(segment, _KEY)
+            columns = [self._column(segment, field) for field in fields]
+            for row, key in enumerate(keys):
+                values[key] = {
+                    field: column[row] for field, column in zip(fields, columns)
+                }
+        indexes = [COMPANY_FIELDS.index(field) for field in fields]
+        for key, record in pending.items():
+            values[key] = {field: record[i] for field, i in zip(fields, indexes)}
+        return values
+
+    def _column(self, segment: int, name: str) -> List[Any]:
+        cache_key = (segment, name)
+        with self._lock:
+            column = self._columns.get(cache_key)
+            if column is not None:
+                self._columns.move_to_end(cache_key)
+                return column
+        column = self._segments[segment].column(name)
+        with self._lock:
+            self._columns[cache_key] = column
+            while len(self._columns) > self.cached_columns:
+                self._columns.popitem(last=False)
+        return column
+
+    def _add_segment(self, segment: Segment) -> None:
+        # Callers must hold the lock, or own the store as it is opened
+        i = len(self._segments)
+        self._segments.append(segment)
+        self._segment_files.add(os.path.basename(segment.path))
+        self._by_quarter.setdefault(segment.quarter, []).append(i)
+        for row, (key, digest) in enumerate(
+            zip(segment.column(_KEY), segment.column(_DIGEST))
+        ):
+            self._by_company.setdefault(key, {})[segment.quarter] = (i, row, digest)
+
+    def _refresh(self) -> None:
+        # Merges in the segments other writers added, if the manifest has changed
+        try:
+            stat = os.stat(os.path.join(self.directory, MANIFEST))
+        except FileNotFoundError:
+            return None
+        version = (stat.st_size, stat.st_mtime_ns)
+        if version == self._manifest_version:
+            return None
+        # Replaced whole by writers, so it is read without their lock
+        entries = self._read_manifest()
+        with self._lock:
+            self._merge_segments(entries)
+            self._manifest_version = version
+        return None
+
+    def _read_manifest(self) -> List[Dict[str, Any]]:
+        manifest_file = os.path.join(self.directory, MANIFEST)
+        if not os.path.exists(manifest_file):
+            return []
+        with open(manifest_file) as f:
+            return json.load(f)["segments"]
+
+    def _merge_segments(self, entries: List[Dict[str, Any]]) -> None:
+        # Adds the segments listed that aren't indexed yet, in manifest order
+        for entry in entries:
+            if entry["file"] not in self._segment_files:
+                self._add_segment(Segment(os.path.join(self.directory, entry["file"])))
+
+    def _write(self, quarter: str) -> None:
+        # Callers must hold the lock
+        pending = self._pending.pop(quarter, None)
+        if not pending:
+            return None
+        # Unique to this writer, so no other process's segment is overwritten
+        name = f"{quarter}-{os.getpid()}-{uuid.uuid4().hex[:12]}.seg"
+        write_segment(
+            os.path.join(self.directory, name), quarter, list(pending.items())
+        )
+        segment = Segment(os.path.join(self.directory, name))
+
+        # The segment only counts once the manifest lists it. The manifest is read
+        # again under the lock, so entries other writers added since are kept, and
+        # merged in first, so later records still win.
+        with open(os.path.join(self.directory, MANIFEST_LOCK), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = self._read_manifest()
+                self._merge_segments(entries)
+                self._add_segment(segment)
+                entries.append(
+                    {"file": name, "quarter": segment.quarter, "rows": segment.rows}
+                )
+                manifest_file = os.path.join(self.directory, MANIFEST)
+                tmp_file = f"{manifest_file}.{os.getpid()}.tmp"
+                with open(tmp_file, "w") as f:
+                    json.dump({"segments": entries}, f)
+                os.replace(tmp_file, manifest_file)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Find the companies whose data changed between two quarters."
+    )
+    parser.add_argument("directory", help="the history store's directory")
+    parser.add_argument(
+        "--since", required=True, help="the earlier quarter, e.g. 2025Q1"
+    )
+    parser.add_argument("--until", help="the later quarter (default: the latest)")
+    parser.add_argument(
+        "--fields", help="comma-separated Company fields (default: all of them)"
+    )
+    args = parser.parse_args(argv)
+
+    fields = None
+    if args.fields:
+        fields = [field.strip() for field in args.fields.split(",") if field.strip()]
+    try:
+        changes = HistoryStore(args.directory).changes(args.since, args.until, fields)
+    except ValueError as e:
+        parser.error(str(e))
+    json.dump(changes, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
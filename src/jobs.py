@@ -0,0 +1,247 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from src.database import CompanyDatabase
+from src.models import BatchCompareResult, CompareOptions, JobStatus, JobSummary
+from src.pdf_cache import PdfExtractor
+from src.reconciliation import compare_pair, pdf_name
+
+
+class JobQueueFull(Exception):
+    """
+    Raised when a job is submitted while the queue is at its limit.
+    """
+
+
+@dataclass
+class Job:
+    """
+    A reconciliation run in the background, and its progress.
+
+    Attributes:
+        id (str): the id callers poll the job by.
+        pairs (list): the (company name, PDF name) pairs, or None for every company.
+        db_client (CompanyDatabase): the client holding the data on file.
+        pdf_service (PdfExtractor): the service used to extract data from PDFs.
+        options (CompareOptions): which fields of each comparison to keep.
+    """
+
+    id: str
+    pairs: Optional[List[Tuple[str, str]]]
+    db_client: CompanyDatabase
+    pdf_service: PdfExtractor
+    options: Optional[CompareOptions] = None
+    status: str = "queued"
+    total: Optional[int] = None
+    results: List[BatchCompareResult] = field(default_factory=list)
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    cancelled: threading.Event = field(default_factory=threading.Event)
+
+
+class JobManager:
+    """
+    Runs reconciliation jobs on a pool of in-process worker threads.
+
+    Jobs wait in a bounded queue, and submitting to a full queue raises
+    JobQueueFull rather than piling up work. Finished jobs are kept for polling
+    for a while, and up to a limit, after which the oldest are forgotten.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queued: int = 100,
+        max_finished: int = 1000,
+        finished_ttl: float = 3600.0,
+    ) -> None:
+        """
+        Initialize the manager; its worker threads start with the first job.
+
+        Attributes:
+            workers (int): the number of jobs run at once.
+            max_queued (int): the number of jobs that can wait to run.
+            max_finished (int): the number of finished jobs kept for polling.
+            finished_ttl (float): the seconds a finished job is kept for polling.
+        """
+        self.workers = workers
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self._queue: queue.Queue[Optional[Job]] = queue.Queue(maxsize=max_queued)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        return None
+
+    def submit(
+        self,
+        pairs: Optional[List[Tuple[str, str]]],
+        db_client: CompanyDatabase,
+        pdf_service: PdfExtractor,
+        options: Optional[CompareOptions] = None,
+    ) -> JobStatus:
+        """
+        Queue a job, returning its status straight away.
+
+        Attributes:
+            pairs (list): the (company name, PDF name) pairs, or None for every company.
+            db_client (CompanyDatabase): the client holding the data on file.
+            pdf_service (PdfExtractor): the service used to extract data from PDFs.
+            options (CompareOptions): which fields of each comparison to keep.
+        """
+        job = Job(uuid.uuid4().hex, pairs, db_client, pdf_service, options)
+        if pairs is not None:
+            job.total = len(pairs)
+        self._start_workers()
+        with self._lock:
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise JobQueueFull("Too many jobs are queued, try again later")
+            self._jobs[job.id] = job
+            self._evict()
+        return self._status(job)
+
+    def list(self) -> List[JobSummary]:
+        """
+        Get the status and progress of every job kept, oldest first, without their
+        results.
+        """
+        with self._lock:
+            self._evict()
+            return [self._summary(job) for job in self._jobs.values()]
+
+    def get(self, job_id: str, offset: int = 0) -> JobStatus:
+        """
+        Get the status, progress and results so far of a job.
+
+        Attributes:
+            job_id (str): the id of the job.
+            offset (int): the number of results to leave out, e.g. those already seen.
+        """
+        return self._status(self._job(job_id), offset)
+
+    def cancel(self, job_id: str) -> JobStatus:
+        """
+        Cancel a job. A queued job never runs, and a running one stops after the
+        comparison in progress, keeping its results so far.
+
+        Attributes:
+            job_id (str): the id of the job.
+        """
+        job = self._job(job_id)
+        job.cancelled.set()
+        with self._lock:
+            if job.status == "queued":
+                self._finish(job, "cancelled")
+        return self._status(job)
+
+    def close(self) -> None:
+        """
+        Cancel every job and stop the worker threads.
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+            threads, self._threads = self._threads, []
+        for job in jobs:
+            job.cancelled.set()
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    def _job(self, job_id: str) -> Job:
+        with self._lock:
+            self._evict()
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise LookupError(f"Job {job_id} not found")
+        return job
+
+    def _status(self, job: Job, offset: int = 0) -> JobStatus:
+        with self._lock:
+            return JobStatus(
+                **self._summary(job).model_dump(), results=job.results[offset:]
+            )
+
+    @staticmethod
+    def _summary(job: Job) -> JobSummary:
+        # Callers must hold the lock
+        return JobSummary(
+            job_id=job.id,
+            status=job.status,
+            total=job.total,
+            completed=len(job.results),
+            error=job.error,
+        )
+
+    def _start_workers(self) -> None:
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.status != "queued":
+                    continue
+                job.status = "running"
+            try:
+                self._run(job)
+            except Exception as e:
+                with self._lock:
+                    job.error = str(e)
+                    self._finish(job, "failed")
+
+    def _run(self, job: Job) -> None:
+        pairs = job.pairs
+        if pairs is None:
+            pairs = [
+                (row["Company Name"], pdf_name(row["Company Name"]))
+                for row in job.db_client
+            ]
+            with self._lock:
+                job.total = len(pairs)
+        for company_name, pdf in pairs:
+            if job.cancelled.is_set():
+                break
+            result = compare_pair(
+                company_name=company_name,
+                pdf=pdf,
+                db_client=job.db_client,
+                pdf_service=job.pdf_service,
+                options=job.options,
+            )
+            with self._lock:
+                job.results.append(result)
+        with self._lock:
+            self._finish(job, "cancelled" if job.cancelled.is_set() else "completed")
+
+    def _finish(self, job: Job, status: str) -> None:
+        # Callers must hold the lock
+        job.status = status
+        job.finished_at = time.time()
+        self._evict()
+
+    def _evict(self) -> None:
+        # Callers must hold the lock. Forgets jobs finished too long ago, and the
+        # oldest finished jobs past the limit.
+        expired = time.time() - self.finished_ttl
+        finished = [
+            other for other in self._jobs.values() if other.finished_at is not None
+        ]
+        excess = max(0, len(finished) - self.max_finished)
+        for i, job in enumerate(finished):
+            if i < excess or job.finished_at <= expired:
+                del self._jobs[job.id]
@@ -0,0 +1,109 @@
+from typing import Any, Dict, Iterator, Mapping, MutableMapping, Optional
+
+# Marks a key deleted from the layer below
+_DELETED = object()
+
+
+class LayeredDict(MutableMapping):
+    """
+    A dictionary that copies on write: changes are kept in a small layer over a
+    base that is never written to, so `copy` only copies the changes.
+
+    Once the changes outgrow the square root of the base they are folded into a new
+    base, so copying costs O(√n) amortized rather than O(n), and a lookup at most
+    two dictionary accesses.
+    """
+
+    def __init__(
+        self,
+        base: Optional[Mapping[Any, Any]] = None,
+        changes: Optional[Dict[Any, Any]] = None,
+    ) -> None:
+        """
+        Layer an empty set of changes over a base.
+
+        Attributes:
+            base (Mapping): the entries to start from, never written to.
+            changes (dict): entries changed since the base, or _DELETED for removed ones.
+        """
+        self._base: Mapping[Any, Any] = {} if base is None else base
+        self._changes: Dict[Any, Any] = {} if changes is None else changes
+        self._size = len(self._base) + sum(
+            (value is not _DELETED) - (key in self._base)
+            for key, value in self._changes.items()
+        )
+        return None
+
+    @classmethod
+    def layer(cls, mapping: Mapping[Any, Any]) -> "LayeredDict":
+        """
+        Get a copy of a mapping that can be changed without copying it, e.g. of a
+        dictionary about to be changed while readers still use it.
+
+        Attributes:
+            mapping (Mapping): a LayeredDict, copied as such, or any other mapping,
+                which becomes the base.
+        """
+        if isinstance(mapping, LayeredDict):
+            return mapping.copy()
+        return cls(mapping)
+
+    def copy(self) -> "LayeredDict":
+        """
+        Copy the dictionary, so either can be changed without affecting the other.
+        """
+        if len(self._changes) ** 2 > len(self._base):
+            base = {
+                key: value
+                for key, value in self._base.items()
+                if key not in self._changes
+            }
+            base.update(
+                (key, value)
+                for key, value in self._changes.items()
+                if value is not _DELETED
+            )
+            return LayeredDict(base)
+        return LayeredDict(self._base, dict(self._changes))
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        value = self._changes.get(key, _DELETED)
+        if value is _DELETED:
+            if key in self._changes:
+                return default
+            return self._base.get(key, default)
+        return value
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self.get(key, _DELETED)
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _DELETED) is not _DELETED
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if key not in self:
+            self._size += 1
+        self._changes[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._size -= 1
+        if key in self._base:
+            self._changes[key] = _DELETED
+        else:
+            del self._changes[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        for key in self._base:
+            if key not in self._changes:
+                yield key
+        for key, value in self._changes.items():
+            if value is not _DELETED:
+                yield key
+
+    def __len__(self) -> int:
+        return self._size
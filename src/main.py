@@ -1,28 +1,246 @@
 import os
-from typing import Any
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterator, Literal, Optional
 
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import ValidationError
 
-from src.database import DatabaseClient
-from src.models import Company
+from src.async_pdf_service import AsyncPdfService
+from src.constants import DATABASE_CSV_PATH
+from src.database import CompanyDatabase, DatabaseClient, normalize_company_name
+from src.history import HistoryStore, current_quarter, parse_quarter
+from src.jobs import JobManager, JobQueueFull
+from src.metrics import METRICS, MetricsMiddleware
+from src.models import (
+    BatchCompareRequest,
+    BatchCompareResult,
+    Company,
+    CompareOptions,
+    CompareRequest,
+    JobRequest,
+    JobStatus,
+    JobSummary,
+)
+from src.name_index import NameMatch
+from src.pdf_cache import CachedPdfService, PdfExtractor, pdf_digest
 from src.pdf_service import PdfService
+from src.profiling import ProfilingMiddleware
+from src.reconciliation import compare_extracted, compare_pair, pdf_name, pdf_path
+from src.reconciliation_store import IncrementalReconciler, ReconciliationStore
+from src.response_cache import (
+    ResponseCache,
+    etag_matches,
+    make_etag,
+    payload_digest,
+)
+from src.serialization import FastJSONResponse, dumps
+from src.summary import SUMMARY
 
 load_dotenv()  # take environment variables from .env. mimicking the environment variables set in a Docker container/EC2/K8s or etc
 
 API_KEY = os.environ["API_KEY"]
+# Upper bound on concurrent extractions for a single batch comparison
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "8"))
+# Threads shared by every batch comparison, bounding their extractions in total
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "32"))
+# Where companies are read from: "csv" (the default) or "sqlite", imported from the CSV
+DATABASE_BACKEND = os.environ.get("DATABASE_BACKEND", "csv")
+DATABASE_SQLITE_PATH = os.environ.get("DATABASE_SQLITE_PATH", "data/database.sqlite")
+# Similarity a misspelt company name needs to match a name on file, from 0 to 1, when
+# a request asks for fuzzy matching
+NAME_MATCH_THRESHOLD = float(os.environ.get("NAME_MATCH_THRESHOLD", "0.8"))
+# Seconds between checks of the CSV for changes to reload (unset: never reload)
+DATABASE_RELOAD_INTERVAL = (
+    float(os.environ["DATABASE_RELOAD_INTERVAL"])
+    if os.environ.get("DATABASE_RELOAD_INTERVAL")
+    else None
+)
+# Optional snapshot compiled from the database CSV (see src/snapshot.py), used while fresh
+DATABASE_SNAPSHOT_PATH = os.environ.get("DATABASE_SNAPSHOT_PATH") or None
+# Size of the in-memory extraction cache, and an optional directory to persist it to
+PDF_CACHE_SIZE = int(os.environ.get("PDF_CACHE_SIZE", "256"))
+PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR") or None
+# Number of serialized /compare responses kept, by ETag
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "1024"))
+# Optional directory of the history store, where each quarter's extracted data is kept
+HISTORY_DIR = os.environ.get("HISTORY_DIR") or None
+# Seconds between writes of the history store's buffered records (0: only at shutdown)
+HISTORY_FLUSH_INTERVAL = float(os.environ.get("HISTORY_FLUSH_INTERVAL", "5"))
+# Optional SQLite file of the portfolio summary, shared by every worker process using it
+SUMMARY_DB_PATH = os.environ.get("SUMMARY_DB_PATH") or None
+# Background jobs run at once, and how many can wait before submissions get a 429
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "100"))
+# Seconds a finished job's results are kept for polling
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", "3600"))
+# Optional SQLite file of past comparisons, so /compare/all only redoes what changed
+RECONCILIATION_STORE_PATH = os.environ.get("RECONCILIATION_STORE_PATH") or None
+# Seconds a request waits for an extraction, and before a slow one is hedged (unset: never)
+PDF_TIMEOUT = float(os.environ.get("PDF_TIMEOUT", "30"))
+PDF_HEDGE_AFTER = (
+    float(os.environ["PDF_HEDGE_AFTER"]) if os.environ.get("PDF_HEDGE_AFTER") else None
+)
 
 
 # Dependency Injection
-def get_db_client() -> DatabaseClient:
-    return DatabaseClient("data/database.csv")
+@lru_cache(maxsize=None)
+def get_db_client() -> CompanyDatabase:
+    # One shared, indexed client per process rather than re-reading the CSV per request
+    if DATABASE_BACKEND == "sqlite":
+        # Imported here, so the CSV backend doesn't load SQLite support
+        from src.sqlite_database import SqliteDatabaseClient
 
+        return SqliteDatabaseClient(
+            DATABASE_SQLITE_PATH, name_match_threshold=NAME_MATCH_THRESHOLD
+        )
+    if DATABASE_BACKEND != "csv":
+        raise ValueError(f"Unknown DATABASE_BACKEND {DATABASE_BACKEND!r}")
+    return DatabaseClient(
+        DATABASE_CSV_PATH,
+        snapshot_file=DATABASE_SNAPSHOT_PATH,
+        name_match_threshold=NAME_MATCH_THRESHOLD,
+    )
 
-def get_pdf_service() -> PdfService:
-    return PdfService(API_KEY)
 
+@lru_cache(maxsize=None)
+def get_pdf_service() -> PdfExtractor:
+    # Shared so that repeat extractions of the same PDF are served from the cache
+    return CachedPdfService(
+        PdfService(API_KEY), max_entries=PDF_CACHE_SIZE, cache_dir=PDF_CACHE_DIR
+    )
 
-app = FastAPI()
+
+@lru_cache(maxsize=None)
+def get_reconciliation_store() -> Optional[ReconciliationStore]:
+    if RECONCILIATION_STORE_PATH is None:
+        return None
+    return ReconciliationStore(RECONCILIATION_STORE_PATH)
+
+
+@lru_cache(maxsize=None)
+def get_history_store() -> Optional[HistoryStore]:
+    if HISTORY_DIR is None:
+        return None
+    return HistoryStore(HISTORY_DIR)
+
+
+@lru_cache(maxsize=None)
+def get_response_cache() -> ResponseCache:
+    return ResponseCache(max_entries=RESPONSE_CACHE_SIZE)
+
+
+@lru_cache(maxsize=None)
+def get_batch_executor() -> ThreadPoolExecutor:
+    # Shared, so concurrent batches queue for threads rather than each adding more
+    return ThreadPoolExecutor(
+        max_workers=BATCH_WORKERS, thread_name_prefix="compare-batch"
+    )
+
+
+@lru_cache(maxsize=None)
+def get_job_manager() -> JobManager:
+    return JobManager(
+        workers=JOB_WORKERS, max_queued=JOB_QUEUE_SIZE, finished_ttl=JOB_RESULT_TTL
+    )
+
+
+# One adapter per PDF service, so concurrent requests for a PDF share an extraction
+_async_pdf_services: "weakref.WeakKeyDictionary[Any, AsyncPdfService]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_pdf_service(
+    pdf_service: PdfExtractor = Depends(get_pdf_service),
+) -> AsyncPdfService:
+    adapter = _async_pdf_services.get(pdf_service)
+    if adapter is None:
+        adapter = _async_pdf_services.setdefault(
+            pdf_service,
+            AsyncPdfService(
+                pdf_service, timeout=PDF_TIMEOUT, hedge_after=PDF_HEDGE_AFTER
+            ),
+        )
+    return adapter
+
+
+def get_compare_options(
+    only: Optional[Literal["mismatches"]] = None,
+    fields: Optional[str] = None,
+) -> CompareOptions:
+    """
+    Read which fields to return from the query, e.g.
+    `?only=mismatches&fields=revenue_millions,ceo`.
+    """
+    selected = None
+    if fields is not None:
+        selected = tuple(field.strip() for field in fields.split(",") if field.strip())
+    try:
+        return CompareOptions(fields=selected, only_mismatches=only == "mismatches")
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e.errors()[0]["ctx"]["error"]))
+
+
+def warm_up() -> dict[str, float]:
+    """
+    Build the singletons the first requests would otherwise pay for, returning the
+    seconds each step took.
+    """
+    timings = {}
+
+    def step(name: str, build: Any) -> None:
+        start = time.perf_counter()
+        build()
+        timings[name] = round(time.perf_counter() - start, 6)
+
+    # Parses the CSV, validating every row into a Company record
+    step("database", get_db_client)
+    step("name_index", lambda: getattr(get_db_client(), "warm_up", lambda: None)())
+    step("pdf_service", get_pdf_service)
+    step("reconciliation_store", get_reconciliation_store)
+    step("history_store", get_history_store)
+    return timings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Warm up before serving, so the first requests don't pay for it; /ready only
+    # answers once this is done
+    if SUMMARY_DB_PATH is not None:
+        SUMMARY.share(SUMMARY_DB_PATH)
+    app.state.warm_up = await run_in_threadpool(warm_up)
+    db_client = get_db_client()
+    watch = getattr(db_client, "watch", None)
+    if DATABASE_RELOAD_INTERVAL is not None and watch is not None:
+        watch(DATABASE_RELOAD_INTERVAL)
+    history = get_history_store()
+    if history is not None and HISTORY_FLUSH_INTERVAL > 0:
+        history.flush_every(HISTORY_FLUSH_INTERVAL)
+    yield
+    app.state.warm_up = None
+    if watch is not None:
+        db_client.stop_watching()
+    if get_job_manager.cache_info().currsize:
+        get_job_manager().close()
+    if get_batch_executor.cache_info().currsize:
+        get_batch_executor().shutdown()
+    if history is not None:
+        history.stop_flushing()
+        history.flush()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware, metrics=METRICS)
+# ?profile=1 with the API key in X-API-Key returns a profile of the request
+app.add_middleware(ProfilingMiddleware, api_key=API_KEY)
 
 
 @app.get("/")
@@ -33,32 +251,411 @@ def health_check() -> dict[str, str]:
     return {"Hello": "World"}
 
 
-@app.get("/compare")
-def compare(
+@app.get("/ready")
+def ready() -> dict[str, Any]:
+    """
+    A readiness probe, answering once the startup warm-up has finished, with how
+    long each of its steps took.
+    """
+    timings = getattr(app.state, "warm_up", None)
+    if timings is None:
+        raise HTTPException(status_code=503, detail="Warming up")
+    return {"status": "ready", "warm_up_seconds": timings}
+
+
+@app.get("/database/version")
+def database_version(
+    db_client: CompanyDatabase = Depends(get_db_client),
+) -> dict[str, str]:
+    """
+    Get the version of the data on file, which changes whenever it is reloaded.
+    """
+    return {"version": db_client.version}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics(
+    pdf_service: PdfExtractor = Depends(get_pdf_service),
+) -> str:
+    """
+    Expose per-stage latencies, request and error counts and PDF cache statistics in
+    the Prometheus text format.
+    """
+    cache_stats = getattr(pdf_service, "cache_stats", None)
+    return METRICS.render(cache_stats=cache_stats() if cache_stats else None)
+
+
+@app.get("/summary")
+def summary(quarter: Optional[str] = None) -> dict[str, Any]:
+    """
+    Get how often each field disagreed across every company compared so far, counting
+    each company's latest comparison, with the mean change of numeric fields.
+
+    Each process keeps its own summary, unless SUMMARY_DB_PATH names a file for
+    worker processes to share one (`src.serve` sets one up for its workers).
+
+    Attributes:
+        quarter (str): a quarter to summarize, e.g. "2025Q1", instead of all time.
+    """
+    try:
+        window = parse_quarter(quarter) if quarter else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**SUMMARY.summary(window), "quarters": SUMMARY.quarters()}
+
+
+@app.delete("/summary", status_code=204)
+def reset_summary(quarter: Optional[str] = None) -> None:
+    """
+    Clear the summary of a quarter, or the whole summary.
+
+    Attributes:
+        quarter (str): the quarter to clear, e.g. "2025Q1", instead of everything.
+    """
+    try:
+        SUMMARY.reset(parse_quarter(quarter) if quarter else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/compare", response_model=dict[str, dict[str, Any]])
+async def compare(
     company_name: str,
     pdf: str,
-    db_client: DatabaseClient = Depends(get_db_client),
-    pdf_service: PdfService = Depends(get_pdf_service),
-) -> dict[str, dict[str, Any]]:
+    quarter: Optional[str] = None,
+    fuzzy: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    options: CompareOptions = Depends(get_compare_options),
+    db_client: CompanyDatabase = Depends(get_db_client),
+    pdf_service: AsyncPdfService = Depends(get_async_pdf_service),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    history: Optional[HistoryStore] = Depends(get_history_store),
+) -> Response:
     """
     A simple endpoint that compares the data extracted from a PDF with the data stored in the database.
 
+    The response has an ETag built from the database version and the PDF's content,
+    so pollers sending it back in If-None-Match get a 304 until either changes, and
+    repeat requests are served from a cache of serialized responses. PDFs that can't
+    be read locally are identified by the data extracted from them instead.
+
+    The company name must be on file, up to case and surrounding whitespace. With
+    `fuzzy=true` it may instead match the most similar name on file, and the response
+    is `{"match": {"company_name": ..., "score": ...}, "comparison": {...}}`, naming
+    the company compared (see /companies/resolve for every candidate).
+
+    The comparison counts towards the quarter's portfolio summary, as do responses
+    served again from the cache or as a 304. With a history store configured, the
+    extracted data is kept in it as the company's data for the quarter.
+
     Attributes:
         company_name (str): the name of the company to compare.
         pdf (str): the name of the PDF file to extract data from, not including the file path or extension.
+        quarter (str): the quarter the PDF reports on, e.g. "2025Q1", by default the current one.
+        fuzzy (bool): whether a company name not on file may match the most similar one.
+        only (str): "mismatches" to leave out the fields that match.
+        fields (str): a comma-separated list of the fields to compare, e.g. "revenue_millions,ceo".
     """
-    try:
-        # Extract data from the PDF
-        pdf_data = pdf_service.extract(file_path=f"/home/coderpad/data/{pdf}.pdf")
+    file_path = pdf_path(pdf)
+    pdf_data = None
 
-        # Get the company data from the database
-        company_data = db_client.get_by_company_name(company_name=company_name)
+    def identify() -> tuple[Optional[str], str, Optional[NameMatch]]:
+        # Database backends may block, e.g. SQLite waiting for a pooled connection
+        version = db_client.version
+        match = None
+        if fuzzy:
+            matches = db_client.resolve(company_name, limit=1)
+            if not matches:
+                raise LookupError(f"Company {company_name} not found in the database")
+            match = matches[0]
+        return pdf_digest(pdf_service.service, file_path), version, match
 
-        # Initialize Company objects with the extracted data
-        current_company = Company(company_data)
-        new_company = Company(csv_data=pdf_data)
+    try:
+        quarter = parse_quarter(quarter) if quarter else current_quarter()
+        digest, version, match = await run_in_threadpool(identify)
+        if digest is None:
+            with METRICS.time("pdf_extract"):
+                pdf_data = await pdf_service.extract(file_path=file_path)
+            digest = payload_digest(pdf_data)
+        etag = make_etag(
+            normalize_company_name(company_name),
+            version,
+            digest,
+            options.model_dump_json(),
+            quarter,
+            # The match follows from the name and the version, but changes the body
+            *((match.name, str(match.score)) if match else ()),
+        )
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        # Responses served again still count towards the summary, e.g. after a
+        # reset; a comparison the summary no longer remembers is done again
+        counted = await run_in_threadpool(SUMMARY.add_again, etag)
+        if counted and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
 
-        # Return a summary of the data, noting which fields did not match
-        return current_company.compare(new_company)
+        body = response_cache.get(etag) if counted else None
+        if body is None:
+            if pdf_data is None:
+                with METRICS.time("pdf_extract"):
+                    pdf_data = await pdf_service.extract(file_path=file_path)
+            # The lookup may block on the database, and recording history on writing
+            # a segment out, so neither runs on the event loop
+            result = await run_in_threadpool(
+                compare_extracted,
+                company_name=match.name if match else company_name,
+                pdf_data=pdf_data,
+                db_client=db_client,
+                options=options,
+                quarter=quarter,
+                history=history,
+                summary_source=etag,
+            )
+            if match is not None:
+                result = {
+                    "match": {"company_name": match.name, "score": match.score},
+                    "comparison": result,
+                }
+            body = dumps(result)
+            response_cache.put(etag, body)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
     except (FileNotFoundError, ValueError, LookupError) as e:
+        METRICS.count_error(e)
         raise HTTPException(status_code=400, detail=str(e))
+    except TimeoutError as e:
+        METRICS.count_error(e)
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+@app.get("/companies/resolve")
+def resolve_company(
+    name: str,
+    limit: int = Query(5, ge=1, le=100),
+    db_client: CompanyDatabase = Depends(get_db_client),
+) -> dict[str, Any]:
+    """
+    Find the companies on file a possibly misspelt name may mean, most similar first,
+    each with a similarity score from 0 to 1.
+
+    Attributes:
+        name (str): the name to resolve.
+        limit (int): the most companies to return.
+    """
+    matches = db_client.resolve(name, limit=limit)
+    return {
+        "query": name,
+        "matches": [
+            {"company_name": match.name, "score": match.score} for match in matches
+        ],
+    }
+
+
+@app.get("/history/changes")
+def history_changes(
+    since: str,
+    until: Optional[str] = None,
+    fields: Optional[str] = None,
+    history: Optional[HistoryStore] = Depends(get_history_store),
+) -> dict[str, Any]:
+    """
+    Find the companies whose extracted data changed between two quarters, e.g.
+    `?since=2025Q1&fields=ebitda_millions` for whose EBITDA changed since 2025Q1.
+
+    Attributes:
+        since (str): the earlier quarter.
+        until (str): the later quarter, by default the latest one recorded.
+        fields (str): a comma-separated list of the fields to compare, by default all.
+    """
+    if history is None:
+        raise HTTPException(status_code=404, detail="No history store is configured")
+    selected = None
+    if fields is not None:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+    try:
+        since = parse_quarter(since)
+        until = parse_quarter(until) if until else (history.quarters() or [since])[-1]
+        changes = history.changes(since, until, selected)
+        return {"since": since, "until": until, "changes": changes}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/history/companies/{company_name}")
+def company_history(
+    company_name: str,
+    history: Optional[HistoryStore] = Depends(get_history_store),
+) -> dict[str, Company]:
+    """
+    Get the data extracted for a company in each quarter, oldest first.
+
+    Attributes:
+        company_name (str): the name of the company.
+    """
+    if history is None:
+        raise HTTPException(status_code=404, detail="No history store is configured")
+    companies = history.history(company_name)
+    if not companies:
+        raise HTTPException(
+            status_code=404, detail=f"No history for company {company_name}"
+        )
+    return companies
+
+
+@app.post("/compare/batch", response_model=list[BatchCompareResult])
+def compare_batch(
+    request: BatchCompareRequest,
+    options: CompareOptions = Depends(get_compare_options),
+    db_client: CompanyDatabase = Depends(get_db_client),
+    pdf_service: PdfExtractor = Depends(get_pdf_service),
+    pool: ThreadPoolExecutor = Depends(get_batch_executor),
+) -> FastJSONResponse:
+    """
+    Compare many company/PDF pairs at once, extracting the PDFs concurrently.
+
+    Each item gets its own result or error, so one bad PDF, or a failing PDF
+    service, doesn't fail the batch. Extractions run on threads shared by every
+    batch, at most `concurrency` of them for this one. The `only` and `fields`
+    query options apply to every item, as for /compare.
+
+    Attributes:
+        request (BatchCompareRequest): the pairs to compare and an optional concurrency limit.
+    """
+
+    def run(item: CompareRequest) -> BatchCompareResult:
+        try:
+            return compare_pair(
+                company_name=item.company_name,
+                pdf=item.pdf,
+                db_client=db_client,
+                pdf_service=pdf_service,
+                options=options,
+            )
+        except Exception as e:
+            # E.g. the PDF service is unreachable or timed out
+            METRICS.count_error(e)
+            return BatchCompareResult(
+                company_name=item.company_name,
+                pdf=item.pdf,
+                error=f"{type(e).__name__}: {e}",
+            )
+
+    limit = min(request.concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY)
+    results = []
+    running: deque = deque()
+    for item in request.items:
+        if len(running) == limit:
+            results.append(running.popleft().result())
+        running.append(pool.submit(run, item))
+    results.extend(future.result() for future in running)
+    return FastJSONResponse([result.model_dump() for result in results])
+
+
+@app.get("/compare/all")
+def compare_all(
+    options: CompareOptions = Depends(get_compare_options),
+    db_client: CompanyDatabase = Depends(get_db_client),
+    pdf_service: PdfExtractor = Depends(get_pdf_service),
+    store: Optional[ReconciliationStore] = Depends(get_reconciliation_store),
+) -> StreamingResponse:
+    """
+    Compare every company in the database with its PDF, streaming one NDJSON line per
+    company as soon as it is ready.
+
+    Each company's PDF is found by name, e.g. "healthinc" for "HealthInc", and each
+    line has the same shape as an item of a batch comparison. With a reconciliation
+    store configured, companies whose row and PDF are unchanged since the last run
+    are served from it instead of being compared again. The `only` and `fields`
+    query options apply to every line, as for /compare.
+    """
+    reconciler = IncrementalReconciler(db_client, pdf_service, store) if store else None
+
+    def lines() -> Iterator[str]:
+        for row in db_client:
+            company_name = row["Company Name"]
+            if reconciler is not None:
+                result, _ = reconciler.reconcile(
+                    company_name, pdf_name(company_name), options
+                )
+            else:
+                result = compare_pair(
+                    company_name=company_name,
+                    pdf=pdf_name(company_name),
+                    db_client=db_client,
+                    pdf_service=pdf_service,
+                    options=options,
+                )
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", status_code=202)
+def submit_job(
+    request: JobRequest,
+    options: CompareOptions = Depends(get_compare_options),
+    db_client: CompanyDatabase = Depends(get_db_client),
+    pdf_service: PdfExtractor = Depends(get_pdf_service),
+    job_manager: JobManager = Depends(get_job_manager),
+) -> JobStatus:
+    """
+    Start a reconciliation in the background and return its id straight away, for
+    reconciliations too long to wait for in one request.
+
+    Attributes:
+        request (JobRequest): the pairs to compare, or none for every company.
+    """
+    pairs = None
+    if request.items is not None:
+        pairs = [(item.company_name, item.pdf) for item in request.items]
+    try:
+        return job_manager.submit(pairs, db_client, pdf_service, options)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": "1"}
+        )
+
+
+@app.get("/jobs")
+def list_jobs(job_manager: JobManager = Depends(get_job_manager)) -> list[JobSummary]:
+    """
+    Get the progress of every background reconciliation kept, oldest first. Their
+    results are only returned by /jobs/{job_id}.
+    """
+    return job_manager.list()
+
+
+@app.get("/jobs/{job_id}")
+def get_job(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    job_manager: JobManager = Depends(get_job_manager),
+) -> JobStatus:
+    """
+    Get the progress of a background reconciliation and its results so far.
+
+    Attributes:
+        job_id (str): the id returned when the job was submitted.
+        offset (int): the number of results to leave out, so a poller can ask only
+            for those it hasn't seen.
+    """
+    try:
+        return job_manager.get(job_id, offset)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(
+    job_id: str, job_manager: JobManager = Depends(get_job_manager)
+) -> JobStatus:
+    """
+    Cancel a background reconciliation, keeping the results it has so far.
+
+    Attributes:
+        job_id (str): the id returned when the job was submitted.
+    """
+    try:
+        return job_manager.cancel(job_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,248 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """
+    A latency histogram with fixed buckets, cheap enough to update on every call.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        # One count per bucket plus the +Inf bucket, not cumulative until rendered
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record one observation.
+
+        Attributes:
+            seconds (float): the latency to record.
+        """
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """
+        Get the cumulative bucket counts and the sum of all observations.
+        """
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total
+
+
+class _StageTimer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram) -> None:
+        self.histogram = histogram
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Metrics:
+    """
+    Process-wide counters and latency histograms, rendered in the Prometheus text
+    format.
+    """
+
+    def __init__(self) -> None:
+        self._stages: Dict[str, Histogram] = {}
+        self._requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self._request_latency: Dict[str, Histogram] = {}
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def time(self, stage: str) -> _StageTimer:
+        """
+        Time a block of code as a stage of a comparison, e.g.
+        `with METRICS.time("compare"): ...`.
+
+        Attributes:
+            stage (str): the name of the stage.
+        """
+        return _StageTimer(self._histogram(self._stages, stage))
+
+    def count_error(self, error: BaseException) -> None:
+        """
+        Count an error by its exception type.
+
+        Attributes:
+            error (BaseException): the error to count.
+        """
+        with self._lock:
+            self._errors[type(error).__name__] += 1
+
+    def observe_request(
+        self, method: str, path: str, status: int, seconds: float
+    ) -> None:
+        """
+        Record a handled HTTP request.
+
+        Attributes:
+            method (str): the HTTP method.
+            path (str): the route the request matched.
+            status (int): the response status code.
+            seconds (float): how long the request took.
+        """
+        with self._lock:
+            self._requests[(method, path, status)] += 1
+        self._histogram(self._request_latency, path).observe(seconds)
+
+    def reset(self) -> None:
+        """
+        Clear every metric.
+        """
+        with self._lock:
+            self._stages.clear()
+            self._requests.clear()
+            self._request_latency.clear()
+            self._errors.clear()
+
+    def render(self, cache_stats: Optional[Mapping[str, int]] = None) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Attributes:
+            cache_stats (Mapping): optional PDF cache counters to include, by event.
+        """
+        with self._lock:
+            stages = dict(self._stages)
+            requests = dict(self._requests)
+            request_latency = dict(self._request_latency)
+            errors = dict(self._errors)
+
+        lines: List[str] = []
+        _render_histogram(
+            lines,
+            "compare_stage_seconds",
+            "Latency of each stage of a comparison.",
+            "stage",
+            stages,
+        )
+        lines += [
+            "# HELP http_requests_total HTTP requests handled.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, path, status), count in sorted(requests.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",path="{path}",'
+                f'status="{status}"}} {count}'
+            )
+        _render_histogram(
+            lines,
+            "http_request_duration_seconds",
+            "Latency of HTTP requests.",
+            "path",
+            request_latency,
+        )
+        lines += [
+            "# HELP compare_errors_total Comparison errors by exception type.",
+            "# TYPE compare_errors_total counter",
+        ]
+        for error_type, count in sorted(errors.items()):
+            lines.append(f'compare_errors_total{{type="{error_type}"}} {count}')
+        if cache_stats is not None:
+            lines += [
+                "# HELP pdf_cache_events_total PDF extraction cache events.",
+                "# TYPE pdf_cache_events_total counter",
+            ]
+            for event, count in sorted(cache_stats.items()):
+                lines.append(f'pdf_cache_events_total{{event="{event}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def _histogram(self, histograms: Dict[str, Histogram], name: str) -> Histogram:
+        histogram = histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.setdefault(name, Histogram())
+        return histogram
+
+
+def _render_histogram(
+    lines: List[str],
+    metric: str,
+    help_text: str,
+    label: str,
+    histograms: Mapping[str, Histogram],
+) -> None:
+    lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+    for name, histogram in sorted(histograms.items()):
+        counts, total = histogram.snapshot()
+        bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, counts):
+            lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound}"}} {count}')
+        lines.append(f'{metric}_sum{{{label}="{name}"}} {total}')
+        lines.append(f'{metric}_count{{{label}="{name}"}} {counts[-1]}')
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the count, status and latency of every HTTP request.
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]], metrics: "Metrics") -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Label by route template rather than raw path, to bound the label values
+            route = scope.get("route")
+            self.metrics.observe_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - start,
+            )
+
+
+# The metrics of this process
+METRICS = Metrics()
@@ -1,8 +1,65 @@
-from typing import Any, Dict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
-from pydantic import BaseModel, Field
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    TypeAdapter,
+    ValidationError,
+    field_validator,
+)
 
-from src.constants import CSV_TO_COMPANY_FIELD_MAPPING
+from src.constants import CSV_TO_COMPANY_FIELD_MAPPING, MAX_BATCH_ITEMS
+
+
+def to_int(value: Any) -> int:
+    """
+    Coerce a value to an int as pydantic would, rejecting numbers with a fraction.
+    """
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            value = float(value)
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{value!r} is not a whole number")
+        return int(value)
+    if isinstance(value, int):
+        return int(value)
+    raise ValueError(f"{value!r} is not a valid integer")
+
+
+def to_float(value: Any) -> float:
+    """
+    Coerce a number or numeric string to a float.
+    """
+    if isinstance(value, (str, int, float)):
+        return float(value)
+    raise ValueError(f"{value!r} is not a valid number")
+
+
+def to_str(value: Any) -> str:
+    """
+    Check a value is a string, as pydantic doesn't coerce other types to str.
+    """
+    if isinstance(value, str):
+        return value
+    raise ValueError(f"{value!r} is not a valid string")
+
+
+# Coercion for each Company field annotation, mirroring pydantic's lax validation
+COERCERS: Dict[Any, Callable[[Any], Any]] = {int: to_int, float: to_float, str: to_str}
 
 
 class Company(BaseModel):
@@ -52,6 +109,62 @@ class Company(BaseModel):
     def __str__(self) -> str:
         return self.company_name
 
+    @classmethod
+    def from_record(cls, record: "CompanyRecord") -> "Company":
+        """
+        Build a Company from an already validated record, skipping validation.
+
+        Attributes:
+            record (CompanyRecord): one value per field, in `COMPANY_FIELDS` order.
+        """
+        company = cls.__new__(cls)
+        # What model_construct does, without its per-call handling of defaults
+        object.__setattr__(company, "__dict__", dict(zip(COMPANY_FIELDS, record)))
+        object.__setattr__(company, "__pydantic_fields_set__", _ALL_FIELDS.copy())
+        object.__setattr__(company, "__pydantic_extra__", None)
+        object.__setattr__(company, "__pydantic_private__", None)
+        return company
+
+    @classmethod
+    def from_csv(cls, csv_data: Mapping[str, Any]) -> "Company":
+        """
+        Build a Company from CSV data, the fast equivalent of `Company(csv_data)`.
+
+        Attributes:
+            csv_data (dict): a dictionary of CSV data.
+        """
+        return cls.from_record(parse_csv_record(csv_data))
+
+    @classmethod
+    def validate_many(cls, rows: Iterable[Mapping[str, Any]]) -> List["Company"]:
+        """
+        Validate a batch of CSV rows or extracted records into Company objects.
+
+        Attributes:
+            rows (Iterable): dictionaries of CSV data.
+        """
+        rows = list(rows)
+        values = []
+        for i, row in enumerate(rows):
+            try:
+                values.append(_record_values(row))
+            except ValueError as e:
+                raise ValueError(f"Row {i} ({row.get('Company Name')}): {e}")
+        try:
+            records = _RECORDS_ADAPTER.validate_python(values)
+        except ValidationError as e:
+            i = e.errors()[0]["loc"][0]
+            raise ValueError(
+                f"Row {i} ({rows[i].get('Company Name')}): {_record_error(e)}"
+            ) from None
+        return [cls.from_record(record) for record in records]
+
+    def to_record(self) -> "CompanyRecord":
+        """
+        Get the values of the Company as a record, in `COMPANY_FIELDS` order.
+        """
+        return tuple(getattr(self, field) for field in COMPANY_FIELDS)
+
     def _parse_csv_data(self, csv_data: dict[str, Any]) -> ValueError | dict[str, Any]:
         """
         parse data from a CSV row into the dict.
@@ -73,22 +186,231 @@ class Company(BaseModel):
             raise ValueError(f"Error loading CSV data: {e}")
         return data
 
-    def compare(self, other: "Company") -> Dict[str, dict[str, Any]]:
+    def compare(
+        self,
+        other: "Company",
+        fields: Optional[Iterable[str]] = None,
+        only_mismatches: bool = False,
+    ) -> Dict[str, dict[str, Any]]:
+        """
+        Compare with another Company, field by field.
+
+        Fields left out by `fields` or `only_mismatches` are never built into the
+        result, so narrow comparisons stay cheap.
 
+        Attributes:
+            other (Company): the company to compare with.
+            fields (Iterable): the fields to compare, or None for every field.
+            only_mismatches (bool): whether to leave out the fields that match.
+        """
         if not isinstance(other, Company):
             raise TypeError("Can only compare with another Company instance")
 
+        if fields is None:
+            selected: Iterable[str] = self.model_fields
+        else:
+            wanted = set(fields)
+            unknown = wanted - _ALL_FIELDS
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            selected = [field for field in COMPANY_FIELDS if field in wanted]
+
         differences = {}
-        for field in self.model_fields:
+        for field in selected:
             try:
                 self_value = getattr(self, field)
                 other_value = getattr(other, field)
+                match = self_value == other_value
+                if match and only_mismatches:
+                    continue
                 differences[field] = {
                     "Current": self_value,
                     "New": other_value,
-                    "Match": self_value == other_value,
+                    "Match": match,
                 }
             except AttributeError as e:
                 print(f"Attribute {field} not found in the model fields: {e}")
                 continue
         return differences
+
+
+# Field names in declaration order; a CompanyRecord holds one value per field
+COMPANY_FIELDS: Tuple[str, ...] = tuple(Company.model_fields)
+CompanyRecord = Tuple[Any, ...]
+_ALL_FIELDS = set(COMPANY_FIELDS)
+
+# Model field name -> CSV column name
+COMPANY_FIELD_TO_CSV = {
+    model_key: csv_key for csv_key, model_key in CSV_TO_COMPANY_FIELD_MAPPING.items()
+}
+
+# (CSV column, whether required, default) for each field, worked out once
+_RECORD_FIELDS = tuple(
+    (
+        COMPANY_FIELD_TO_CSV[field],
+        info.is_required(),
+        None if info.is_required() else info.get_default(),
+    )
+    for field, info in Company.model_fields.items()
+)
+
+# Validate whole records with the model's own rules in a single call into pydantic
+_RECORD_TYPE = Tuple[tuple(info.annotation for info in Company.model_fields.values())]
+_RECORD_ADAPTER = TypeAdapter(_RECORD_TYPE)
+_RECORDS_ADAPTER = TypeAdapter(List[_RECORD_TYPE])
+
+
+def _record_values(csv_data: Mapping[str, Any]) -> List[Any]:
+    values = []
+    for csv_key, required, default in _RECORD_FIELDS:
+        value = csv_data.get(csv_key)
+        if value is None:
+            if required:
+                raise ValueError(f"Error loading CSV data: {csv_key} is missing")
+            value = default
+        values.append(value)
+    return values
+
+
+def _record_error(e: ValidationError) -> ValueError:
+    error = e.errors()[0]
+    csv_key = _RECORD_FIELDS[error["loc"][-1]][0]
+    return ValueError(f"Error loading CSV data: {csv_key}: {error['msg']}")
+
+
+def parse_csv_record(csv_data: Mapping[str, Any]) -> CompanyRecord:
+    """
+    Validate and coerce CSV data into a record, with the defaults of missing fields.
+
+    Attributes:
+        csv_data (dict): a dictionary of CSV data.
+    """
+    try:
+        return _RECORD_ADAPTER.validate_python(_record_values(csv_data))
+    except ValidationError as e:
+        raise _record_error(e) from None
+
+
+class CompareRequest(BaseModel):
+    """
+    A single company/PDF pair to compare.
+    """
+
+    company_name: str
+    pdf: str
+
+
+class CompareOptions(BaseModel):
+    """
+    Which fields of a comparison to return.
+
+    Attributes:
+        fields (tuple): the fields to compare, or None for every field.
+        only_mismatches (bool): whether to leave out the fields that match.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    fields: Optional[Tuple[str, ...]] = None
+    only_mismatches: bool = False
+
+    @field_validator("fields")
+    @classmethod
+    def _known_fields(
+        cls, fields: Optional[Tuple[str, ...]]
+    ) -> Optional[Tuple[str, ...]]:
+        if fields is not None:
+            unknown = set(fields) - _ALL_FIELDS
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return fields
+
+    def compare(self, current: Company, new: Company) -> Dict[str, dict[str, Any]]:
+        """
+        Compare two companies, returning only the selected fields.
+
+        Attributes:
+            current (Company): the company on file.
+            new (Company): the company extracted from a PDF.
+        """
+        return current.compare(
+            new, fields=self.fields, only_mismatches=self.only_mismatches
+        )
+
+    def select(
+        self, comparison: Dict[str, dict[str, Any]]
+    ) -> Dict[str, dict[str, Any]]:
+        """
+        Narrow down a comparison of every field, e.g. one read back from a store.
+
+        Attributes:
+            comparison (dict): the comparison of every field.
+        """
+        return {
+            field: values
+            for field, values in comparison.items()
+            if (self.fields is None or field in self.fields)
+            and not (self.only_mismatches and values["Match"])
+        }
+
+
+class BatchCompareRequest(BaseModel):
+    """
+    A batch of company/PDF pairs to compare in one call.
+    """
+
+    items: List[CompareRequest] = Field(max_length=MAX_BATCH_ITEMS)
+    concurrency: Optional[int] = Field(
+        default=None, ge=1, title="Maximum number of concurrent extractions"
+    )
+
+
+class BatchCompareResult(BaseModel):
+    """
+    The outcome of one item of a batch comparison, either a result or an error.
+    """
+
+    company_name: str
+    pdf: str
+    result: Optional[Dict[str, dict[str, Any]]] = None
+    error: Optional[str] = None
+
+
+class JobRequest(BaseModel):
+    """
+    A reconciliation to run in the background: the given company/PDF pairs, or
+    every company in the database with its PDF when `items` is left out.
+    """
+
+    items: Optional[List[CompareRequest]] = None
+
+
+class JobSummary(BaseModel):
+    """
+    The state of a background reconciliation, without its results.
+
+    Attributes:
+        job_id (str): the id to poll or cancel the job by.
+        status (str): "queued", "running", "completed", "cancelled" or "failed".
+        total (int): the number of comparisons in the job, once known.
+        completed (int): the number of comparisons done.
+        error (str): why the job failed, if it did.
+    """
+
+    job_id: str
+    status: Literal["queued", "running", "completed", "cancelled", "failed"]
+    total: Optional[int] = None
+    completed: int = 0
+    error: Optional[str] = None
+
+
+class JobStatus(JobSummary):
+    """
+    The state of a background reconciliation and its results so far.
+
+    Attributes:
+        results (list): the result or error of each comparison done, in order, from
+            the first one asked for.
+    """
+
+    results: List[BatchCompareResult] = []
@@ -0,0 +1,259 @@
+import heapq
+import math
+import re
+from array import array
+from collections import Counter
+from typing import Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from src.layered_dict import LayeredDict
+
+# Similarity a name needs to be taken as a match for a query, from 0 to 1
+DEFAULT_THRESHOLD = 0.8
+
+_NON_ALPHANUMERIC = re.compile(r"[\W_]+")
+# How many of their rarest trigrams similar names must share to be scored
+_PREFIX_OVERLAP = 2
+
+
+def compact_name(name: str) -> str:
+    """
+    Reduce a company name to its lower-case letters and digits, so "Finance LLC",
+    "financellc" and "FinanceLLC." all give the same key.
+
+    Attributes:
+        name (str): the name of a company.
+    """
+    return _NON_ALPHANUMERIC.sub("", name.casefold())
+
+
+def _trigrams(compact: str) -> Set[str]:
+    # Padded so the start and end of a name weigh as much as its middle
+    padded = f"${compact}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class NameMatch(NamedTuple):
+    """
+    A candidate match for a queried name.
+
+    Attributes:
+        name (str): the indexed name.
+        score (float): the similarity of the name to the query, from 0 to 1.
+    """
+
+    name: str
+    score: float
+
+
+class NameIndex:
+    """
+    An index resolving misspelt or differently punctuated company names to the
+    indexed names they most likely mean.
+
+    Names that are equal once compacted match directly. Anything else is scored by
+    the Dice similarity of its trigrams against candidates found with prefix
+    filtering: trigrams are ranked from rarest to most common across all names, and
+    two names that are similar enough must share two of their few rarest trigrams.
+    Only those are indexed and looked up, and only names found under two of them
+    are scored, so a lookup scores a handful of names rather than every one.
+    """
+
+    def __init__(
+        self, names: Iterable[str], threshold: float = DEFAULT_THRESHOLD
+    ) -> None:
+        """
+        Build the index.
+
+        Attributes:
+            names (Iterable): the names to index; the first of names that compact alike is matched.
+            threshold (float): the similarity a name needs to match, above 0 and at most 1.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(
+                f"Threshold must be above 0 and at most 1, not {threshold}"
+            )
+        self.threshold = threshold
+        # Each compacted name's id and every name that compacts to it, the first of
+        # which is matched. Ids are only ever appended, and shared with copies.
+        entries: dict = {}
+        self._compact: List[str] = []
+        # The number of distinct trigrams of each name, to rule out candidates cheaply
+        self._sizes = array("H")
+        frequencies: Counter = Counter()
+        for name in names:
+            compact = compact_name(name)
+            if not compact:
+                continue
+            entry = entries.get(compact)
+            if entry is not None:
+                if name not in entry[1]:
+                    entries[compact] = (entry[0], entry[1] + (name,))
+                continue
+            entries[compact] = (len(self._compact), (name,))
+            self._compact.append(compact)
+            grams = _trigrams(compact)
+            self._sizes.append(min(len(grams), 0xFFFF))
+            frequencies.update(grams)
+
+        # Rarest first, with ties broken by the trigram so the order is total
+        ranks = {
+            gram: rank
+            for rank, gram in enumerate(
+                sorted(frequencies, key=lambda gram: (frequencies[gram], gram))
+            )
+        }
+        postings: dict = {}
+        self._ranks = ranks
+        for i, compact in enumerate(self._compact):
+            for gram in self._prefix(_trigrams(compact)):
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = array("I")
+                ids.append(i)
+        # Copied on write, so copies only copy what they change
+        self._entries = LayeredDict(entries)
+        self._ranks = LayeredDict(ranks)
+        self._postings = LayeredDict(postings)
+        # The postings this index may append to, as no copy shares them
+        self._owned: Set[str] = set(postings)
+        return None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, name: str) -> None:
+        """
+        Add a name to the index.
+
+        Attributes:
+            name (str): the name to add; ignored if already in. A name that compacts
+                like one already in is only matched once the names before it are removed.
+        """
+        compact = compact_name(name)
+        if not compact:
+            return None
+        entry: Optional[Tuple[int, Tuple[str, ...]]] = self._entries.get(compact)
+        if entry is not None:
+            if name not in entry[1]:
+                self._entries[compact] = (entry[0], entry[1] + (name,))
+            return None
+        i = len(self._compact)
+        self._compact.append(compact)
+        grams = _trigrams(compact)
+        self._sizes.append(min(len(grams), 0xFFFF))
+        self._entries[compact] = (i, (name,))
+        # New trigrams rank as the most common, which keeps the order total; lookups
+        # are correct under any fixed order, and only slower under a poor one
+        for gram in grams:
+            if gram not in self._ranks:
+                self._ranks[gram] = len(self._ranks)
+        for gram in self._prefix(grams):
+            ids = self._postings.get(gram)
+            if gram not in self._owned:
+                ids = array("I", ids or ())
+                self._postings[gram] = ids
+                self._owned.add(gram)
+            ids.append(i)
+        return None
+
+    def remove(self, name: str) -> None:
+        """
+        Remove a name from the index. Other names that compact alike stay matched.
+
+        Attributes:
+            name (str): the name to remove, as it was added.
+        """
+        compact = compact_name(name)
+        entry = self._entries.get(compact)
+        if entry is None or name not in entry[1]:
+            return None
+        names = list(entry[1])
+        names.remove(name)
+        if names:
+            self._entries[compact] = (entry[0], tuple(names))
+        else:
+            # Its id stays in the postings, and is skipped by lookups
+            del self._entries[compact]
+        return None
+
+    def copy(self) -> "NameIndex":
+        """
+        Copy the index, so the copy can be changed while the original is in use.
+
+        Only the changes since the last copy are copied: each then copies the
+        postings of a trigram before its first change to them.
+        """
+        other = NameIndex.__new__(NameIndex)
+        other.threshold = self.threshold
+        # Appended to by either, but each only looks up the ids it added
+        other._compact = self._compact
+        other._sizes = self._sizes
+        other._entries = self._entries.copy()
+        other._ranks = self._ranks.copy()
+        other._postings = self._postings.copy()
+        other._owned = set()
+        self._owned = set()
+        return other
+
+    def best_match(self, query: str) -> Optional[str]:
+        """
+        Get the indexed name most similar to a query, or None if none reaches the
+        threshold.
+
+        Attributes:
+            query (str): the name to resolve.
+        """
+        entry = self._entries.get(compact_name(query))
+        if entry is not None:
+            return entry[1][0]
+        matches = self.top_k(query, k=1)
+        return matches[0].name if matches else None
+
+    def top_k(self, query: str, k: int = 5) -> List[NameMatch]:
+        """
+        Get up to `k` indexed names at least as similar to a query as the threshold,
+        most similar first, with ties in the order the names were indexed.
+
+        Attributes:
+            query (str): the name to resolve.
+            k (int): the most matches to return.
+        """
+        compact = compact_name(query)
+        if not compact:
+            return []
+        grams = _trigrams(compact)
+        hits: Counter = Counter()
+        for gram in self._prefix(grams):
+            hits.update(self._postings.get(gram, ()))
+        least = min(_PREFIX_OVERLAP, self._overlap(len(grams)))
+
+        # Names too much shorter or longer than the query can't reach the threshold
+        size = len(grams)
+        t = self.threshold
+        smallest, largest = size * t / (2 - t), size * (2 - t) / t
+        sizes = self._sizes
+        scored = []
+        entries = self._entries
+        for i, count in hits.items():
+            if count < least or not smallest <= sizes[i] <= largest:
+                continue
+            entry = entries.get(self._compact[i])
+            if entry is None or entry[0] != i:
+                # Removed, or added by a copy
+                continue
+            other = _trigrams(self._compact[i])
+            score = 2 * len(grams & other) / (len(grams) + len(other))
+            if score >= self.threshold:
+                scored.append((score, -i, entry[1][0]))
+        return [NameMatch(name, score) for score, _, name in heapq.nlargest(k, scored)]
+
+    def _overlap(self, size: int) -> int:
+        # Names with Dice similarity >= t share at least t*|x|/(2-t) of the trigrams
+        # of either name x
+        return math.ceil(self.threshold * size / (2 - self.threshold))
+
+    def _prefix(self, grams: Set[str]) -> List[str]:
+        # Two names sharing at least o trigrams share k of the first |x| - o + k of
+        # each name x's trigrams in rank order. Trigrams no name has rank rarest.
+        ranked = sorted(grams, key=lambda gram: self._ranks.get(gram, -1))
+        return ranked[: len(grams) - self._overlap(len(grams)) + _PREFIX_OVERLAP]
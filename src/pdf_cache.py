@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, Protocol
+
+
+class PdfExtractor(Protocol):
+    """
+    Anything that extracts company data from a PDF like `PdfService` does.
+    """
+
+    def extract(self, file_path: str) -> dict[str, Any]: ...
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters describing how the extraction cache has been used.
+
+    Attributes:
+        hits (int): extractions served from memory.
+        disk_hits (int): extractions served from the on-disk tier.
+        misses (int): extractions that had to go to the PDF service.
+        evictions (int): entries dropped from memory to stay within the size limit.
+        bypasses (int): extractions of files that could not be read and hashed locally.
+    """
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bypasses: int = 0
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Hash the contents of a file.
+
+    Attributes:
+        file_path (str): the path of the file to hash.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pdf_digest(service: PdfExtractor, file_path: str) -> Optional[str]:
+    """
+    Hash the contents of a PDF, or None if it can't be read locally, reusing the
+    service's hashes when it keeps them like `CachedPdfService` does.
+
+    Attributes:
+        service (PdfExtractor): the service the PDF is extracted with.
+        file_path (str): the path of the PDF file.
+    """
+    digest = getattr(service, "digest", None)
+    if digest is not None:
+        return digest(file_path)
+    try:
+        return file_digest(file_path)
+    except OSError:
+        return None
+
+
+class CachedPdfService:
+    """
+    Wraps a PDF service and caches its results by the hash of the PDF's bytes.
+
+    Results are kept in a bounded in-memory LRU and, when `cache_dir` is given, in
+    JSON files named by hash so they survive restarts. The same file under another
+    path is a hit, and a file that changes in place is a miss.
+
+    Files that can't be read locally can't be hashed, so they go straight to the
+    wrapped service, which stays the authority on missing or invalid files.
+    """
+
+    def __init__(
+        self,
+        service: PdfExtractor,
+        max_entries: int = 256,
+        cache_dir: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the cache in front of a PDF service.
+
+        Attributes:
+            service (PdfExtractor): the PDF service to cache the results of.
+            max_entries (int): the number of results to hold in memory.
+            cache_dir (str): an optional directory for the on-disk tier.
+        """
+        self.service = service
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        # path -> (mtime_ns, size, digest), so unchanged files aren't re-hashed per call
+        self._digests: OrderedDict[str, tuple[int, int, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        return None
+
+    def extract(self, file_path: str) -> dict[str, Any]:
+        """
+        Extract data from a PDF, using a cached result if the file has been seen before.
+
+        Attributes:
+            file_path (str): the path of the PDF file to extract data from.
+        """
+        digest = self.digest(file_path)
+        if digest is None:
+            with self._lock:
+                self.stats.bypasses += 1
+            return self.service.extract(file_path=file_path)
+
+        with self._lock:
+            result = self._memory.get(digest)
+            if result is not None:
+                self._memory.move_to_end(digest)
+                self.stats.hits += 1
+                return dict(result)
+
+        result = self._read_disk(digest)
+        if result is not None:
+            with self._lock:
+                self.stats.disk_hits += 1
+                self._remember(digest, result)
+            return dict(result)
+
+        result = self.service.extract(file_path=file_path)
+        with self._lock:
+            self.stats.misses += 1
+            self._remember(digest, result)
+        self._write_disk(digest, result)
+        return dict(result)
+
+    def cache_stats(self) -> dict[str, int]:
+        """
+        Get a snapshot of the cache counters.
+        """
+        with self._lock:
+            return asdict(self.stats)
+
+    def digest(self, file_path: str) -> Optional[str]:
+        """
+        Hash the contents of a PDF, or None if it can't be read locally. Files are
+        only hashed again once their size or modification time changes.
+
+        Attributes:
+            file_path (str): the path of the PDF file.
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        with self._lock:
+            known = self._digests.get(file_path)
+        if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+        try:
+            digest = file_digest(file_path)
+        except OSError:
+            return None
+        with self._lock:
+            self._digests[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+            self._digests.move_to_end(file_path)
+            while len(self._digests) > self.max_entries * 4:
+                self._digests.popitem(last=False)
+        return digest
+
+    def _remember(self, digest: str, result: dict[str, Any]) -> None:
+        # Callers must hold the lock
+        self._memory[digest] = result
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _disk_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _read_disk(self, digest: str) -> Optional[dict[str, Any]]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(digest)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, digest: str, result: dict[str, Any]) -> None:
+        if not self.cache_dir:
+            return None
+        # Write then rename, so a crash never leaves a half-written entry behind
+        tmp_path = f"{self._disk_path(digest)}.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, self._disk_path(digest))
+        return None
@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from src.database import normalize_company_name
+from src.models import COERCERS, COMPANY_FIELD_TO_CSV, Company
+
+
+@dataclass(frozen=True)
+class Tolerance:
+    """
+    How far apart two float values can be and still match, as in `math.isclose`.
+
+    Attributes:
+        abs (float): the absolute tolerance.
+        rel (float): the tolerance relative to the larger of the two values.
+    """
+
+    abs: float = 0.0
+    rel: float = 0.0
+
+
+# Column dtype for each Company field annotation
+_COLUMN_DTYPES: Dict[Any, Any] = {int: np.int64, float: np.float64, str: object}
+
+
+class PortfolioComparison:
+    """
+    Compares every company in a portfolio at once.
+
+    Database rows and extracted records are loaded into one NumPy array per field,
+    aligned by company, so each field's matches are computed in a single vectorized
+    operation rather than company by company.
+    """
+
+    def __init__(
+        self,
+        db_rows: Iterable[Mapping[str, Any]],
+        extracted: Iterable[Mapping[str, Any]],
+        tolerances: Optional[Mapping[str, Tolerance]] = None,
+    ) -> None:
+        """
+        Load and compare the portfolio.
+
+        Only companies present in both sources are compared; the names of extracted
+        records with no database row are kept in `missing`.
+
+        Attributes:
+            db_rows (Iterable): the CSV rows of the data on file.
+            extracted (Iterable): the data extracted from each company's PDF.
+            tolerances (Mapping): optional tolerances for float fields, by field name.
+        """
+        self.tolerances = dict(tolerances or {})
+        for field in self.tolerances:
+            if Company.model_fields.get(field) is None or (
+                Company.model_fields[field].annotation is not float
+            ):
+                raise ValueError(f"Tolerances only apply to float fields, not {field}")
+
+        rows_by_name: Dict[str, Mapping[str, Any]] = {}
+        for row in db_rows:
+            rows_by_name.setdefault(normalize_company_name(row["Company Name"]), row)
+
+        current_rows: List[Mapping[str, Any]] = []
+        new_rows: List[Mapping[str, Any]] = []
+        self.names: List[str] = []
+        self.missing: List[str] = []
+        for record in extracted:
+            row = rows_by_name.get(normalize_company_name(record["Company Name"]))
+            if row is None:
+                self.missing.append(record["Company Name"])
+                continue
+            current_rows.append(row)
+            new_rows.append(record)
+            self.names.append(row["Company Name"])
+        self._positions = {
+            normalize_company_name(name): i for i, name in enumerate(self.names)
+        }
+
+        self.current = {
+            field: self._column(current_rows, field) for field in Company.model_fields
+        }
+        self.new = {
+            field: self._column(new_rows, field) for field in Company.model_fields
+        }
+        self.matches = {field: self._match(field) for field in Company.model_fields}
+        return None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def compare(self, company_name: str) -> Dict[str, dict[str, Any]]:
+        """
+        Get the comparison of one company, in the same form as `Company.compare`.
+
+        Attributes:
+            company_name (str): the name of the company.
+        """
+        i = self._positions.get(normalize_company_name(company_name))
+        if i is None:
+            raise LookupError(f"Company {company_name} not found in the portfolio")
+        return {
+            field: {
+                "Current": _python_value(self.current[field][i]),
+                "New": _python_value(self.new[field][i]),
+                "Match": bool(self.matches[field][i]),
+            }
+            for field in Company.model_fields
+        }
+
+    def mismatch_counts(self) -> Dict[str, int]:
+        """
+        Get the number of companies that don't match, per field.
+        """
+        return {
+            field: int(len(mask) - np.count_nonzero(mask))
+            for field, mask in self.matches.items()
+        }
+
+    def mismatched_companies(self, field: str) -> List[str]:
+        """
+        Get the names of the companies whose value for a field doesn't match.
+
+        Attributes:
+            field (str): the name of a Company field.
+        """
+        return [self.names[i] for i in np.flatnonzero(~self.matches[field])]
+
+    def _column(self, rows: List[Mapping[str, Any]], field: str) -> np.ndarray:
+        info = Company.model_fields[field]
+        coerce = COERCERS[info.annotation]
+        dtype = _COLUMN_DTYPES[info.annotation]
+        csv_key = COMPANY_FIELD_TO_CSV[field]
+        values = []
+        for row in rows:
+            value = row.get(csv_key)
+            if value is None:
+                if info.is_required():
+                    raise ValueError(
+                        f"{row.get('Company Name')}: missing required field {field}"
+                    )
+                values.append(info.default)
+                continue
+            try:
+                values.append(coerce(value))
+            except ValueError as e:
+                raise ValueError(f"{row.get('Company Name')}: {field}: {e}")
+        return np.array(values, dtype=dtype)
+
+    def _match(self, field: str) -> np.ndarray:
+        current, new = self.current[field], self.new[field]
+        tolerance = self.tolerances.get(field)
+        if tolerance is None:
+            return current == new
+        allowed = np.maximum(
+            tolerance.abs, tolerance.rel * np.maximum(np.abs(current), np.abs(new))
+        )
+        return np.abs(current - new) <= allowed
+
+
+def _python_value(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,148 @@
+import hmac
+import json
+import os
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+
+import anyio
+
+if TYPE_CHECKING:
+    import cProfile
+
+# Query parameter values that turn profiling on
+_ON = {"1", "true", "yes"}
+
+
+def summarize_profile(profiler: "cProfile.Profile", top: int = 25) -> Dict[str, Any]:
+    """
+    Summarize a profile by its total time and the functions it spent the most time
+    in, not counting what they called.
+
+    Attributes:
+        profiler (Profile): the finished profile.
+        top (int): the number of functions to list.
+    """
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    rows = sorted(
+        stats.stats.items(),  # type: ignore[attr-defined]
+        key=lambda item: item[1][2],
+        reverse=True,
+    )
+    functions = []
+    for (file, line, function), (_, calls, self_time, cumulative, _) in rows[:top]:
+        functions.append(
+            {
+                "function": function,
+                "file": os.path.relpath(file) if os.path.isabs(file) else file,
+                "line": line,
+                "calls": calls,
+                "self_seconds": round(self_time, 6),
+                "cumulative_seconds": round(cumulative, 6),
+            }
+        )
+    return {
+        "total_seconds": round(stats.total_tt, 6),  # type: ignore[attr-defined]
+        "functions": functions,
+    }
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling single requests on demand.
+
+    A request with `?profile=1` and the service's API key in an X-API-Key header is
+    run under cProfile, and its response is replaced by
+    `{"result": <the response>, "profile": {...}}` listing the hottest functions.
+    The profiler covers the event loop thread, so work the endpoint hands to a
+    thread pool shows as time spent waiting for it, and requests running alongside
+    on the loop are counted too. One request is profiled at a time, and requests
+    without the parameter only cost a check of their query string. Profiling is
+    off when the service has no API key.
+    """
+
+    def __init__(
+        self, app: Callable[..., Awaitable[None]], api_key: str, top: int = 25
+    ) -> None:
+        self.app = app
+        self.api_key = api_key.encode()
+        self.top = top
+        self._busy = anyio.Lock()
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or b"profile=" not in scope["query_string"]:
+            await self.app(scope, receive, send)
+            return
+        query = parse_qs(scope["query_string"].decode())
+        if query.get("profile", [""])[-1].lower() not in _ON:
+            await self.app(scope, receive, send)
+            return
+
+        # Compared as bytes, as headers needn't be valid UTF-8, let alone ASCII
+        api_key = dict(scope["headers"]).get(b"x-api-key", b"")
+        if not self.api_key or not hmac.compare_digest(api_key, self.api_key):
+            await _send_json(send, 403, {"detail": "Profiling needs a valid X-API-Key"})
+            return
+        if self._busy.locked():
+            await _send_json(
+                send, 429, {"detail": "Another request is being profiled, try again"}
+            )
+            return
+
+        async with self._busy:
+            await self._profile(scope, receive, send)
+
+    async def _profile(self, scope: dict, receive: Callable, send: Callable) -> None:
+        # A 304 has no result to return, so conditional headers are dropped
+        scope = {
+            **scope,
+            "headers": [
+                (name, value)
+                for name, value in scope["headers"]
+                if name != b"if-none-match"
+            ],
+        }
+        start: Optional[dict] = None
+        chunks: List[bytes] = []
+
+        async def capture(message: dict) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        # Imported here, so the profiler is only loaded once a request asks for it
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            profiler.disable()
+
+        body = b"".join(chunks)
+        status = start["status"] if start is not None else 500
+        response_headers = dict(start["headers"]) if start is not None else {}
+        result: Any = body.decode(errors="replace")
+        if response_headers.get(b"content-type", b"").startswith(b"application/json"):
+            result = json.loads(body) if body else None
+        profile = summarize_profile(profiler, self.top)
+        await _send_json(send, status, {"result": result, "profile": profile})
+
+
+async def _send_json(send: Callable, status: int, content: Any) -> None:
+    body = json.dumps(content).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,212 @@
+"""
+Reconcile a directory of PDFs against the company database from the command line.
+
+    python -m src.reconcile --pdf-dir pdfs/ --db data/database.csv --out results.jsonl
+
+Each PDF is matched to the company it is named after, e.g. "healthinc.pdf" for
+"HealthInc". The work is sharded across a process pool whose workers each load the
+database once, results are written as they arrive, and a summary of mismatch counts
+per field is printed at the end.
+
+With `--history DIR`, the extracted data is also kept in a history store (see
+`src.history`) as each company's data for `--quarter`, e.g. 2025Q1.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import IO, Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from src.constants import DATABASE_CSV_PATH
+from src.database import DatabaseClient
+from src.history import HistoryStore, current_quarter, parse_quarter
+from src.metrics import METRICS
+from src.models import COMPANY_FIELDS, Company
+from src.pdf_cache import PdfExtractor
+from src.pdf_service import PdfService
+from src.reconciliation import compare_company, pdf_name
+
+CSV_COLUMNS = ["company_name", "pdf", "mismatched_fields", "error"]
+
+# State of a worker process, set up once by _init_worker
+_db_client: Optional[DatabaseClient] = None
+_pdf_service: Optional[PdfExtractor] = None
+_companies_by_pdf: Dict[str, str] = {}
+
+
+def _init_worker(
+    db_file: str,
+    snapshot_file: Optional[str],
+    pdf_service_factory: Callable[[], PdfExtractor],
+) -> None:
+    global _db_client, _pdf_service, _companies_by_pdf
+    _db_client = DatabaseClient(db_file, snapshot_file=snapshot_file)
+    _pdf_service = pdf_service_factory()
+    _companies_by_pdf = {}
+    for row in _db_client:
+        _companies_by_pdf.setdefault(pdf_name(row["Company Name"]), row["Company Name"])
+
+
+def _reconcile_pdf(file_path: str) -> Dict[str, Any]:
+    pdf, _ = os.path.splitext(os.path.basename(file_path))
+    company_name = _companies_by_pdf.get(pdf)
+    outcome: Dict[str, Any] = {"company_name": company_name, "pdf": pdf}
+    if company_name is None:
+        return {**outcome, "error": f"No company found for PDF {pdf}"}
+    try:
+        result = compare_company(
+            company_name=company_name,
+            file_path=file_path,
+            db_client=_db_client,
+            pdf_service=_pdf_service,
+        )
+    except (FileNotFoundError, ValueError, LookupError) as e:
+        METRICS.count_error(e)
+        return {**outcome, "error": str(e)}
+    mismatched = [field for field, values in result.items() if not values["Match"]]
+    return {**outcome, "result": result, "mismatched_fields": mismatched}
+
+
+def _default_pdf_service(api_key: str) -> PdfExtractor:
+    return PdfService(api_key)
+
+
+def reconcile(
+    pdf_dir: str,
+    db_file: str,
+    out: IO[str],
+    output_format: str = "jsonl",
+    workers: Optional[int] = None,
+    snapshot_file: Optional[str] = None,
+    pdf_service_factory: Optional[Callable[[], PdfExtractor]] = None,
+    history_dir: Optional[str] = None,
+    quarter: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Reconcile every PDF in a directory, writing each result to `out` as it arrives,
+    and return a summary.
+
+    Attributes:
+        pdf_dir (str): the directory of PDFs to reconcile.
+        db_file (str): the path to the database CSV file.
+        out (IO): where to write the results.
+        output_format (str): "jsonl" or "csv".
+        workers (int): the number of worker processes, one per core if None.
+        snapshot_file (str): an optional snapshot of the database for workers to map.
+        pdf_service_factory (Callable): builds each worker's PDF service; must be picklable.
+        history_dir (str): an optional history store to keep the extracted data in.
+        quarter (str): the quarter the PDFs report on, by default the current one.
+    """
+    quarter = parse_quarter(quarter) if quarter else current_quarter()
+    history = HistoryStore(history_dir) if history_dir else None
+    if pdf_service_factory is None:
+        pdf_service_factory = partial(_default_pdf_service, os.environ["API_KEY"])
+    paths = sorted(
+        os.path.join(pdf_dir, name)
+        for name in os.listdir(pdf_dir)
+        if name.lower().endswith(".pdf")
+    )
+    workers = workers or os.cpu_count() or 1
+    # Big enough chunks to amortise inter-process overhead, small enough to balance
+    chunksize = max(1, len(paths) // (workers * 4))
+
+    writer = csv.DictWriter(out, CSV_COLUMNS) if output_format == "csv" else None
+    if writer is not None:
+        writer.writeheader()
+
+    mismatches: Counter = Counter()
+    summary: Dict[str, Any] = {"pdfs": len(paths), "matched": 0, "errors": 0}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(db_file, snapshot_file, pdf_service_factory),
+    ) as pool:
+        for outcome in pool.map(_reconcile_pdf, paths, chunksize=chunksize):
+            if "error" in outcome:
+                summary["errors"] += 1
+            elif not outcome["mismatched_fields"]:
+                summary["matched"] += 1
+            mismatches.update(outcome.get("mismatched_fields", []))
+            if history is not None and "result" in outcome:
+                # Every field is compared, so the result holds all the extracted data
+                new = tuple(outcome["result"][field]["New"] for field in COMPANY_FIELDS)
+                history.record(
+                    outcome["company_name"], quarter, Company.from_record(new)
+                )
+
+            if writer is not None:
+                writer.writerow(
+                    {
+                        "company_name": outcome["company_name"],
+                        "pdf": outcome["pdf"],
+                        "mismatched_fields": ";".join(
+                            outcome.get("mismatched_fields", [])
+                        ),
+                        "error": outcome.get("error", ""),
+                    }
+                )
+            else:
+                out.write(json.dumps(outcome) + "\n")
+            out.flush()
+
+    if history is not None:
+        history.flush()
+    summary["mismatches_by_field"] = dict(mismatches.most_common())
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Reconcile a directory of PDFs against the company database."
+    )
+    parser.add_argument("--pdf-dir", required=True, help="the directory of PDFs")
+    parser.add_argument("--db", default=DATABASE_CSV_PATH, help="the database CSV")
+    parser.add_argument("--snapshot", help="an optional snapshot of the database")
+    parser.add_argument("--out", required=True, help="where to write the results")
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "csv"],
+        help="the format of the results (default: from the --out extension)",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="worker processes (default: one per core)"
+    )
+    parser.add_argument(
+        "--history", help="an optional history store to keep the extracted data in"
+    )
+    parser.add_argument(
+        "--quarter", help="the quarter the PDFs report on (default: the current one)"
+    )
+    args = parser.parse_args(argv)
+    if args.quarter:
+        try:
+            parse_quarter(args.quarter)
+        except ValueError as e:
+            parser.error(str(e))
+
+    output_format = args.format or ("csv" if args.out.endswith(".csv") else "jsonl")
+    with open(args.out, "w", newline="") as out:
+        summary = reconcile(
+            args.pdf_dir,
+            args.db,
+            out,
+            output_format=output_format,
+            workers=args.workers,
+            snapshot_file=args.snapshot,
+            history_dir=args.history,
+            quarter=args.quarter,
+        )
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
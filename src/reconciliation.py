@@ -0,0 +1,140 @@
+import os
+from typing import Any, Optional
+
+from src.constants import PDF_PATH_TEMPLATE
+from src.database import CompanyDatabase
+from src.history import HistoryStore, current_quarter
+from src.metrics import METRICS
+from src.models import BatchCompareResult, Company, CompareOptions
+from src.pdf_cache import PdfExtractor
+from src.summary import SUMMARY
+
+# Compares every field, when callers don't ask for fewer
+_EVERY_FIELD = CompareOptions()
+
+
+def pdf_path(pdf: str, pdf_dir: Optional[str] = None) -> str:
+    """
+    Build the file path the PDF service expects for a named PDF.
+
+    Attributes:
+        pdf (str): the name of the PDF file, not including the file path or extension.
+        pdf_dir (str): an optional directory holding the PDF, instead of the default.
+    """
+    if pdf_dir is not None:
+        return os.path.join(pdf_dir, f"{pdf}.pdf")
+    return PDF_PATH_TEMPLATE.format(pdf=pdf)
+
+
+def pdf_name(company_name: str) -> str:
+    """
+    Get the name of the PDF holding a company's data, e.g. "healthinc" for "HealthInc".
+
+    Attributes:
+        company_name (str): the name of the company.
+    """
+    return "".join(company_name.split()).casefold()
+
+
+def compare_company(
+    company_name: str,
+    file_path: str,
+    db_client: CompanyDatabase,
+    pdf_service: PdfExtractor,
+    options: Optional[CompareOptions] = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Compare the data extracted from a PDF with the data stored in the database.
+
+    Raises FileNotFoundError, ValueError or LookupError for bad input, which callers
+    surface to users rather than treating as server errors.
+
+    Attributes:
+        company_name (str): the name of the company to compare.
+        file_path (str): the path of the PDF file to extract data from.
+        db_client (CompanyDatabase): the client holding the data on file.
+        pdf_service (PdfExtractor): the service used to extract data from the PDF.
+        options (CompareOptions): which fields to return, or None for all of them.
+    """
+    # Extract data from the PDF
+    with METRICS.time("pdf_extract"):
+        pdf_data = pdf_service.extract(file_path=file_path)
+    return compare_extracted(
+        company_name=company_name,
+        pdf_data=pdf_data,
+        db_client=db_client,
+        options=options,
+    )
+
+
+def compare_extracted(
+    company_name: str,
+    pdf_data: dict[str, Any],
+    db_client: CompanyDatabase,
+    options: Optional[CompareOptions] = None,
+    quarter: Optional[str] = None,
+    history: Optional[HistoryStore] = None,
+    summary_source: Optional[str] = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Compare data already extracted from a PDF with the data stored in the database.
+
+    Every field is added to the portfolio summary (see `src.summary`), whichever
+    fields `options` returns, and the extracted data is kept in `history` if given.
+
+    Attributes:
+        company_name (str): the name of the company to compare.
+        pdf_data (dict): the data extracted from the PDF.
+        db_client (CompanyDatabase): the client holding the data on file.
+        options (CompareOptions): which fields to return, or None for all of them.
+        quarter (str): the quarter the PDF reports on, by default the current one.
+        history (HistoryStore): an optional store to keep the extracted data in.
+        summary_source (str): an optional id to add the comparison to the summary again by.
+    """
+    # Get the company from the database, validated when the database was loaded
+    with METRICS.time("db_lookup"):
+        current_company = db_client.get_company(company_name=company_name)
+
+    # Initialize a Company object with the extracted data
+    with METRICS.time("model_build"):
+        new_company = Company.from_csv(pdf_data)
+
+    quarter = quarter or current_quarter()
+    SUMMARY.add(current_company, new_company, quarter, source=summary_source)
+    if history is not None:
+        history.record(current_company.company_name, quarter, new_company)
+
+    # Return a summary of the data, noting which fields did not match
+    with METRICS.time("compare"):
+        return (options or _EVERY_FIELD).compare(current_company, new_company)
+
+
+def compare_pair(
+    company_name: str,
+    pdf: str,
+    db_client: CompanyDatabase,
+    pdf_service: PdfExtractor,
+    options: Optional[CompareOptions] = None,
+) -> BatchCompareResult:
+    """
+    Compare a company with a named PDF, capturing bad input as an error on the result.
+
+    Attributes:
+        company_name (str): the name of the company to compare.
+        pdf (str): the name of the PDF file, not including the file path or extension.
+        db_client (CompanyDatabase): the client holding the data on file.
+        pdf_service (PdfExtractor): the service used to extract data from the PDF.
+        options (CompareOptions): which fields to return, or None for all of them.
+    """
+    try:
+        result = compare_company(
+            company_name=company_name,
+            file_path=pdf_path(pdf),
+            db_client=db_client,
+            pdf_service=pdf_service,
+            options=options,
+        )
+    except (FileNotFoundError, ValueError, LookupError) as e:
+        METRICS.count_error(e)
+        return BatchCompareResult(company_name=company_name, pdf=pdf, error=str(e))
+    return BatchCompareResult(company_name=company_name, pdf=pdf, result=result)
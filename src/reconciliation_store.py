@@ -0,0 +1,219 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Mapping, Optional, Tuple
+
+from src.database import CompanyDatabase, normalize_company_name
+from src.metrics import METRICS
+from src.models import BatchCompareResult, CompareOptions
+from src.pdf_cache import PdfExtractor, pdf_digest
+from src.reconciliation import compare_company, pdf_path
+
+
+def row_hash(row: Mapping[str, Any]) -> str:
+    """
+    Hash the content of a database row, independent of the order of its columns.
+
+    Attributes:
+        row (Mapping): the row to hash.
+    """
+    encoded = json.dumps(row, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass
+class StoredComparison:
+    """
+    The last comparison of a company with a PDF, and the inputs it was made from.
+
+    Attributes:
+        row_hash (str): the hash of the database row.
+        pdf_hash (str): the hash of the PDF's bytes.
+        result (dict): the comparison.
+    """
+
+    row_hash: str
+    pdf_hash: str
+    result: dict[str, dict[str, Any]]
+
+
+class ReconciliationStore:
+    """
+    A SQLite file holding the last comparison of each company with each PDF.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the store, creating it if needed.
+
+        Attributes:
+            path (str): the path of the SQLite file.
+        """
+        # Imported here, so the app only loads SQLite support when a store is configured
+        import sqlite3
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS comparisons (
+                    company_key TEXT NOT NULL,
+                    pdf TEXT NOT NULL,
+                    row_hash TEXT NOT NULL,
+                    pdf_hash TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (company_key, pdf)
+                )
+                """)
+        return None
+
+    def get(self, company_name: str, pdf: str) -> Optional[StoredComparison]:
+        """
+        Get the stored comparison of a company with a PDF, if there is one.
+
+        Attributes:
+            company_name (str): the name of the company.
+            pdf (str): the name of the PDF.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT row_hash, pdf_hash, result FROM comparisons "
+                "WHERE company_key = ? AND pdf = ?",
+                (normalize_company_name(company_name), pdf),
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredComparison(row[0], row[1], json.loads(row[2]))
+
+    def put(self, company_name: str, pdf: str, comparison: StoredComparison) -> None:
+        """
+        Store the latest comparison of a company with a PDF.
+
+        Attributes:
+            company_name (str): the name of the company.
+            pdf (str): the name of the PDF.
+            comparison (StoredComparison): the comparison and its inputs.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO comparisons VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    normalize_company_name(company_name),
+                    pdf,
+                    comparison.row_hash,
+                    comparison.pdf_hash,
+                    json.dumps(comparison.result),
+                    time.time(),
+                ),
+            )
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class IncrementalReconciler:
+    """
+    Compares companies with their PDFs, reusing the stored comparison whenever the
+    database row and the PDF's bytes are unchanged since it was made.
+
+    PDFs that can't be read locally can't be hashed, so they are always compared
+    again.
+    """
+
+    def __init__(
+        self,
+        db_client: CompanyDatabase,
+        pdf_service: PdfExtractor,
+        store: ReconciliationStore,
+        pdf_dir: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the reconciler.
+
+        Attributes:
+            db_client (CompanyDatabase): the client holding the data on file.
+            pdf_service (PdfExtractor): the service used to extract data from PDFs.
+            store (ReconciliationStore): where comparisons are kept between runs.
+            pdf_dir (str): an optional directory holding the PDFs, instead of the default.
+        """
+        self.db_client = db_client
+        self.pdf_service = pdf_service
+        self.store = store
+        self.pdf_dir = pdf_dir
+        self.reused = 0
+        self.recomputed = 0
+        return None
+
+    def reconcile(
+        self, company_name: str, pdf: str, options: Optional[CompareOptions] = None
+    ) -> Tuple[BatchCompareResult, bool]:
+        """
+        Compare a company with a named PDF, returning the result and whether it was
+        served from the store.
+
+        Every field is compared and stored, and `options` narrows down what is
+        returned, so the store serves any selection of fields.
+
+        Attributes:
+            company_name (str): the name of the company to compare.
+            pdf (str): the name of the PDF file, not including the file path or extension.
+            options (CompareOptions): which fields to return, or None for all of them.
+        """
+        file_path = pdf_path(pdf, self.pdf_dir)
+        try:
+            inputs = (
+                row_hash(self.db_client.get_by_company_name(company_name)),
+                pdf_digest(self.pdf_service, file_path),
+            )
+            stored = self.store.get(company_name, pdf)
+            if inputs[1] is not None and stored is not None:
+                if (stored.row_hash, stored.pdf_hash) == inputs:
+                    self.reused += 1
+                    result = _select(stored.result, options)
+                    return self._result(company_name, pdf, result=result), True
+
+            self.recomputed += 1
+            result = compare_company(
+                company_name=company_name,
+                file_path=file_path,
+                db_client=self.db_client,
+                pdf_service=self.pdf_service,
+            )
+        except (FileNotFoundError, ValueError, LookupError) as e:
+            # Errors aren't stored, so the pair is retried on the next run
+            METRICS.count_error(e)
+            return self._result(company_name, pdf, error=str(e)), False
+
+        if inputs[1] is not None:
+            self.store.put(company_name, pdf, StoredComparison(*inputs, result))
+        return self._result(company_name, pdf, result=_select(result, options)), False
+
+    def run(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        options: Optional[CompareOptions] = None,
+    ) -> Iterator[Tuple[BatchCompareResult, bool]]:
+        """
+        Reconcile many company/PDF pairs, yielding each result as it is ready.
+
+        Attributes:
+            pairs (Iterable): the (company name, PDF name) pairs to reconcile.
+            options (CompareOptions): which fields to return, or None for all of them.
+        """
+        for company_name, pdf in pairs:
+            yield self.reconcile(company_name, pdf, options)
+
+    @staticmethod
+    def _result(company_name: str, pdf: str, **outcome: Any) -> BatchCompareResult:
+        return BatchCompareResult(company_name=company_name, pdf=pdf, **outcome)
+
+
+def _select(
+    result: dict[str, dict[str, Any]], options: Optional[CompareOptions]
+) -> dict[str, dict[str, Any]]:
+    return result if options is None else options.select(result)
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def payload_digest(payload: Any) -> str:
+    """
+    Hash JSON-serializable data, independent of the order of its keys.
+
+    Attributes:
+        payload (Any): the data to hash, e.g. the data extracted from a PDF.
+    """
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def make_etag(*parts: str) -> str:
+    """
+    Build a strong ETag from everything a response is derived from.
+
+    Attributes:
+        parts (str): the inputs of the response, e.g. a database version and a PDF hash.
+    """
+    digest = hashlib.sha256("\0".join(parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag, so a 304 can be sent.
+
+    Attributes:
+        if_none_match (str): the header's value, if one was sent.
+        etag (str): the current ETag of the response.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+class ResponseCache:
+    """
+    A bounded LRU of serialized responses, keyed by their ETag.
+
+    As the ETag covers every input of a response, a changed database or PDF gives
+    a new key, and the stale entry ages out of the cache.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        """
+        Initialize an empty cache.
+
+        Attributes:
+            max_entries (int): the number of responses to hold.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        return None
+
+    def get(self, etag: str) -> Optional[bytes]:
+        """
+        Get a cached response body, if there is one.
+
+        Attributes:
+            etag (str): the ETag of the response.
+        """
+        with self._lock:
+            body = self._entries.get(etag)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.hits += 1
+            return body
+
+    def put(self, etag: str, body: bytes) -> None:
+        """
+        Cache a response body, evicting the least recently used ones past the limit.
+
+        Attributes:
+            etag (str): the ETag of the response.
+            body (bytes): the serialized response.
+        """
+        with self._lock:
+            self._entries[etag] = body
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return None
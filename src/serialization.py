@@ -0,0 +1,33 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Serialize data to compact JSON, with orjson when it is installed.
+
+    Attributes:
+        data (Any): the data to serialize.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    A JSON response serialized with `dumps`.
+
+    Returning it from an endpoint skips FastAPI's `jsonable_encoder` pass, so it
+    should only be given plain JSON types.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,175 @@
+"""
+Serve the API from several worker processes sharing one copy of the company data.
+
+    python -m src.serve --workers 4
+
+Rather than every worker parsing the CSV and holding its own copy of it, the
+launcher compiles the CSV once into a snapshot (see `src.snapshot`) in shared
+memory, /dev/shm where there is one, and the workers memory-map it read-only
+through DATABASE_SNAPSHOT_PATH. The pages are shared between them, so memory no
+longer grows with the worker count, and a worker starts without parsing anything.
+
+With DATABASE_RELOAD_INTERVAL set, the launcher recompiles the snapshot when the
+CSV changes, and the workers pick the new snapshot up as they poll.
+
+With more than one worker, the portfolio summary is kept in a SQLite file next to
+the snapshot, unless SUMMARY_DB_PATH names one, so every worker counts towards and
+answers from the same summary. A history store (HISTORY_DIR) is shared through its
+directory already.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from src.constants import DATABASE_CSV_PATH
+from src.snapshot import Snapshot, compile_snapshot
+
+logger = logging.getLogger(__name__)
+
+SHARED_MEMORY_DIR = "/dev/shm"
+
+
+def shared_snapshot_path(csv_file: str, directory: Optional[str] = None) -> str:
+    """
+    Get where the shared snapshot of a CSV file lives, one per CSV path.
+
+    Attributes:
+        csv_file (str): the path to the CSV file.
+        directory (str): where to keep the snapshot; by default shared memory, or
+            the temporary directory where there is none.
+    """
+    if directory is None:
+        directory = (
+            SHARED_MEMORY_DIR
+            if os.path.isdir(SHARED_MEMORY_DIR)
+            else tempfile.gettempdir()
+        )
+    digest = hashlib.sha256(os.path.abspath(csv_file).encode()).hexdigest()
+    return os.path.join(directory, f"companies-{digest[:16]}.snap")
+
+
+def shared_summary_path(directory: Optional[str] = None) -> str:
+    """
+    Get where the workers of this launcher keep their shared portfolio summary.
+
+    Attributes:
+        directory (str): where to keep the summary; by default shared memory, or
+            the temporary directory where there is none.
+    """
+    if directory is None:
+        directory = (
+            SHARED_MEMORY_DIR
+            if os.path.isdir(SHARED_MEMORY_DIR)
+            else tempfile.gettempdir()
+        )
+    return os.path.join(directory, f"summary-{os.getpid()}.sqlite")
+
+
+def prepare_snapshot(csv_file: str, snapshot_file: str) -> bool:
+    """
+    Compile a snapshot of a CSV file unless a fresh one is already there,
+    returning whether one was compiled.
+
+    Attributes:
+        csv_file (str): the path to the CSV file.
+        snapshot_file (str): where to write the snapshot.
+    """
+    try:
+        if Snapshot(snapshot_file).is_fresh(csv_file):
+            return False
+    except (OSError, ValueError):
+        pass
+    rows = compile_snapshot(csv_file, snapshot_file)
+    logger.info("Compiled %d rows into %s", rows, snapshot_file)
+    return True
+
+
+def watch_snapshot(
+    csv_file: str, snapshot_file: str, interval: float, stop: threading.Event
+) -> threading.Thread:
+    """
+    Recompile the snapshot in a background thread whenever the CSV changes.
+
+    Attributes:
+        csv_file (str): the path to the CSV file.
+        snapshot_file (str): the snapshot to keep fresh.
+        interval (float): the seconds between checks of the CSV.
+        stop (threading.Event): set to stop watching.
+    """
+
+    def poll() -> None:
+        while not stop.wait(interval):
+            try:
+                prepare_snapshot(csv_file, snapshot_file)
+            except Exception as e:
+                # E.g. the CSV is mid-rewrite; the next poll tries again
+                logger.warning("Could not recompile %s: %s", snapshot_file, e)
+
+    thread = threading.Thread(target=poll, daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Serve the API from worker processes sharing the company data."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--snapshot-dir",
+        default=None,
+        help="where to keep the shared snapshot (default: /dev/shm)",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    snapshot_file = None
+    stop = threading.Event()
+    if os.environ.get("DATABASE_BACKEND", "csv") == "csv":
+        snapshot_file = shared_snapshot_path(DATABASE_CSV_PATH, args.snapshot_dir)
+        prepare_snapshot(DATABASE_CSV_PATH, snapshot_file)
+        # Inherited by the workers, which attach to the snapshot rather than the CSV
+        os.environ["DATABASE_SNAPSHOT_PATH"] = snapshot_file
+        if os.environ.get("DATABASE_RELOAD_INTERVAL"):
+            interval = float(os.environ["DATABASE_RELOAD_INTERVAL"])
+            watch_snapshot(DATABASE_CSV_PATH, snapshot_file, interval, stop)
+
+    summary_file = None
+    if args.workers > 1 and not os.environ.get("SUMMARY_DB_PATH"):
+        # Kept for this launch only, like the summary of a single process
+        summary_file = shared_summary_path(args.snapshot_dir)
+        os.environ["SUMMARY_DB_PATH"] = summary_file
+
+    # Imported here, as only the launcher needs it
+    import uvicorn
+
+    try:
+        uvicorn.run(
+            "src.main:app", host=args.host, port=args.port, workers=args.workers
+        )
+    finally:
+        stop.set()
+        removed = [snapshot_file]
+        if summary_file is not None:
+            removed += [summary_file, f"{summary_file}-wal", f"{summary_file}-shm"]
+        for path in removed:
+            if path is None:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+A compiled, columnar binary snapshot of the company database.
+
+Build one from the CSV with:
+
+    python -m src.snapshot data/database.csv data/database.snap
+
+The file is a JSON header followed by one section per column, each aligned to 8
+bytes. Columns mapped to a Company field are stored typed (int64 or float64, with a
+byte per row marking whether the value is present), other columns as UTF-8 strings
+behind an array of offsets. Cells of typed columns whose value doesn't format back
+to the same text, e.g. "25.0", or that aren't valid values, empty ones included,
+also keep their string, so rows read back as they are in the CSV. A hash table of
+normalized company names, compiled into the file, makes a lookup a probe or two,
+so a snapshot is usable as soon as it is memory-mapped and rows are only decoded
+when they are read.
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from src.constants import CSV_TO_COMPANY_FIELD_MAPPING
+from src.database import check_columns, normalize_company_name
+from src.models import COERCERS, Company
+
+MAGIC = b"COSNAP04"
+ALIGNMENT = 8
+
+# Snapshot column type -> array typecode
+_TYPECODES = {int: "q", float: "d"}
+
+
+def _format_float(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+# How a typed column's values are written in the CSV, unless kept as strings
+_FORMATTERS = {int: str, float: _format_float, str: str}
+
+
+def _column_type(column: str) -> Any:
+    field = CSV_TO_COMPANY_FIELD_MAPPING.get(column)
+    if field is None:
+        return str
+    return Company.model_fields[field].annotation
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def add(self, data: bytes) -> int:
+        offset = len(self.buffer)
+        self.buffer += data
+        self.buffer += b"\0" * (-len(self.buffer) % ALIGNMENT)
+        return offset
+
+    def add_strings(self, values: List[str]) -> Dict[str, int]:
+        encoded = [value.encode() for value in values]
+        offsets = array("Q", [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        return {
+            "offsets": self.add(offsets.tobytes()),
+            "blob": self.add(b"".join(encoded)),
+        }
+
+
+def compile_snapshot(csv_file: str, snapshot_file: str) -> int:
+    """
+    Compile a CSV database into a snapshot file, returning the number of rows.
+
+    Values of typed columns are coerced here, once, rather than on every read. A
+    cell that can't be, e.g. an empty one, is stored as its string, so like the CSV
+    it only fails lookups of its own company, as is one that doesn't format back to
+    its text.
+
+    A file without a company name column, or changed while it was read, e.g. one
+    being rewritten, raises a ValueError rather than being compiled.
+
+    Attributes:
+        csv_file (str): the path to the CSV file.
+        snapshot_file (str): where to write the snapshot.
+    """
+    # The snapshot is of the file as it was before reading it
+    stat = os.stat(csv_file)
+    with open(csv_file, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = list(reader.fieldnames or [])
+        check_columns(csv_file, columns)
+        rows = list(reader)
+    after = os.stat(csv_file)
+    if (after.st_size, after.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+        # Written to while being read; the next compile reads it again
+        raise ValueError(f"{csv_file} changed while compiling it")
+
+    writer = _Writer()
+    header_columns = []
+    for column in columns:
+        column_type = _column_type(column)
+        raw = [row.get(column) for row in rows]
+        if column_type is str:
+            present = [value is not None for value in raw]
+            values = [value or "" for value in raw]
+            sections = writer.add_strings(values)
+        else:
+            coerce, format_value = COERCERS[column_type], _FORMATTERS[column_type]
+            present = []
+            values = array(_TYPECODES[column_type])
+            raw_rows = array("Q")
+            raw_values = []
+            for i, value in enumerate(raw):
+                if value is None:
+                    values.append(0)
+                    present.append(False)
+                    continue
+                try:
+                    typed = coerce(value)
+                except ValueError:
+                    # Kept as the string, with the row marked as having no value
+                    values.append(0)
+                    present.append(False)
+                    raw_rows.append(i)
+                    raw_values.append(value)
+                    continue
+                values.append(typed)
+                present.append(True)
+                if format_value(typed) != value:
+                    raw_rows.append(i)
+                    raw_values.append(value)
+            sections = {"values": writer.add(values.tobytes())}
+            sections["raw"] = writer.add_strings(raw_values)
+            sections["raw"]["rows"] = writer.add(raw_rows.tobytes())
+            sections["raw"]["count"] = len(raw_rows)
+        sections["present"] = writer.add(bytes(present))
+        header_columns.append(
+            {"name": column, "type": column_type.__name__, **sections}
+        )
+
+    keys = [normalize_company_name(row["Company Name"]) for row in rows]
+    name_index = writer.add_strings(keys)
+    slots = _hash_table(keys)
+    name_index["slots"] = writer.add(slots.tobytes())
+    name_index["size"] = len(slots)
+
+    header = json.dumps(
+        {
+            "source": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+            "byteorder": sys.byteorder,
+            "rows": len(rows),
+            "columns": header_columns,
+            "name_index": name_index,
+        }
+    ).encode()
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % ALIGNMENT)
+
+    tmp_file = f"{snapshot_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(writer.buffer)
+    os.replace(tmp_file, snapshot_file)
+    return len(rows)
+
+
+def _hash_table(keys: List[str]) -> array:
+    # Open addressing with linear probing, at most half full, holding the row of
+    # each key or -1. Only the first row of a duplicated name is added, so it is
+    # the one found.
+    size = 1
+    while size < 2 * len(keys):
+        size *= 2
+    slots = array("q", [-1]) * size
+    mask = size - 1
+    seen = set()
+    for row, key in enumerate(keys):
+        if key in seen:
+            continue
+        seen.add(key)
+        slot = zlib.crc32(key.encode()) & mask
+        while slots[slot] != -1:
+            slot = (slot + 1) & mask
+        slots[slot] = row
+    return slots
+
+
+class _Strings(Sequence[str]):
+    """
+    A read-only sequence of strings decoded on access from a mapped section.
+    """
+
+    def __init__(self, data: memoryview, offsets: int, blob: int, count: int) -> None:
+        self._offsets = data[offsets : offsets + (count + 1) * 8].cast("Q")
+        self._blob = data[blob:]
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> str:
+        return str(self._blob[self._offsets[i] : self._offsets[i + 1]], "utf-8")
+
+    def equals(self, i: int, value: bytes) -> bool:
+        """
+        Check the i-th string is the given UTF-8 encoded one, without decoding it.
+        """
+        return self._blob[self._offsets[i] : self._offsets[i + 1]] == value
+
+
+class _RawCells:
+    """
+    The cells of a typed column kept as strings, by row.
+    """
+
+    def __init__(self, data: memoryview, raw: Dict[str, int]) -> None:
+        count = raw["count"]
+        self._rows = data[raw["rows"] : raw["rows"] + count * 8].cast("Q")
+        self._strings = _Strings(data, raw["offsets"], raw["blob"], count)
+
+    def get(self, row: int) -> Optional[str]:
+        i = bisect.bisect_left(self._rows, row)
+        if i < len(self._rows) and self._rows[i] == row:
+            return self._strings[i]
+        return None
+
+
+class Snapshot(Sequence[Dict[str, Any]]):
+    """
+    A memory-mapped snapshot, readable as a sequence of company rows.
+
+    Rows are dictionaries keyed by CSV column holding the CSV's text, like the rows
+    of `DatabaseClient`. `typed_row` reads a row with valid values of Company fields
+    already typed instead, to build a Company from.
+    """
+
+    def __init__(self, snapshot_file: str) -> None:
+        """
+        Map a snapshot file into memory.
+
+        Raises ValueError if the file isn't a snapshot this code can read.
+
+        Attributes:
+            snapshot_file (str): the path of the snapshot file.
+        """
+        with open(snapshot_file, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{snapshot_file} is not a company snapshot")
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mmap[header_start : header_start + header_length])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{snapshot_file} was built on a different byte order")
+
+        self.source: Dict[str, int] = header["source"]
+        self._count: int = header["rows"]
+        data = memoryview(self._mmap)[header_start + header_length :]
+        # Each column's values, whether each row has one, and how to format it
+        self._columns = []
+        # Typed columns with cells kept as strings
+        self._raw_columns = []
+        for column in header["columns"]:
+            present = data[column["present"] : column["present"] + self._count]
+            if column["type"] == "str":
+                values: Sequence[Any] = _Strings(
+                    data, column["offsets"], column["blob"], self._count
+                )
+                format_value = _FORMATTERS[str]
+            else:
+                column_type = int if column["type"] == "int" else float
+                start = column["values"]
+                values = data[start : start + self._count * 8].cast(
+                    _TYPECODES[column_type]
+                )
+                format_value = _FORMATTERS[column_type]
+                if column["raw"]["count"]:
+                    raw = _RawCells(data, column["raw"])
+                    self._raw_columns.append((column["name"], raw, present))
+            self._columns.append((column["name"], values, present, format_value))
+
+        index = header["name_index"]
+        self._keys = _Strings(data, index["offsets"], index["blob"], self._count)
+        self._slots = data[index["slots"] : index["slots"] + index["size"] * 8].cast(
+            "q"
+        )
+        self._slot_mask = index["size"] - 1
+        return None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        i = self._row_number(i)
+        row = {
+            name: format_value(values[i]) if present[i] else None
+            for name, values, present, format_value in self._columns
+        }
+        for name, raw, _ in self._raw_columns:
+            value = raw.get(i)
+            if value is not None:
+                row[name] = value
+        return row
+
+    def typed_row(self, i: int) -> Dict[str, Any]:
+        """
+        Read a row with the valid values of Company fields typed, and missing values
+        left out. Invalid values keep their string, so building a Company from the
+        row fails as it would from the CSV.
+
+        Attributes:
+            i (int): the number of the row.
+        """
+        i = self._row_number(i)
+        row = {
+            name: values[i] for name, values, present, _ in self._columns if present[i]
+        }
+        for name, raw, present in self._raw_columns:
+            if not present[i]:
+                value = raw.get(i)
+                if value is not None:
+                    row[name] = value
+        return row
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._count):
+            yield self[i]
+
+    def _row_number(self, i: int) -> int:
+        if not -self._count <= i < self._count:
+            raise IndexError("snapshot row out of range")
+        return i % self._count
+
+    def find(self, name_key: str) -> Optional[int]:
+        """
+        Find the row of a company by its normalized name.
+
+        Attributes:
+            name_key (str): the normalized name of the company.
+        """
+        key = name_key.encode()
+        slot = zlib.crc32(key) & self._slot_mask
+        while True:
+            row = self._slots[slot]
+            if row == -1:
+                return None
+            if self._keys.equals(row, key):
+                return row
+            slot = (slot + 1) & self._slot_mask
+
+    def is_fresh(self, csv_file: str) -> bool:
+        """
+        Check the snapshot was compiled from the current version of a CSV file.
+
+        Attributes:
+            csv_file (str): the path to the CSV file.
+        """
+        try:
+            stat = os.stat(csv_file)
+        except OSError:
+            return False
+        return self.source == {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Compile the company database CSV into a binary snapshot."
+    )
+    parser.add_argument("csv_file", help="the path to the CSV file")
+    parser.add_argument("snapshot_file", help="where to write the snapshot")
+    args = parser.parse_args(argv)
+    rows = compile_snapshot(args.csv_file, args.snapshot_file)
+    print(f"Compiled {rows} rows into {args.snapshot_file}")
+
+
+if __name__ == "__main__":
+    main()
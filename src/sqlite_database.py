@@ -0,0 +1,268 @@
+"""
+A SQLite-backed alternative to the CSV `DatabaseClient`.
+
+Import the CSV into a SQLite file with:
+
+    python -m src.sqlite_database data/database.csv data/database.sqlite
+"""
+
+import argparse
+import csv
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.database import normalize_company_name
+from src.models import Company, parse_csv_record
+from src.name_index import DEFAULT_THRESHOLD, NameIndex, NameMatch
+
+SCHEMA = """
+CREATE TABLE companies (
+    id INTEGER PRIMARY KEY,
+    name_key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    record TEXT,
+    error TEXT
+);
+CREATE INDEX companies_name_key ON companies (name_key, id);
+"""
+
+# Rows read per query when iterating over every company
+ITERATION_BATCH_SIZE = 1000
+
+
+def import_csv(csv_file: str, db_file: str) -> int:
+    """
+    Replace the companies in a SQLite file with the rows of a CSV file, returning the
+    number of rows imported.
+
+    Each row is validated into a Company record as it is imported, so lookups don't
+    validate it again.
+
+    Attributes:
+        csv_file (str): the path to the CSV file.
+        db_file (str): the path of the SQLite file, created if it doesn't exist.
+    """
+
+    def rows() -> Iterator[tuple]:
+        with open(csv_file, newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    record, error = json.dumps(parse_csv_record(row)), None
+                except ValueError as e:
+                    record, error = None, str(e)
+                yield (
+                    normalize_company_name(row["Company Name"]),
+                    json.dumps(row),
+                    record,
+                    error,
+                )
+
+    connection = sqlite3.connect(db_file)
+    try:
+        with connection:
+            connection.execute("DROP TABLE IF EXISTS companies")
+            connection.executescript(SCHEMA)
+            connection.executemany(
+                "INSERT INTO companies (name_key, data, record, error) "
+                "VALUES (?, ?, ?, ?)",
+                rows(),
+            )
+        (count,) = connection.execute("SELECT COUNT(*) FROM companies").fetchone()
+    finally:
+        connection.close()
+    return count
+
+
+class SqliteDatabaseClient:
+    """
+    A database client reading companies from a SQLite file imported from the CSV,
+    with the same interface as `DatabaseClient`.
+
+    Lookups use an index on the normalized company name, and a small pool of
+    connections lets FastAPI's threadpool run lookups concurrently. Fuzzy lookups
+    and `resolve` use a name index built from the file on first use, and again
+    whenever it is imported again.
+    """
+
+    def __init__(
+        self,
+        db_file: str,
+        pool_size: int = 4,
+        name_match_threshold: Optional[float] = DEFAULT_THRESHOLD,
+    ) -> None:
+        """
+        Open a pool of read-only connections to a SQLite file.
+
+        Attributes:
+            db_file (str): the path of the SQLite file.
+            pool_size (int): the number of connections in the pool.
+            name_match_threshold (float): the similarity a fuzzy name match needs,
+                or None to only match names exactly.
+        """
+        self.db_file = db_file
+        self._name_match_threshold = name_match_threshold
+        self._name_index_lock = threading.Lock()
+        # The name index and the version of the file it was built from
+        self._name_index: Optional[Tuple[str, NameIndex]] = None
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(
+                sqlite3.connect(
+                    f"file:{db_file}?mode=ro", uri=True, check_same_thread=False
+                )
+            )
+        return None
+
+    @property
+    def version(self) -> str:
+        """
+        Identifies the data in the file, which changes whenever it is imported again.
+        """
+        stat = os.stat(self.db_file)
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        # Blocks until a connection is free, so each is only used by one thread at a time
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every company's data, in file order.
+
+        Rows are read a batch at a time and the connection is returned to the pool
+        before any are yielded, so a caller can look companies up while iterating,
+        or stop part way, without holding on to a connection.
+        """
+        last_id = 0
+        while True:
+            with self._connection() as connection:
+                batch = connection.execute(
+                    "SELECT id, data FROM companies WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, ITERATION_BATCH_SIZE),
+                ).fetchall()
+            if not batch:
+                return
+            last_id = batch[-1][0]
+            for _, data in batch:
+                yield json.loads(data)
+
+    def get_by_company_name(
+        self, company_name: str, fuzzy: bool = False
+    ) -> dict[str, str] | LookupError:
+        """
+        Get a company's data by its name.
+
+        Attributes:
+            company_name (str): the name of a company to search.
+            fuzzy (bool): whether a name not on file may match the most similar one.
+        """
+        row = self._find(company_name, "data", fuzzy)
+        return json.loads(row[0])
+
+    def get_company(self, company_name: str, fuzzy: bool = False) -> Company:
+        """
+        Get a company's data by its name, as a Company.
+
+        Attributes:
+            company_name (str): the name of a company to search.
+            fuzzy (bool): whether a name not on file may match the most similar one.
+        """
+        record, error = self._find(company_name, "record, error", fuzzy)
+        if record is None:
+            raise ValueError(error)
+        return Company.from_record(tuple(json.loads(record)))
+
+    def resolve(self, company_name: str, limit: int = 5) -> List[NameMatch]:
+        """
+        Get the companies a name may mean, as their names on file with a similarity
+        score from 0 to 1, most similar first. A name on file (up to case and
+        surrounding whitespace) only matches itself, with a score of 1.
+
+        Attributes:
+            company_name (str): the name to resolve.
+            limit (int): the most matches to return.
+        """
+        row = self._select(normalize_company_name(company_name), "data")
+        if row is not None:
+            return [NameMatch(json.loads(row[0])["Company Name"], 1.0)]
+        name_index = self._get_name_index()
+        if name_index is None:
+            return []
+        matches = []
+        for key, score in name_index.top_k(company_name, limit):
+            row = self._select(key, "data")
+            if row is not None:
+                matches.append(NameMatch(json.loads(row[0])["Company Name"], score))
+        return matches
+
+    def warm_up(self) -> None:
+        """
+        Build the fuzzy name index now rather than on the first fuzzy lookup.
+        """
+        self._get_name_index()
+
+    def close(self) -> None:
+        """
+        Close every connection in the pool.
+        """
+        while not self._pool.empty():
+            self._pool.get().close()
+
+    def _find(self, company_name: str, columns: str, fuzzy: bool = False) -> tuple:
+        row = self._select(normalize_company_name(company_name), columns)
+        if row is None and fuzzy:
+            name_index = self._get_name_index()
+            key = None if name_index is None else name_index.best_match(company_name)
+            row = None if key is None else self._select(key, columns)
+        if row is None:
+            raise LookupError(f"Company {company_name} not found in the database")
+        return row
+
+    def _select(self, key: str, columns: str) -> Optional[tuple]:
+        with self._connection() as connection:
+            return connection.execute(
+                f"SELECT {columns} FROM companies WHERE name_key = ? "
+                "ORDER BY id LIMIT 1",
+                (key,),
+            ).fetchone()
+
+    def _get_name_index(self) -> Optional[NameIndex]:
+        if self._name_match_threshold is None:
+            return None
+        version = self.version
+        with self._name_index_lock:
+            if self._name_index is None or self._name_index[0] != version:
+                with self._connection() as connection:
+                    keys = connection.execute(
+                        "SELECT name_key FROM companies ORDER BY id"
+                    ).fetchall()
+                self._name_index = (
+                    version,
+                    NameIndex((key for (key,) in keys), self._name_match_threshold),
+                )
+            return self._name_index[1]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Import the company database CSV into a SQLite file."
+    )
+    parser.add_argument("csv_file", help="the path to the CSV file")
+    parser.add_argument("db_file", help="the path of the SQLite file")
+    args = parser.parse_args(argv)
+    count = import_csv(args.csv_file, args.db_file)
+    print(f"Imported {count} rows into {args.db_file}")
+
+
+if __name__ == "__main__":
+    main()
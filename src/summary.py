@@ -0,0 +1,318 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from src.database import normalize_company_name
+from src.models import COMPANY_FIELDS, Company
+
+# Fields whose differences are summed, besides being counted
+_NUMERIC = frozenset(
+    i
+    for i, info in enumerate(Company.model_fields.values())
+    if info.annotation in (int, float)
+)
+
+# What one company adds to a window: a bit per mismatched field, and the deltas of
+# the mismatched numeric fields, in field order
+_Contribution = Tuple[int, Tuple[float, ...]]
+
+
+class _Totals:
+    """
+    Running totals over the latest comparison of each company in a window.
+    """
+
+    def __init__(
+        self,
+        companies: int = 0,
+        mismatches: Optional[List[int]] = None,
+        delta_sums: Optional[List[float]] = None,
+        abs_delta_sums: Optional[List[float]] = None,
+    ) -> None:
+        self.companies = companies
+        self.mismatches = mismatches or [0] * len(COMPANY_FIELDS)
+        self.delta_sums = delta_sums or [0.0] * len(COMPANY_FIELDS)
+        self.abs_delta_sums = abs_delta_sums or [0.0] * len(COMPANY_FIELDS)
+
+    def apply(self, contribution: _Contribution, sign: int) -> None:
+        mask, deltas = contribution
+        self.companies += sign
+        numeric = iter(deltas)
+        for i in range(len(COMPANY_FIELDS)):
+            if not mask >> i & 1:
+                continue
+            self.mismatches[i] += sign
+            if i in _NUMERIC:
+                delta = next(numeric)
+                self.delta_sums[i] += sign * delta
+                self.abs_delta_sums[i] += sign * abs(delta)
+
+
+class _MemoryWindows:
+    """
+    The totals of each window, None for all time, kept in this process.
+    """
+
+    def __init__(self) -> None:
+        self._windows: Dict[Optional[str], Tuple[Dict[str, _Contribution], _Totals]] = {
+            None: ({}, _Totals())
+        }
+
+    def replace(self, key: str, quarter: str, contribution: _Contribution) -> None:
+        for window in (None, quarter):
+            companies, totals = self._windows.setdefault(window, ({}, _Totals()))
+            old = companies.get(key)
+            if old is not None:
+                totals.apply(old, -1)
+            companies[key] = contribution
+            totals.apply(contribution, 1)
+
+    def totals(self, quarter: Optional[str]) -> _Totals:
+        _, totals = self._windows.get(quarter) or ({}, _Totals())
+        return _Totals(
+            totals.companies,
+            list(totals.mismatches),
+            list(totals.delta_sums),
+            list(totals.abs_delta_sums),
+        )
+
+    def quarters(self) -> List[str]:
+        return [quarter for quarter in self._windows if quarter is not None]
+
+    def reset(self, quarter: Optional[str]) -> None:
+        if quarter is None:
+            self._windows = {None: ({}, _Totals())}
+        else:
+            self._windows.pop(quarter, None)
+
+
+class _SqliteWindows:
+    """
+    The totals of each window kept in a SQLite file, shared by every process that
+    opens it. All time is the window "".
+    """
+
+    def __init__(self, db_file: str) -> None:
+        # Imported here, so the summary only loads SQLite support when shared
+        import sqlite3
+
+        # Transactions are begun explicitly, taking the write lock up front
+        self._connection = sqlite3.connect(
+            db_file, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS contributions (
+                quarter TEXT NOT NULL,
+                company_key TEXT NOT NULL,
+                mask INTEGER NOT NULL,
+                deltas TEXT NOT NULL,
+                PRIMARY KEY (quarter, company_key)
+            );
+            CREATE TABLE IF NOT EXISTS totals (
+                quarter TEXT PRIMARY KEY,
+                totals TEXT NOT NULL
+            );
+            """)
+
+    def replace(self, key: str, quarter: str, contribution: _Contribution) -> None:
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for window in ("", quarter):
+                old = connection.execute(
+                    "SELECT mask, deltas FROM contributions "
+                    "WHERE quarter = ? AND company_key = ?",
+                    (window, key),
+                ).fetchone()
+                totals = self._read(window)
+                if old is not None:
+                    totals.apply((old[0], tuple(json.loads(old[1]))), -1)
+                totals.apply(contribution, 1)
+                connection.execute(
+                    "INSERT OR REPLACE INTO contributions VALUES (?, ?, ?, ?)",
+                    (window, key, contribution[0], json.dumps(contribution[1])),
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO totals VALUES (?, ?)",
+                    (window, json.dumps(vars(totals))),
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def totals(self, quarter: Optional[str]) -> _Totals:
+        return self._read("" if quarter is None else quarter)
+
+    def quarters(self) -> List[str]:
+        rows = self._connection.execute(
+            "SELECT quarter FROM totals WHERE quarter != ''"
+        ).fetchall()
+        return [quarter for (quarter,) in rows]
+
+    def reset(self, quarter: Optional[str]) -> None:
+        where, parameters = (
+            ("", ()) if quarter is None else ("WHERE quarter = ?", (quarter,))
+        )
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(f"DELETE FROM contributions {where}", parameters)
+            connection.execute(f"DELETE FROM totals {where}", parameters)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _read(self, window: str) -> _Totals:
+        row = self._connection.execute(
+            "SELECT totals FROM totals WHERE quarter = ?", (window,)
+        ).fetchone()
+        return _Totals() if row is None else _Totals(**json.loads(row[0]))
+
+
+class SummaryAggregator:
+    """
+    Per-field mismatch rates and deltas across every company compared, kept up to
+    date as each comparison completes, so a summary costs O(fields) to serve.
+
+    Each company counts once, by its latest comparison: comparing it again replaces
+    what its last comparison added. Totals are kept for all time and for each
+    quarter, and either can be reset.
+
+    Comparisons given a source, e.g. the ETag of their response, are remembered
+    past a reset, so a response served again without comparing (a 304, or a cached
+    body) can count again with `add_again`.
+
+    Totals are kept in memory, per process, unless `share` moves them to a SQLite
+    file, so that the worker processes of `src.serve` sum up the same comparisons.
+    """
+
+    def __init__(self, max_sources: int = 4096) -> None:
+        """
+        Initialize empty totals.
+
+        Attributes:
+            max_sources (int): the number of recent comparisons that can be added again.
+        """
+        self.max_sources = max_sources
+        self._lock = threading.Lock()
+        self._windows: Union[_MemoryWindows, _SqliteWindows] = _MemoryWindows()
+        self._sources: OrderedDict[str, Tuple[str, str, _Contribution]] = OrderedDict()
+
+    def add(
+        self,
+        current: Company,
+        new: Company,
+        quarter: str,
+        source: Optional[str] = None,
+    ) -> None:
+        """
+        Add the comparison of a company's data on file with newly extracted data.
+
+        Attributes:
+            current (Company): the data on file.
+            new (Company): the extracted data.
+            quarter (str): the quarter the extracted data is for, e.g. "2025Q1".
+            source (str): an optional id of the comparison, to add it again by.
+        """
+        current_values, new_values = current.to_record(), new.to_record()
+        mask = 0
+        deltas: List[float] = []
+        for i, (a, b) in enumerate(zip(current_values, new_values)):
+            if a != b:
+                mask |= 1 << i
+                if i in _NUMERIC:
+                    deltas.append(b - a)
+        contribution = (mask, tuple(deltas))
+        key = normalize_company_name(current.company_name)
+        with self._lock:
+            self._replace(key, quarter, contribution)
+            if source is not None:
+                self._sources[source] = (key, quarter, contribution)
+                self._sources.move_to_end(source)
+                while len(self._sources) > self.max_sources:
+                    self._sources.popitem(last=False)
+
+    def add_again(self, source: str) -> bool:
+        """
+        Add a recent comparison again, e.g. after a reset, returning whether it was
+        one of the comparisons remembered.
+
+        Attributes:
+            source (str): the id the comparison was added with.
+        """
+        with self._lock:
+            added = self._sources.get(source)
+            if added is None:
+                return False
+            self._sources.move_to_end(source)
+            self._replace(*added)
+        return True
+
+    def share(self, db_file: str) -> None:
+        """
+        Keep the totals in a SQLite file from now on, shared by every process that
+        shares it. Comparisons added in memory so far are left out.
+
+        Attributes:
+            db_file (str): the path of the SQLite file, created if it doesn't exist.
+        """
+        windows = _SqliteWindows(db_file)
+        with self._lock:
+            self._windows = windows
+
+    def summary(self, quarter: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the mismatch count and rate of each field, and for numeric fields the mean
+        change and mean absolute change of the new values where they differ.
+
+        Attributes:
+            quarter (str): the quarter to summarize, or None for all time.
+        """
+        with self._lock:
+            totals = self._windows.totals(quarter)
+        companies, mismatches = totals.companies, totals.mismatches
+        delta_sums, abs_delta_sums = totals.delta_sums, totals.abs_delta_sums
+
+        fields = {}
+        for i, field in enumerate(COMPANY_FIELDS):
+            stats: Dict[str, Any] = {
+                "mismatches": mismatches[i],
+                "mismatch_rate": mismatches[i] / companies if companies else 0.0,
+            }
+            if i in _NUMERIC:
+                stats["mean_delta"] = (
+                    delta_sums[i] / mismatches[i] if mismatches[i] else 0.0
+                )
+                stats["mean_abs_delta"] = (
+                    abs_delta_sums[i] / mismatches[i] if mismatches[i] else 0.0
+                )
+            fields[field] = stats
+        return {"quarter": quarter, "companies": companies, "fields": fields}
+
+    def quarters(self) -> List[str]:
+        """
+        Get the quarters with comparisons, oldest first.
+        """
+        with self._lock:
+            return sorted(self._windows.quarters())
+
+    def reset(self, quarter: Optional[str] = None) -> None:
+        """
+        Clear the totals of a quarter, or every total.
+
+        Attributes:
+            quarter (str): the quarter to clear, or None to clear everything.
+        """
+        with self._lock:
+            self._windows.reset(quarter)
+
+    def _replace(self, key: str, quarter: str, contribution: _Contribution) -> None:
+        # Callers must hold the lock
+        self._windows.replace(key, quarter, contribution)
+
+
+SUMMARY = SummaryAggregator()
@@ -1,7 +1,9 @@
+import json
 import unittest
 
 from fastapi.testclient import TestClient
 
+from src.constants import MAX_BATCH_ITEMS
 from src.database import DatabaseClient
 from src.main import app, get_db_client, get_pdf_service
 from src.models import Company
@@ -29,6 +31,12 @@ class TestApp(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"Hello": "World"})
 
+    def test_db_client_is_shared(self):
+        """
+        The default database client is loaded once and shared between requests.
+        """
+        self.assertIs(get_db_client(), get_db_client())
+
     def test_compare_success(self):
         """
         Test the compare endpoint with valid data.
@@ -59,6 +67,35 @@ class TestApp(unittest.TestCase):
             {"detail": "Company Invalid Company not found in the database"},
         )
 
+    def test_compare_misspelt_company_name(self):
+        """
+        Test a misspelt company name is only matched when asked, and the response
+        then names the company compared.
+        """
+        response = self.client.get("/compare?company_name=HealthIncc&pdf=healthinc")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(
+            "/compare?company_name=HealthIncc&pdf=healthinc&fuzzy=true"
+        )
+        self.assertEqual(response.status_code, 200)
+        expected = self.client.get("/compare?company_name=HealthInc&pdf=healthinc")
+        self.assertEqual(response.json()["match"]["company_name"], "HealthInc")
+        self.assertLess(response.json()["match"]["score"], 1)
+        self.assertEqual(response.json()["comparison"], expected.json())
+        self.assertNotEqual(response.headers["ETag"], expected.headers["ETag"])
+
+    def test_resolve_company(self):
+        """
+        Test resolving a name lists the companies it may mean with their scores.
+        """
+        response = self.client.get("/companies/resolve?name=TechCorps")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["query"], "TechCorps")
+        self.assertEqual(response.json()["matches"][0]["company_name"], "TechCorp")
+        response = self.client.get("/companies/resolve?name=invalid")
+        self.assertEqual(response.json()["matches"], [])
+
     def test_compare_invalid_pdf(self):
         """
         Test the compare endpoint with an invalid PDF file.
@@ -69,6 +106,151 @@ class TestApp(unittest.TestCase):
             response.json(), {"detail": "Cannot extract data. Invalid file provided."}
         )
 
+    def test_compare_batch(self):
+        """
+        Test the batch endpoint returns a result or an error for each item, in order.
+        """
+        response = self.client.post(
+            "/compare/batch",
+            json={
+                "items": [
+                    {"company_name": "HealthInc", "pdf": "healthinc"},
+                    {"company_name": "ABC Corp", "pdf": "invalid_pdf"},
+                    {"company_name": "RetailCo", "pdf": "retailco"},
+                ],
+                "concurrency": 2,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual(
+            [item["company_name"] for item in results],
+            ["HealthInc", "ABC Corp", "RetailCo"],
+        )
+        self.assertDictEqual(
+            results[0]["result"],
+            self.client.get("/compare?company_name=HealthInc&pdf=healthinc").json(),
+        )
+        self.assertIsNone(results[0]["error"])
+        self.assertIsNone(results[1]["result"])
+        self.assertEqual(
+            results[1]["error"], "Cannot extract data. Invalid file provided."
+        )
+        self.assertIsNotNone(results[2]["result"])
+
+    def test_compare_batch_empty(self):
+        """
+        Test the batch endpoint with no items.
+        """
+        response = self.client.post("/compare/batch", json={"items": []})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_compare_batch_service_errors(self):
+        """
+        Test an item the PDF service fails for gets an error, and the others results.
+        """
+
+        class FlakyPdfService(PdfService):
+            def extract(self, file_path):
+                if "retailco" in file_path:
+                    raise ConnectionError("PDF service unreachable")
+                return super().extract(file_path)
+
+        app.dependency_overrides[get_pdf_service] = lambda: FlakyPdfService("TEST_KEY")
+        response = self.client.post(
+            "/compare/batch",
+            json={
+                "items": [
+                    {"company_name": "RetailCo", "pdf": "retailco"},
+                    {"company_name": "HealthInc", "pdf": "healthinc"},
+                ]
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual(
+            results[0]["error"], "ConnectionError: PDF service unreachable"
+        )
+        self.assertIsNotNone(results[1]["result"])
+
+    def test_compare_batch_too_many_items(self):
+        """
+        Test a batch with more items than allowed is rejected.
+        """
+        item = {"company_name": "HealthInc", "pdf": "healthinc"}
+        response = self.client.post(
+            "/compare/batch", json={"items": [item] * (MAX_BATCH_ITEMS + 1)}
+        )
+        self.assertEqual(response.status_code, 422)
+
+    def test_compare_all_streams_every_company(self):
+        """
+        Test the stream has one NDJSON line per company in the database.
+        """
+        response = self.client.get("/compare/all")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(
+            [line["company_name"] for line in lines],
+            [row["Company Name"] for row in self.test_db_client],
+        )
+        by_name = {line["company_name"]: line for line in lines}
+        self.assertEqual(by_name["HealthInc"]["pdf"], "healthinc")
+        self.assertDictEqual(
+            by_name["HealthInc"]["result"],
+            self.client.get("/compare?company_name=HealthInc&pdf=healthinc").json(),
+        )
+        # There is no PDF for TechCorp
+        self.assertIsNone(by_name["TechCorp"]["result"])
+        self.assertEqual(
+            by_name["TechCorp"]["error"], "Cannot extract data. Invalid file provided."
+        )
+
+    def test_compare_only_mismatches(self):
+        """
+        Test the compare endpoint leaves out the fields that match.
+        """
+        full = self.client.get("/compare?company_name=HealthInc&pdf=healthinc").json()
+        response = self.client.get(
+            "/compare?company_name=HealthInc&pdf=healthinc&only=mismatches"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(
+            response.json(),
+            {field: values for field, values in full.items() if not values["Match"]},
+        )
+
+    def test_compare_fields(self):
+        """
+        Test the compare endpoint returns only the requested fields, on every endpoint.
+        """
+        response = self.client.get(
+            "/compare?company_name=HealthInc&pdf=healthinc&fields=revenue_millions,ceo"
+        )
+        self.assertEqual(list(response.json()), ["revenue_millions", "ceo"])
+
+        response = self.client.post(
+            "/compare/batch?fields=ceo",
+            json={"items": [{"company_name": "HealthInc", "pdf": "healthinc"}]},
+        )
+        self.assertEqual(list(response.json()[0]["result"]), ["ceo"])
+
+        response = self.client.get("/compare/all?fields=ceo")
+        line = json.loads(response.text.splitlines()[1])
+        self.assertEqual(list(line["result"]), ["ceo"])
+
+    def test_compare_unknown_field(self):
+        """
+        Test asking for a field that doesn't exist.
+        """
+        response = self.client.get(
+            "/compare?company_name=HealthInc&pdf=healthinc&fields=bogus"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"detail": "Unknown fields: bogus"})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from src.async_pdf_service import AsyncPdfService
+from src.fake_pdf_service import (
+    LatencyPdfService,
+    lognormal_latency,
+    uniform_latency,
+)
+from src.pdf_service import PdfService
+
+HEALTHINC_PDF = "/home/coderpad/data/healthinc.pdf"
+
+
+class TestAsyncPdfService(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+
+    def stand_in(self, latency) -> LatencyPdfService:
+        return LatencyPdfService(PdfService("TEST_KEY"), latency=latency)
+
+    def test_extract(self):
+        """
+        Test the adapter returns what the wrapped service extracts.
+        """
+        service = self.stand_in(0)
+        adapter = AsyncPdfService(service, executor=self.executor)
+        result = asyncio.run(adapter.extract(HEALTHINC_PDF))
+        self.assertEqual(result, PdfService("TEST_KEY").extract(HEALTHINC_PDF))
+
+    def test_concurrent_requests_are_coalesced(self):
+        """
+        Test concurrent requests for the same file make a single call.
+        """
+        service = self.stand_in(0.05)
+        adapter = AsyncPdfService(service, executor=self.executor)
+
+        async def run():
+            return await asyncio.gather(
+                *(adapter.extract(HEALTHINC_PDF) for _ in range(5))
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(service.calls, 1)
+        self.assertEqual(adapter.coalesced, 4)
+        self.assertTrue(all(result == results[0] for result in results))
+
+    def test_errors_reach_every_caller(self):
+        """
+        Test an extraction error is raised to each coalesced caller.
+        """
+        adapter = AsyncPdfService(self.stand_in(0.02), executor=self.executor)
+
+        async def run():
+            return await asyncio.gather(
+                adapter.extract("invalid.pdf"),
+                adapter.extract("invalid.pdf"),
+                return_exceptions=True,
+            )
+
+        for result in asyncio.run(run()):
+            self.assertIsInstance(result, FileNotFoundError)
+
+    def test_timeout(self):
+        """
+        Test a caller gets a TimeoutError when the service is too slow.
+        """
+        adapter = AsyncPdfService(
+            self.stand_in(0.5), timeout=0.05, executor=self.executor
+        )
+        with self.assertRaises(TimeoutError):
+            asyncio.run(adapter.extract(HEALTHINC_PDF))
+
+    def test_hedging(self):
+        """
+        Test a slow call is raced against a hedged call, which answers first.
+        """
+        latencies = count()
+        # The first call takes a second, the hedged one answers immediately
+        service = self.stand_in(lambda: 1.0 if next(latencies) == 0 else 0.0)
+        adapter = AsyncPdfService(
+            service, timeout=0.5, hedge_after=0.05, executor=self.executor
+        )
+        result = asyncio.run(adapter.extract(HEALTHINC_PDF))
+        self.assertEqual(result["Company Name"], "HealthInc")
+        self.assertEqual(service.calls, 2)
+        self.assertEqual(adapter.hedges, 1)
+
+
+class TestLatencyPdfService(unittest.TestCase):
+    def test_error_rate(self):
+        """
+        Test the stand-in fails about the configured share of calls.
+        """
+        service = LatencyPdfService(
+            PdfService("TEST_KEY"), error_rate=0.25, rng=random.Random(0)
+        )
+        failures = 0
+        for _ in range(400):
+            try:
+                service.extract(HEALTHINC_PDF)
+            except ConnectionError:
+                failures += 1
+        self.assertEqual(service.calls, 400)
+        self.assertEqual(service.errors, failures)
+        self.assertTrue(60 < failures < 140)
+
+    def test_latency_distributions(self):
+        """
+        Test the latency distributions stay within their bounds and around their median.
+        """
+        uniform = uniform_latency(0.2, 5, rng=random.Random(0))
+        self.assertTrue(all(0.2 <= uniform() <= 5 for _ in range(1000)))
+        lognormal = lognormal_latency(0.8, 0.6, rng=random.Random(0))
+        samples = sorted(lognormal() for _ in range(1001))
+        self.assertAlmostEqual(samples[500], 0.8, delta=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,12 @@
+import os
+import shutil
+import tempfile
+import time
 import unittest
+from unittest import mock
 
 from src.database import DatabaseClient
+from src.models import Company
 
 
 class TestDatabaseClient(unittest.TestCase):
@@ -52,6 +58,216 @@ class TestDatabaseClient(unittest.TestCase):
         result = self.db_client.get_by_company_name("healthinc")
         self.assertEqual(result, self.expected_data)
 
+    def test_get_by_company_name_surrounding_whitespace(self):
+        """
+        Test getting data for a company with whitespace around the name.
+        """
+        result = self.db_client.get_by_company_name("  HEALTHINC ")
+        self.assertEqual(result, self.expected_data)
+
+    def test_get_company(self):
+        """
+        Test getting a company as a Company validated at load time.
+        """
+        company = self.db_client.get_company("healthinc")
+        self.assertEqual(company, Company(self.expected_data))
+
+    def test_get_company_non_existing(self):
+        """
+        Test getting a Company for a non-existing company.
+        """
+        with self.assertRaises(LookupError):
+            self.db_client.get_company("invalid")
+
+    def test_get_by_company_name_fuzzy(self):
+        """
+        Test getting data for a company by a differently written or misspelt name.
+        """
+        for name in ["Health Inc", "HealthInc.", "health-inc", "HealthIncc"]:
+            result = self.db_client.get_by_company_name(name, fuzzy=True)
+            self.assertEqual(result, self.expected_data)
+        self.assertEqual(
+            self.db_client.get_company("Health Inc", fuzzy=True),
+            Company(self.expected_data),
+        )
+
+    def test_names_match_exactly_by_default(self):
+        """
+        Test names that aren't on file, however similar, aren't matched unless asked.
+        """
+        for name in ["Health Inc", "FinanceLLC2", "TechCorps", "ManuCorp2"]:
+            with self.assertRaises(LookupError):
+                self.db_client.get_by_company_name(name)
+            with self.assertRaises(LookupError):
+                self.db_client.get_company(name)
+
+    def test_get_by_company_name_exact_only(self):
+        """
+        Test fuzzy matching can be turned off.
+        """
+        db_client = DatabaseClient("data/database.csv", name_match_threshold=None)
+        with self.assertRaises(LookupError):
+            db_client.get_by_company_name("Health Inc", fuzzy=True)
+        self.assertEqual(db_client.resolve("Health Inc"), [])
+
+    def test_resolve(self):
+        """
+        Test resolving a name gives the names on file it may mean, with their scores.
+        """
+        self.assertEqual(self.db_client.resolve(" healthinc "), [("HealthInc", 1.0)])
+        matches = self.db_client.resolve("TechCorps")
+        self.assertEqual(matches[0].name, "TechCorp")
+        self.assertLess(matches[0].score, 1)
+        self.assertEqual(self.db_client.resolve("Health Inc")[0], ("HealthInc", 1.0))
+        self.assertEqual(self.db_client.resolve("invalid"), [])
+
+
+class TestDatabaseReload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.csv_file = os.path.join(self.tmp.name, "database.csv")
+        shutil.copy("data/database.csv", self.csv_file)
+        self.db_client = DatabaseClient(self.csv_file)
+
+    def rewrite(self, edit):
+        with open(self.csv_file) as f:
+            lines = f.read().splitlines(keepends=True)
+        with open(self.csv_file, "w") as f:
+            f.writelines(edit(lines))
+
+    def test_unchanged(self):
+        """
+        Test nothing is reloaded while the file is unchanged.
+        """
+        self.assertFalse(self.db_client.reload())
+
+    def test_reload_changes(self):
+        """
+        Test added, changed and removed rows are picked up, and other rows reused.
+        """
+        version = self.db_client.version
+        healthinc = self.db_client.get_by_company_name("HealthInc")
+
+        def edit(lines):
+            lines = [line for line in lines if not line.startswith("RetailCo,")]
+            lines = [line.replace("San Francisco", "Oakland") for line in lines]
+            return lines + ["NewCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n"]
+
+        self.rewrite(edit)
+        self.assertTrue(self.db_client.reload())
+        self.assertNotEqual(self.db_client.version, version)
+        self.assertEqual(
+            self.db_client.get_by_company_name("NewCo")["Location"], "Leeds"
+        )
+        self.assertEqual(self.db_client.get_company("TechCorp").location, "Oakland")
+        with self.assertRaises(LookupError):
+            self.db_client.get_by_company_name("RetailCo")
+        # Unchanged rows are reused rather than parsed again
+        self.assertIs(self.db_client.get_by_company_name("HealthInc"), healthinc)
+        # The name index follows the changes
+        self.assertEqual(
+            self.db_client.get_company("New Co", fuzzy=True).location, "Leeds"
+        )
+        with self.assertRaises(LookupError):
+            self.db_client.get_company("Retail Co", fuzzy=True)
+
+    def test_reload_removes_name_sharing_a_key(self):
+        """
+        Test removing one of two companies whose names differ only in punctuation
+        leaves fuzzy matches of the other.
+        """
+        self.rewrite(
+            lambda lines: lines
+            + ["Finance LLC,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n"]
+        )
+        self.db_client.reload()
+        self.rewrite(lambda lines: [line for line in lines if "FinanceLLC" not in line])
+        self.db_client.reload()
+        self.assertEqual(
+            self.db_client.get_company("FinanceLLC2", fuzzy=True).location, "Leeds"
+        )
+        self.assertEqual(self.db_client.resolve("FinanceLLC")[0].name, "Finance LLC")
+
+    def test_reload_same_as_fresh_load(self):
+        """
+        Test a reloaded client has the same rows as a client loading the new file.
+        """
+        self.rewrite(lambda lines: lines[:1] + lines[3:] + lines[1:2])
+        self.db_client.reload()
+        fresh = DatabaseClient(self.csv_file)
+        self.assertEqual(list(self.db_client), list(fresh))
+        for row in fresh:
+            name = row["Company Name"]
+            self.assertEqual(self.db_client.get_company(name), fresh.get_company(name))
+
+    def test_empty_file_not_swapped_in(self):
+        """
+        Test a file emptied mid-rewrite doesn't replace the loaded data.
+        """
+        self.rewrite(lambda lines: [])
+        with self.assertRaises(ValueError):
+            self.db_client.reload()
+        self.assertEqual(self.db_client.get_company("HealthInc").equity_millions, 600)
+
+    def test_file_changed_while_reloading(self):
+        """
+        Test data read while the file was being written to isn't swapped in.
+        """
+        load = self.db_client._load
+
+        def load_then_append(*args):
+            table = load(*args)
+            with open(self.csv_file, "a") as f:
+                f.write("NewCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+            return table
+
+        self.rewrite(lambda lines: lines[:2])
+        with mock.patch.object(self.db_client, "_load", load_then_append):
+            self.assertFalse(self.db_client.reload())
+        self.db_client.get_company("RetailCo")
+        self.assertTrue(self.db_client.reload())
+        self.assertEqual(self.db_client.get_company("NewCo").location, "Leeds")
+
+    def test_watch_survives_undecodable_file(self):
+        """
+        Test the watcher keeps polling after reading a file it can't decode.
+        """
+        self.db_client.watch(0.01)
+        self.addCleanup(self.db_client.stop_watching)
+        with open(self.csv_file, "ab") as f:
+            f.write(b"\xff\xfe\n")
+        time.sleep(0.1)
+        shutil.copy("data/database.csv", self.csv_file)
+        with open(self.csv_file, "a") as f:
+            f.write("NewCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                self.db_client.get_by_company_name("NewCo")
+                break
+            except LookupError:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+
+    def test_watch(self):
+        """
+        Test watching the file reloads it in the background.
+        """
+        self.db_client.watch(0.01)
+        self.addCleanup(self.db_client.stop_watching)
+        self.rewrite(
+            lambda lines: lines + ["NewCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n"]
+        )
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                self.db_client.get_by_company_name("NewCo")
+                break
+            except LookupError:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,240 @@
+import datetime
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from src.database import DatabaseClient
+from src.history import HistoryStore, current_quarter, parse_quarter
+from src.main import (
+    app,
+    get_db_client,
+    get_history_store,
+    get_pdf_service,
+    get_response_cache,
+)
+from src.pdf_service import PdfService
+from src.response_cache import ResponseCache
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_client = DatabaseClient("data/database.csv")
+        self.store = HistoryStore(self.tmp.name, segment_rows=2)
+        for row in self.db_client:
+            name = row["Company Name"]
+            self.store.record(name, "2025Q1", self.db_client.get_company(name))
+
+    def company(self, name, **changes):
+        return self.db_client.get_company(name).model_copy(update=changes)
+
+    def test_parse_quarter(self):
+        """
+        Test quarters are validated and normalized.
+        """
+        self.assertEqual(parse_quarter("2025q1"), "2025Q1")
+        self.assertEqual(parse_quarter("2025-Q4"), "2025Q4")
+        with self.assertRaises(ValueError):
+            parse_quarter("2025Q5")
+        self.assertEqual(current_quarter(datetime.date(2025, 8, 1)), "2025Q3")
+
+    def test_get_and_history(self):
+        """
+        Test a company's records are found by quarter, oldest quarter first.
+        """
+        self.store.record("HealthInc", "2025Q2", self.company("HealthInc", ceo="A"))
+        self.assertEqual(self.store.get(" healthinc ", "2025Q1").equity_millions, 600)
+        self.assertEqual(list(self.store.history("HealthInc")), ["2025Q1", "2025Q2"])
+        self.assertIsNone(self.store.get("HealthInc", "2024Q4"))
+        self.assertEqual(self.store.history("Unknown"), {})
+
+    def test_changes(self):
+        """
+        Test only the fields that changed between two quarters are reported.
+        """
+        self.store.record(
+            "HealthInc", "2025Q2", self.company("HealthInc", ebitda_millions=300)
+        )
+        self.store.record("RetailCo", "2025Q2", self.company("RetailCo"))
+        self.assertEqual(
+            self.store.changes("2025Q1"),
+            {"HealthInc": {"ebitda_millions": {"From": 250, "To": 300}}},
+        )
+        self.assertEqual(self.store.changes("2025Q1", "2025Q2", fields=["ceo"]), {})
+        with self.assertRaises(ValueError):
+            self.store.changes("2025Q1", fields=["unknown"])
+
+    def test_rerecorded_company_replaces_record(self):
+        """
+        Test the latest record of a company for a quarter wins, and an unchanged one
+        isn't stored again.
+        """
+        self.assertFalse(
+            self.store.record("HealthInc", "2025Q1", self.company("HealthInc"))
+        )
+        self.assertTrue(
+            self.store.record("HealthInc", "2025Q1", self.company("HealthInc", ceo="A"))
+        )
+        self.assertEqual(self.store.get("HealthInc", "2025Q1").ceo, "A")
+
+    def test_reopen(self):
+        """
+        Test records survive reopening the store once flushed.
+        """
+        self.store.record("HealthInc", "2025Q2", self.company("HealthInc", ceo="A"))
+        self.store.flush()
+        self.assertIn("manifest.json", os.listdir(self.tmp.name))
+
+        store = HistoryStore(self.tmp.name)
+        self.assertEqual(store.quarters(), ["2025Q1", "2025Q2"])
+        self.assertEqual(
+            store.changes("2025Q1", fields=["ceo"]),
+            {"HealthInc": {"ceo": {"From": "Unknown", "To": "A"}}},
+        )
+        for row in self.db_client:
+            name = row["Company Name"]
+            self.assertEqual(
+                store.get(name, "2025Q1"), self.db_client.get_company(name)
+            )
+
+    def test_two_writers(self):
+        """
+        Test two stores writing to one directory keep each other's records, and the
+        record written last wins.
+        """
+        self.store.flush()
+        other = HistoryStore(self.tmp.name, segment_rows=1)
+        self.store.record("HealthInc", "2025Q2", self.company("HealthInc", ceo="A"))
+        other.record("RetailCo", "2025Q2", self.company("RetailCo", ceo="B"))
+        self.store.record("TechCorp", "2025Q2", self.company("TechCorp", ceo="C"))
+        self.store.flush()
+        other.record("HealthInc", "2025Q2", self.company("HealthInc", ceo="D"))
+
+        store = HistoryStore(self.tmp.name)
+        self.assertEqual(store.get("RetailCo", "2025Q2").ceo, "B")
+        self.assertEqual(store.get("TechCorp", "2025Q2").ceo, "C")
+        self.assertEqual(store.get("HealthInc", "2025Q2").ceo, "D")
+        for row in self.db_client:
+            name = row["Company Name"]
+            self.assertEqual(
+                store.get(name, "2025Q1"), self.db_client.get_company(name)
+            )
+
+    def test_reads_see_other_writers(self):
+        """
+        Test a store answers queries with the segments another store wrote after it
+        was opened, and records flushed in the background.
+        """
+        self.store.flush()
+        reader = HistoryStore(self.tmp.name)
+        self.store.record("HealthInc", "2025Q2", self.company("HealthInc", ceo="A"))
+        self.store.flush()
+        self.assertEqual(reader.quarters(), ["2025Q1", "2025Q2"])
+        self.assertEqual(reader.get("HealthInc", "2025Q2").ceo, "A")
+        self.assertEqual(
+            reader.changes("2025Q1", fields=["ceo"]),
+            {"HealthInc": {"ceo": {"From": self.company("HealthInc").ceo, "To": "A"}}},
+        )
+
+        self.store.flush_every(0.01)
+        self.addCleanup(self.store.stop_flushing)
+        self.store.record("RetailCo", "2025Q2", self.company("RetailCo", ceo="B"))
+        deadline = time.monotonic() + 5
+        while reader.get("RetailCo", "2025Q2") is None:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.assertEqual(reader.get("RetailCo", "2025Q2").ceo, "B")
+
+
+class TestHistoryApi(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = HistoryStore(self.tmp.name)
+        app.dependency_overrides.clear()
+        app.dependency_overrides[get_db_client] = lambda: DatabaseClient(
+            "data/database.csv"
+        )
+        app.dependency_overrides[get_pdf_service] = lambda: PdfService("TEST_KEY")
+        app.dependency_overrides[get_response_cache] = lambda: ResponseCache()
+        app.dependency_overrides[get_history_store] = lambda: self.store
+        self.addCleanup(app.dependency_overrides.clear)
+        self.client = TestClient(app)
+
+    def test_compare_records_history(self):
+        """
+        Test /compare keeps the extracted data for the quarter, and changes between
+        quarters are served from the store.
+        """
+        url = "/compare?company_name=HealthInc&pdf=healthinc"
+        self.assertEqual(self.client.get(f"{url}&quarter=2025Q1").status_code, 200)
+        self.assertEqual(self.store.get("HealthInc", "2025Q1").equity_millions, 666)
+
+        self.store.record(
+            "HealthInc",
+            "2025Q2",
+            self.store.get("HealthInc", "2025Q1").model_copy(
+                update={"equity_millions": 700}
+            ),
+        )
+        response = self.client.get(
+            "/history/changes?since=2025Q1&fields=equity_millions"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "since": "2025Q1",
+                "until": "2025Q2",
+                "changes": {"HealthInc": {"equity_millions": {"From": 666, "To": 700}}},
+            },
+        )
+
+        response = self.client.get("/history/companies/healthinc")
+        self.assertEqual(list(response.json()), ["2025Q1", "2025Q2"])
+
+    def test_compare_looks_company_up_once(self):
+        """
+        Test recording history reuses the Company the comparison looked up.
+        """
+        db_client = DatabaseClient("data/database.csv")
+        app.dependency_overrides[get_db_client] = lambda: db_client
+        with mock.patch.object(
+            db_client, "get_company", wraps=db_client.get_company
+        ) as get_company:
+            response = self.client.get(
+                "/compare?company_name=healthinc&pdf=healthinc&quarter=2025Q1"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_company.call_count, 1)
+        self.assertEqual(
+            self.store.history("HealthInc")["2025Q1"].company_name, "HealthInc"
+        )
+
+    def test_invalid_quarter(self):
+        """
+        Test an invalid quarter is rejected.
+        """
+        response = self.client.get(
+            "/compare?company_name=HealthInc&pdf=healthinc&quarter=2025Q9"
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/history/changes?since=last-year")
+        self.assertEqual(response.status_code, 400)
+
+    def test_not_configured(self):
+        """
+        Test the history endpoints are not found without a store.
+        """
+        app.dependency_overrides[get_history_store] = lambda: None
+        response = self.client.get("/history/changes?since=2025Q1")
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+import threading
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+
+from src.database import DatabaseClient
+from src.jobs import JobManager, JobQueueFull
+from src.main import app, get_db_client, get_job_manager, get_pdf_service
+from src.pdf_service import PdfService
+
+
+class GatedPdfService:
+    """
+    A stand-in PDF service whose extractions wait until the test lets them through.
+    """
+
+    def __init__(self):
+        self.service = PdfService("TEST_KEY")
+        self.gate = threading.Semaphore(0)
+
+    def extract(self, file_path: str):
+        self.gate.acquire(timeout=5)
+        return self.service.extract(file_path)
+
+
+def wait_for(manager, job_id, *statuses):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        status = manager.get(job_id)
+        if status.status in statuses:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} never became {statuses}")
+
+
+class TestJobManager(unittest.TestCase):
+    def setUp(self):
+        self.db_client = DatabaseClient("data/database.csv")
+        self.pdf_service = GatedPdfService()
+        self.manager = JobManager(workers=1, max_queued=1)
+        self.addCleanup(self.manager.close)
+        self.pairs = [("HealthInc", "healthinc"), ("RetailCo", "retailco")]
+
+    def test_progress_and_results(self):
+        """
+        Test a job reports each comparison as it is done.
+        """
+        job = self.manager.submit(self.pairs, self.db_client, self.pdf_service)
+        self.assertEqual((job.total, job.completed), (2, 0))
+
+        self.pdf_service.gate.release()
+        deadline = time.monotonic() + 5
+        while self.manager.get(job.job_id).completed < 1:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        status = self.manager.get(job.job_id)
+        self.assertEqual(status.status, "running")
+        self.assertEqual(status.results[0].company_name, "HealthInc")
+
+        self.pdf_service.gate.release()
+        status = wait_for(self.manager, job.job_id, "completed")
+        self.assertEqual(status.completed, 2)
+        self.assertIsNotNone(status.results[1].result)
+
+    def test_whole_database(self):
+        """
+        Test a job without pairs compares every company.
+        """
+        for _ in self.db_client:
+            self.pdf_service.gate.release()
+        job = self.manager.submit(None, self.db_client, self.pdf_service)
+        status = wait_for(self.manager, job.job_id, "completed")
+        self.assertEqual(status.total, len(self.db_client.data))
+        self.assertEqual(
+            [result.company_name for result in status.results],
+            [row["Company Name"] for row in self.db_client],
+        )
+
+    def test_backpressure_and_cancel(self):
+        """
+        Test a full queue refuses jobs, and cancelled jobs stop.
+        """
+        running = self.manager.submit(self.pairs, self.db_client, self.pdf_service)
+        wait_for(self.manager, running.job_id, "running")
+        queued = self.manager.submit(self.pairs, self.db_client, self.pdf_service)
+        with self.assertRaises(JobQueueFull):
+            self.manager.submit(self.pairs, self.db_client, self.pdf_service)
+
+        self.assertEqual(self.manager.cancel(queued.job_id).status, "cancelled")
+        self.manager.cancel(running.job_id)
+        self.pdf_service.gate.release()
+        status = wait_for(self.manager, running.job_id, "cancelled")
+        self.assertEqual(status.completed, 1)
+
+    def test_unknown_job(self):
+        """
+        Test asking for a job that doesn't exist.
+        """
+        with self.assertRaises(LookupError):
+            self.manager.get("nope")
+
+    def test_list_and_offset(self):
+        """
+        Test listing jobs leaves their results out, and polling can skip results.
+        """
+        self.pdf_service.gate.release()
+        self.pdf_service.gate.release()
+        job = self.manager.submit(self.pairs, self.db_client, self.pdf_service)
+        wait_for(self.manager, job.job_id, "completed")
+        (summary,) = self.manager.list()
+        self.assertEqual((summary.job_id, summary.completed), (job.job_id, 2))
+        self.assertFalse(hasattr(summary, "results"))
+        status = self.manager.get(job.job_id, offset=1)
+        self.assertEqual(status.completed, 2)
+        self.assertEqual(
+            [result.company_name for result in status.results], ["RetailCo"]
+        )
+
+    def test_finished_jobs_expire(self):
+        """
+        Test finished jobs are forgotten once their time to live has passed, while
+        queued and running ones are kept.
+        """
+        manager = JobManager(workers=1, max_queued=1, finished_ttl=0.05)
+        self.addCleanup(manager.close)
+        self.pdf_service.gate.release()
+        self.pdf_service.gate.release()
+        done = manager.submit(self.pairs, self.db_client, self.pdf_service)
+        wait_for(manager, done.job_id, "completed")
+        running = manager.submit(self.pairs, self.db_client, self.pdf_service)
+        wait_for(manager, running.job_id, "running")
+        time.sleep(0.1)
+        self.assertEqual([job.job_id for job in manager.list()], [running.job_id])
+        with self.assertRaises(LookupError):
+            manager.get(done.job_id)
+        manager.cancel(running.job_id)
+        self.pdf_service.gate.release()
+
+
+class TestJobsApi(unittest.TestCase):
+    def setUp(self):
+        self.manager = JobManager(workers=1, max_queued=2)
+        self.addCleanup(self.manager.close)
+        app.dependency_overrides.clear()
+        app.dependency_overrides[get_db_client] = lambda: DatabaseClient(
+            "data/database.csv"
+        )
+        app.dependency_overrides[get_pdf_service] = lambda: PdfService("TEST_KEY")
+        app.dependency_overrides[get_job_manager] = lambda: self.manager
+        self.addCleanup(app.dependency_overrides.clear)
+        self.client = TestClient(app)
+
+    def test_submit_and_poll(self):
+        """
+        Test submitting a job returns its id at once, and polling gets its results.
+        """
+        response = self.client.post(
+            "/jobs?only=mismatches",
+            json={"items": [{"company_name": "HealthInc", "pdf": "healthinc"}]},
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+
+        wait_for(self.manager, job_id, "completed")
+        response = self.client.get(f"/jobs/{job_id}")
+        self.assertEqual(response.status_code, 200)
+        result = response.json()["results"][0]["result"]
+        self.assertTrue(result)
+        self.assertFalse(any(values["Match"] for values in result.values()))
+
+    def test_list_jobs(self):
+        """
+        Test listing jobs gives their progress without their results.
+        """
+        response = self.client.post(
+            "/jobs", json={"items": [{"company_name": "HealthInc", "pdf": "healthinc"}]}
+        )
+        job_id = response.json()["job_id"]
+        wait_for(self.manager, job_id, "completed")
+        response = self.client.get("/jobs")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "job_id": job_id,
+                    "status": "completed",
+                    "total": 1,
+                    "completed": 1,
+                    "error": None,
+                }
+            ],
+        )
+        response = self.client.get(f"/jobs/{job_id}?offset=1")
+        self.assertEqual(response.json()["results"], [])
+
+    def test_unknown_job(self):
+        """
+        Test polling and cancelling a job that doesn't exist.
+        """
+        self.assertEqual(self.client.get("/jobs/nope").status_code, 404)
+        self.assertEqual(self.client.delete("/jobs/nope").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from src.layered_dict import LayeredDict
+
+
+class TestLayeredDict(unittest.TestCase):
+    def test_behaves_like_a_dict(self):
+        """
+        Test reads, writes and deletes give the same entries as a dict.
+        """
+        base = {"a": 1, "b": 2}
+        layered = LayeredDict(base)
+        layered["c"] = 3
+        layered["a"] = 10
+        del layered["b"]
+        self.assertEqual(dict(layered), {"a": 10, "c": 3})
+        self.assertEqual(len(layered), 2)
+        self.assertNotIn("b", layered)
+        self.assertIsNone(layered.get("b"))
+        with self.assertRaises(KeyError):
+            layered["b"]
+        with self.assertRaises(KeyError):
+            del layered["b"]
+        layered["b"] = 20
+        self.assertEqual(layered["b"], 20)
+        # The base is never written to
+        self.assertEqual(base, {"a": 1, "b": 2})
+
+    def test_copies_are_independent(self):
+        """
+        Test a copy and its original can each be changed without affecting the other,
+        including once the changes are folded into a new base.
+        """
+        original = LayeredDict.layer({i: i for i in range(100)})
+        copies = [original]
+        for i in range(30):
+            copy = copies[-1].copy()
+            copy[i] = -i
+            del copy[99 - i]
+            copies.append(copy)
+        for n, copy in enumerate(copies):
+            expected = {i: -i if i < n else i for i in range(100 - n)}
+            self.assertEqual(dict(copy), expected)
+            self.assertEqual(len(copy), len(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
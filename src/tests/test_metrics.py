@@ -0,0 +1,70 @@
+import unittest
+
+from fastapi.testclient import TestClient
+
+from src.main import app, get_response_cache
+from src.metrics import METRICS, Histogram, Metrics
+from src.response_cache import ResponseCache
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        """
+        Test observations land in the right buckets and render cumulatively.
+        """
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.5, 0.7, 5.0):
+            histogram.observe(seconds)
+        counts, total = histogram.snapshot()
+        self.assertEqual(counts, [1, 3, 4])
+        self.assertAlmostEqual(total, 6.25)
+
+    def test_render(self):
+        """
+        Test stages, errors and cache statistics are rendered as Prometheus text.
+        """
+        metrics = Metrics()
+        with metrics.time("compare"):
+            pass
+        metrics.count_error(LookupError("missing"))
+        metrics.count_error(LookupError("missing"))
+        text = metrics.render(cache_stats={"hits": 3})
+
+        self.assertIn("# TYPE compare_stage_seconds histogram", text)
+        self.assertIn('compare_stage_seconds_count{stage="compare"} 1', text)
+        self.assertIn('compare_errors_total{type="LookupError"} 2', text)
+        self.assertIn('pdf_cache_events_total{event="hits"} 3', text)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        METRICS.reset()
+        app.dependency_overrides.clear()
+        # A fresh response cache, so the comparison isn't served from earlier tests
+        app.dependency_overrides[get_response_cache] = ResponseCache
+        self.client = TestClient(app)
+
+    def test_metrics_endpoint(self):
+        """
+        Test requests to /compare are reflected in /metrics.
+        """
+        self.client.get("/compare?company_name=HealthInc&pdf=healthinc")
+        self.client.get("/compare?company_name=HealthInc&pdf=invalid_pdf")
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        text = response.text
+        for stage in ("pdf_extract", "db_lookup", "model_build", "compare"):
+            self.assertIn(f'compare_stage_seconds_count{{stage="{stage}"}}', text)
+        self.assertIn(
+            'http_requests_total{method="GET",path="/compare",status="200"} 1', text
+        )
+        self.assertIn(
+            'http_requests_total{method="GET",path="/compare",status="400"} 1', text
+        )
+        self.assertIn('compare_errors_total{type="FileNotFoundError"} 1', text)
+        self.assertIn('pdf_cache_events_total{event="bypasses"}', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
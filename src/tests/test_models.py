@@ -1,7 +1,7 @@
 import unittest
 from csv import DictReader
 
-from src.models import Company
+from src.models import Company, CompareOptions
 
 
 class TestCompany(unittest.TestCase):
@@ -120,6 +120,60 @@ class TestCompany(unittest.TestCase):
         self.assertEqual(company.ceo, "Unknown")
         self.assertEqual(company.number_of_employees, 0)
 
+    def test_from_csv_matches_constructor(self):
+        """
+        Test the fast path builds the same Company as the validating constructor.
+        """
+        company = Company.from_csv(self.parsed_csv_data)
+        self.assertEqual(company, Company(csv_data=self.parsed_csv_data))
+        self.assertEqual(
+            company.compare(Company(csv_data=self.parsed_csv_data)),
+            Company(csv_data=self.parsed_csv_data).compare(
+                Company(csv_data=self.parsed_csv_data)
+            ),
+        )
+
+    def test_from_csv_invalid_value(self):
+        """
+        Test the fast path rejects values the model wouldn't accept.
+        """
+        self.parsed_csv_data["P/E Ratio"] = "25.5"
+        with self.assertRaises(ValueError):
+            Company(csv_data=self.parsed_csv_data)
+        with self.assertRaises(ValueError):
+            Company.from_csv(self.parsed_csv_data)
+
+    def test_from_csv_missing_required_field(self):
+        """
+        Test the fast path rejects data without a required field.
+        """
+        self.parsed_csv_data.pop("Location")
+        with self.assertRaises(ValueError):
+            Company.from_csv(self.parsed_csv_data)
+
+    def test_record_round_trip(self):
+        """
+        Test a Company can be stored as a record and rebuilt without validation.
+        """
+        company = Company(**self.company_data)
+        record = company.to_record()
+        self.assertIsInstance(record, tuple)
+        self.assertEqual(Company.from_record(record), company)
+
+    def test_validate_many(self):
+        """
+        Test validating a batch of rows, and that errors name the failing row.
+        """
+        rows = [self.parsed_csv_data, dict(self.parsed_csv_data, Industry="Retail")]
+        companies = Company.validate_many(rows)
+        self.assertEqual(
+            [company.industry for company in companies], ["Technology", "Retail"]
+        )
+
+        rows.append({"Company Name": "Broken"})
+        with self.assertRaisesRegex(ValueError, "Row 2 \\(Broken\\)"):
+            Company.validate_many(rows)
+
     def test_str(self):
         """
         Test the string representation of a Company object.
@@ -177,6 +231,40 @@ class TestCompany(unittest.TestCase):
                 },
             )
 
+    def test_compare_selected_fields(self):
+        """
+        Test comparing only some fields, and only the ones that don't match.
+        """
+        company_one = Company(**self.company_data)
+        self.company_data["debt_millions"] = 500
+        company_two = Company(**self.company_data)
+
+        comparison = company_one.compare(company_two, fields=["debt_millions", "ceo"])
+        self.assertEqual(list(comparison), ["debt_millions", "ceo"])
+        comparison = company_one.compare(company_two, only_mismatches=True)
+        self.assertEqual(
+            comparison, {"debt_millions": {"Current": 300, "New": 500, "Match": False}}
+        )
+        with self.assertRaises(ValueError):
+            company_one.compare(company_two, fields=["bogus"])
+
+    def test_compare_options_select(self):
+        """
+        Test narrowing down a comparison of every field gives the same as comparing
+        fewer fields.
+        """
+        company_one = Company(**self.company_data)
+        self.company_data["debt_millions"] = 500
+        company_two = Company(**self.company_data)
+
+        options = CompareOptions(fields=("debt_millions", "ceo"), only_mismatches=True)
+        self.assertEqual(
+            options.select(company_one.compare(company_two)),
+            options.compare(company_one, company_two),
+        )
+        with self.assertRaises(ValueError):
+            CompareOptions(fields=("bogus",))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+import random
+import unittest
+
+from src.name_index import NameIndex, _trigrams, compact_name
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.names = ["techcorp", "healthinc", "financellc", "retailco", "greenenergy"]
+        self.index = NameIndex(self.names)
+
+    def test_compact_name(self):
+        """
+        Test names compact to their lower-case letters and digits.
+        """
+        self.assertEqual(compact_name(" Finance LLC. "), "financellc")
+        self.assertEqual(compact_name("Health_Inc"), "healthinc")
+
+    def test_best_match(self):
+        """
+        Test resolving differently written and misspelt names.
+        """
+        self.assertEqual(self.index.best_match("Finance LLC"), "financellc")
+        self.assertEqual(self.index.best_match("GreenEnergyy"), "greenenergy")
+        self.assertIsNone(self.index.best_match("Invalid Company"))
+        self.assertIsNone(self.index.best_match("..."))
+
+    def test_top_k(self):
+        """
+        Test candidates are ranked by similarity and limited to k.
+        """
+        index = NameIndex(self.names, threshold=0.1)
+        matches = index.top_k("healthco", k=2)
+        self.assertEqual([match.name for match in matches], ["healthinc", "techcorp"])
+        self.assertGreater(matches[0].score, matches[1].score)
+        # Ties keep the order the names were indexed in
+        matches = index.top_k("healthco")
+        self.assertEqual(matches[1:], [("techcorp", 0.125), ("retailco", 0.125)])
+
+    def test_same_as_full_scan(self):
+        """
+        Test the candidates read from the postings are the ones a scan would find.
+        """
+        rng = random.Random(0)
+        names = [f"company{i}" for i in range(500)]
+        queries = ["company12", "compani123", "company 4990"]
+        for name in rng.sample(names, 50):
+            i = rng.randrange(len(name))
+            queries.append(name[:i] + rng.choice("aoy7") + name[i + 1 :])
+        index = NameIndex(names, threshold=0.75)
+        for query in queries:
+            grams = _trigrams(compact_name(query))
+            expected = [name for name in names if _dice(grams, _trigrams(name)) >= 0.75]
+            found = [match.name for match in index.top_k(query, k=len(names))]
+            self.assertEqual(sorted(found), sorted(expected))
+
+    def test_remove_name_sharing_a_key(self):
+        """
+        Test removing one of the names that compact alike leaves the others matched.
+        """
+        index = NameIndex(["finance llc", "financellc", "healthinc"])
+        self.assertEqual(index.best_match("Finance-LLC"), "finance llc")
+        index.remove("finance llc")
+        self.assertEqual(index.best_match("Finance-LLC"), "financellc")
+        self.assertEqual(index.top_k("FinanceLLC2")[0].name, "financellc")
+        index.remove("financellc")
+        self.assertIsNone(index.best_match("Finance-LLC"))
+        self.assertEqual(index.top_k("FinanceLLC2"), [])
+        index.add("finance, llc")
+        self.assertEqual(index.best_match("FinanceLLC2"), "finance, llc")
+
+    def test_copy_is_independent(self):
+        """
+        Test changing a copy leaves the original as it was, and the other way round.
+        """
+        copy = self.index.copy()
+        copy.remove("healthinc")
+        copy.add("healthco")
+        self.index.add("retailcorp")
+        self.assertEqual(self.index.best_match("HealthIncc"), "healthinc")
+        self.assertIsNone(self.index.best_match("healthco"))
+        self.assertEqual(copy.best_match("HealthIncc"), None)
+        self.assertEqual(copy.best_match("healthco"), "healthco")
+        self.assertIsNone(copy.best_match("retailcorp"))
+        self.assertEqual(self.index.top_k("retailcorpp")[0].name, "retailcorp")
+        self.assertEqual((len(self.index), len(copy)), (6, 5))
+
+    def test_invalid_threshold(self):
+        """
+        Test a threshold outside (0, 1] is refused.
+        """
+        with self.assertRaises(ValueError):
+            NameIndex([], threshold=0)
+
+
+def _dice(a, b):
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+if __name__ == "__main__":
+    unittest.main()
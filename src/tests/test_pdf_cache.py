@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from src.pdf_cache import CachedPdfService
+
+
+class CountingPdfService:
+    """
+    A stand-in PDF service that records which files it was asked to extract.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def extract(self, file_path: str):
+        self.calls.append(file_path)
+        with open(file_path) as f:
+            return {"Company Name": f.read()}
+
+
+class TestCachedPdfService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = CountingPdfService()
+        self.cache = CachedPdfService(self.service, max_entries=2)
+
+    def write_pdf(self, name: str, content: str) -> str:
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_repeat_extraction_is_served_from_memory(self):
+        """
+        Test the second extraction of a file doesn't reach the service.
+        """
+        path = self.write_pdf("a.pdf", "HealthInc")
+        self.assertEqual(self.cache.extract(path), {"Company Name": "HealthInc"})
+        self.assertEqual(self.cache.extract(path), {"Company Name": "HealthInc"})
+        self.assertEqual(self.service.calls, [path])
+        self.assertEqual(self.cache.cache_stats()["hits"], 1)
+        self.assertEqual(self.cache.cache_stats()["misses"], 1)
+
+    def test_keyed_on_content_not_path(self):
+        """
+        Test a copy of a file under another path is a hit, and a changed file is a miss.
+        """
+        first = self.write_pdf("a.pdf", "HealthInc")
+        copy = self.write_pdf("b.pdf", "HealthInc")
+        self.cache.extract(first)
+        self.cache.extract(copy)
+        self.assertEqual(self.service.calls, [first])
+
+        self.write_pdf("a.pdf", "RetailCo")
+        self.assertEqual(self.cache.extract(first), {"Company Name": "RetailCo"})
+        self.assertEqual(self.service.calls, [first, first])
+
+    def test_lru_eviction(self):
+        """
+        Test the least recently used entry is evicted once the cache is full.
+        """
+        paths = [self.write_pdf(f"{i}.pdf", str(i)) for i in range(3)]
+        for path in paths:
+            self.cache.extract(path)
+        self.assertEqual(self.cache.cache_stats()["evictions"], 1)
+        self.cache.extract(paths[0])
+        self.assertEqual(self.service.calls, paths + [paths[0]])
+
+    def test_disk_tier_survives_restart(self):
+        """
+        Test a new cache pointed at the same directory reuses earlier results.
+        """
+        cache_dir = os.path.join(self.tmp.name, "cache")
+        path = self.write_pdf("a.pdf", "HealthInc")
+        CachedPdfService(self.service, cache_dir=cache_dir).extract(path)
+
+        restarted = CachedPdfService(self.service, cache_dir=cache_dir)
+        self.assertEqual(restarted.extract(path), {"Company Name": "HealthInc"})
+        self.assertEqual(self.service.calls, [path])
+        self.assertEqual(restarted.cache_stats()["disk_hits"], 1)
+
+    def test_unreadable_file_goes_to_service(self):
+        """
+        Test files that can't be hashed are passed through and errors propagate.
+        """
+        missing = os.path.join(self.tmp.name, "missing.pdf")
+        with self.assertRaises(FileNotFoundError):
+            self.cache.extract(missing)
+        self.assertEqual(self.service.calls, [missing])
+        self.assertEqual(self.cache.cache_stats()["bypasses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
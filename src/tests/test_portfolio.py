@@ -0,0 +1,79 @@
+import unittest
+
+from src.database import DatabaseClient
+from src.models import Company
+from src.pdf_service import PdfService
+from src.portfolio import PortfolioComparison, Tolerance
+
+
+class TestPortfolioComparison(unittest.TestCase):
+    def setUp(self):
+        self.db_client = DatabaseClient("data/database.csv")
+        pdf_service = PdfService("TEST_KEY")
+        self.extracted = [
+            pdf_service.extract(f"/home/coderpad/data/{pdf}.pdf")
+            for pdf in ("healthinc", "retailco", "financellc")
+        ]
+        self.portfolio = PortfolioComparison(self.db_client.data, self.extracted)
+
+    def test_matches_company_compare(self):
+        """
+        Test each company's comparison is the same as comparing Company objects.
+        """
+        for record in self.extracted:
+            name = record["Company Name"]
+            expected = Company(self.db_client.get_by_company_name(name)).compare(
+                Company(csv_data=record)
+            )
+            self.assertDictEqual(self.portfolio.compare(name.lower()), expected)
+
+    def test_mismatch_counts(self):
+        """
+        Test mismatches are counted per field across the portfolio.
+        """
+        counts = self.portfolio.mismatch_counts()
+        self.assertEqual(len(self.portfolio), 3)
+        self.assertEqual(counts["company_name"], 0)
+        self.assertEqual(counts["location"], 3)
+        self.assertEqual(
+            self.portfolio.mismatched_companies("equity_millions"), ["HealthInc"]
+        )
+
+    def test_float_tolerance(self):
+        """
+        Test float fields match within the configured tolerance.
+        """
+        self.extracted[0]["ROE (Return on Equity) (%)"] = 13.3301
+        strict = PortfolioComparison(self.db_client.data, self.extracted)
+        self.assertFalse(strict.compare("HealthInc")["roe_percent"]["Match"])
+
+        tolerant = PortfolioComparison(
+            self.db_client.data,
+            self.extracted,
+            tolerances={"roe_percent": Tolerance(abs=0.001)},
+        )
+        self.assertTrue(tolerant.compare("HealthInc")["roe_percent"]["Match"])
+
+    def test_tolerance_on_non_float_field(self):
+        """
+        Test tolerances can only be set on float fields.
+        """
+        with self.assertRaises(ValueError):
+            PortfolioComparison(
+                self.db_client.data, [], tolerances={"location": Tolerance(abs=1)}
+            )
+
+    def test_missing_and_unknown_companies(self):
+        """
+        Test extracted records without a database row are reported, not compared.
+        """
+        portfolio = PortfolioComparison(
+            self.db_client.data, self.extracted + [{"Company Name": "Nobody"}]
+        )
+        self.assertEqual(portfolio.missing, ["Nobody"])
+        with self.assertRaises(LookupError):
+            portfolio.compare("Nobody")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.database import DatabaseClient
+from src.main import app, get_db_client, get_pdf_service, get_response_cache
+from src.pdf_service import PdfService
+from src.profiling import ProfilingMiddleware
+from src.response_cache import ResponseCache
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        app.dependency_overrides.clear()
+        app.dependency_overrides[get_db_client] = lambda: DatabaseClient(
+            "data/database.csv"
+        )
+        app.dependency_overrides[get_pdf_service] = lambda: PdfService("TEST_KEY")
+        app.dependency_overrides[get_response_cache] = lambda: ResponseCache()
+        self.addCleanup(app.dependency_overrides.clear)
+        self.client = TestClient(app)
+        self.url = "/compare?company_name=HealthInc&pdf=healthinc"
+
+    def test_profiled_request(self):
+        """
+        Test a profiled request returns its result with its hottest functions.
+        """
+        expected = self.client.get(self.url).json()
+        response = self.client.get(
+            f"{self.url}&profile=1", headers={"X-API-Key": "TEST_KEY"}
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["result"], expected)
+        functions = body["profile"]["functions"]
+        self.assertTrue(0 < len(functions) <= 25)
+        self.assertGreater(body["profile"]["total_seconds"], 0)
+        self.assertEqual(
+            sorted(functions, key=lambda f: f["self_seconds"], reverse=True),
+            functions,
+        )
+        self.assertEqual(
+            set(functions[0]),
+            {
+                "function",
+                "file",
+                "line",
+                "calls",
+                "self_seconds",
+                "cumulative_seconds",
+            },
+        )
+
+    def test_errors_are_profiled(self):
+        """
+        Test a failing request is profiled with its error.
+        """
+        response = self.client.get(
+            "/compare?company_name=invalid&pdf=healthinc&profile=1",
+            headers={"X-API-Key": "TEST_KEY"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("detail", response.json()["result"])
+        self.assertIn("profile", response.json())
+
+    def test_needs_api_key(self):
+        """
+        Test profiling is refused without the right API key.
+        """
+        response = self.client.get(f"{self.url}&profile=1")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(
+            f"{self.url}&profile=1", headers={"X-API-Key": "WRONG"}
+        )
+        self.assertEqual(response.status_code, 403)
+        # Keys that aren't ASCII or UTF-8 are refused rather than failing
+        for key in ["TEST_KEYé".encode(), b"\xff\xfe"]:
+            response = self.client.get(
+                f"{self.url}&profile=1", headers={"X-API-Key": key}
+            )
+            self.assertEqual(response.status_code, 403)
+
+    def test_off_without_api_key(self):
+        """
+        Test profiling is off when the service has no API key, even for requests
+        sending an empty one.
+        """
+        inner = FastAPI()
+        inner.get("/")(lambda: {})
+        response = TestClient(ProfilingMiddleware(inner, api_key="")).get(
+            "/?profile=1", headers={"X-API-Key": ""}
+        )
+        self.assertEqual(response.status_code, 403)
+        response = TestClient(ProfilingMiddleware(inner, api_key="KEY")).get(
+            "/?profile=1", headers={"X-API-Key": "KEY"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("profile", response.json())
+
+    def test_off_by_default(self):
+        """
+        Test requests without profile=1 are served as usual.
+        """
+        for url in (self.url, f"{self.url}&profile=0"):
+            response = self.client.get(url, headers={"X-API-Key": "TEST_KEY"})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("profile", response.json())
+
+
+if __name__ == "__main__":
+    unittest.main()
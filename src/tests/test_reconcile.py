@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from src.history import HistoryStore
+from src.pdf_service import PdfService
+from src.reconcile import reconcile
+
+
+class LocalPdfService:
+    """
+    A stand-in PDF service that extracts the mock data for PDFs in any directory.
+    """
+
+    def __init__(self):
+        self.service = PdfService("TEST_KEY")
+
+    def extract(self, file_path: str):
+        return self.service.extract(
+            f"/home/coderpad/data/{os.path.basename(file_path)}"
+        )
+
+
+class TestReconcile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name in ("healthinc", "retailco", "financellc", "techcorp", "unknown"):
+            with open(os.path.join(self.tmp.name, f"{name}.pdf"), "wb") as f:
+                f.write(b"%PDF")
+        # Not a PDF, so not reconciled
+        open(os.path.join(self.tmp.name, "notes.txt"), "w").close()
+
+    def run_reconcile(self, output_format: str):
+        out = io.StringIO()
+        summary = reconcile(
+            self.tmp.name,
+            "data/database.csv",
+            out,
+            output_format=output_format,
+            workers=2,
+            pdf_service_factory=LocalPdfService,
+        )
+        return summary, out.getvalue()
+
+    def test_jsonl(self):
+        """
+        Test every PDF gets a JSON line and the summary counts mismatches per field.
+        """
+        summary, output = self.run_reconcile("jsonl")
+        lines = {line["pdf"]: line for line in map(json.loads, output.splitlines())}
+        self.assertEqual(
+            sorted(lines),
+            ["financellc", "healthinc", "retailco", "techcorp", "unknown"],
+        )
+        self.assertEqual(lines["healthinc"]["company_name"], "HealthInc")
+        self.assertIn("equity_millions", lines["healthinc"]["mismatched_fields"])
+        self.assertEqual(lines["unknown"]["error"], "No company found for PDF unknown")
+        self.assertEqual(
+            lines["techcorp"]["error"], "Cannot extract data. Invalid file provided."
+        )
+
+        self.assertEqual(summary["pdfs"], 5)
+        self.assertEqual(summary["errors"], 2)
+        self.assertEqual(summary["mismatches_by_field"]["location"], 3)
+        self.assertEqual(summary["mismatches_by_field"]["equity_millions"], 1)
+
+    def test_history(self):
+        """
+        Test the extracted data is kept in a history store for the quarter.
+        """
+        history_dir = os.path.join(self.tmp.name, "history")
+        reconcile(
+            self.tmp.name,
+            "data/database.csv",
+            io.StringIO(),
+            workers=2,
+            pdf_service_factory=LocalPdfService,
+            history_dir=history_dir,
+            quarter="2025Q1",
+        )
+        store = HistoryStore(history_dir)
+        self.assertEqual(store.quarters(), ["2025Q1"])
+        self.assertEqual(store.get("HealthInc", "2025Q1").equity_millions, 666)
+        self.assertIsNone(store.get("TechCorp", "2025Q1"))
+
+    def test_csv(self):
+        """
+        Test results can be written as CSV.
+        """
+        _, output = self.run_reconcile("csv")
+        rows = list(csv.DictReader(io.StringIO(output)))
+        self.assertEqual(len(rows), 5)
+        retailco = next(row for row in rows if row["pdf"] == "retailco")
+        self.assertEqual(retailco["company_name"], "RetailCo")
+        self.assertIn("location", retailco["mismatched_fields"].split(";"))
+        self.assertEqual(retailco["error"], "")
+
+
+if __name__ == "__main__":
+    unittest.main()
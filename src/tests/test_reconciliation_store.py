@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.database import DatabaseClient
+from src.pdf_service import PdfService
+from src.reconciliation_store import IncrementalReconciler, ReconciliationStore
+
+
+class LocalPdfService:
+    """
+    A stand-in PDF service that extracts the mock data for PDFs in any directory.
+    """
+
+    def __init__(self):
+        self.service = PdfService("TEST_KEY")
+        self.calls = 0
+
+    def extract(self, file_path: str):
+        self.calls += 1
+        return self.service.extract(
+            f"/home/coderpad/data/{os.path.basename(file_path)}"
+        )
+
+
+class TestIncrementalReconciler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.csv_file = os.path.join(self.tmp.name, "database.csv")
+        shutil.copy("data/database.csv", self.csv_file)
+        self.pdf_dir = self.tmp.name
+        self.write_pdf("healthinc", b"quarter one")
+        self.store = ReconciliationStore(os.path.join(self.tmp.name, "store.sqlite"))
+        self.addCleanup(self.store.close)
+        self.pdf_service = LocalPdfService()
+
+    def write_pdf(self, name: str, content: bytes) -> None:
+        with open(os.path.join(self.pdf_dir, f"{name}.pdf"), "wb") as f:
+            f.write(content)
+
+    def reconciler(self) -> IncrementalReconciler:
+        return IncrementalReconciler(
+            DatabaseClient(self.csv_file),
+            self.pdf_service,
+            self.store,
+            pdf_dir=self.pdf_dir,
+        )
+
+    def test_unchanged_inputs_are_reused(self):
+        """
+        Test a second run serves an unchanged company from the store.
+        """
+        first, reused = self.reconciler().reconcile("HealthInc", "healthinc")
+        self.assertFalse(reused)
+        second, reused = self.reconciler().reconcile("HealthInc", "healthinc")
+        self.assertTrue(reused)
+        self.assertEqual(second.result, first.result)
+        self.assertEqual(self.pdf_service.calls, 1)
+
+    def test_changed_pdf_is_recompared(self):
+        """
+        Test a company is compared again when its PDF's bytes change.
+        """
+        self.reconciler().reconcile("HealthInc", "healthinc")
+        self.write_pdf("healthinc", b"quarter two")
+        _, reused = self.reconciler().reconcile("HealthInc", "healthinc")
+        self.assertFalse(reused)
+        self.assertEqual(self.pdf_service.calls, 2)
+
+    def test_changed_row_is_recompared(self):
+        """
+        Test a company is compared again when its database row changes.
+        """
+        self.reconciler().reconcile("HealthInc", "healthinc")
+        with open(self.csv_file) as f:
+            content = f.read()
+        with open(self.csv_file, "w") as f:
+            f.write(
+                content.replace(
+                    "HealthInc,Healthcare,3000", "HealthInc,Healthcare,3100"
+                )
+            )
+        result, reused = self.reconciler().reconcile("HealthInc", "healthinc")
+        self.assertFalse(reused)
+        self.assertEqual(result.result["market_capitalization"]["Current"], 3100)
+
+    def test_errors_are_not_stored(self):
+        """
+        Test failed comparisons are reported and retried on the next run.
+        """
+        reconciler = self.reconciler()
+        result, _ = reconciler.reconcile("Nobody", "healthinc")
+        self.assertEqual(result.error, "Company Nobody not found in the database")
+        self.assertIsNone(self.store.get("Nobody", "healthinc"))
+
+        results = list(reconciler.run([("RetailCo", "invalid_pdf")]))
+        self.assertIsNotNone(results[0][0].error)
+        self.assertIsNone(self.store.get("RetailCo", "invalid_pdf"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+from src.database import DatabaseClient
+from src.main import app, get_db_client, get_pdf_service, get_response_cache
+from src.pdf_service import PdfService
+from src.response_cache import ResponseCache, etag_matches, make_etag
+
+
+class CountingPdfService:
+    """
+    A stand-in PDF service counting its extractions.
+    """
+
+    def __init__(self):
+        self.data = PdfService("TEST_KEY").extract("/home/coderpad/data/healthinc.pdf")
+        self.calls = 0
+
+    def extract(self, file_path: str):
+        self.calls += 1
+        return dict(self.data)
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_lru(self):
+        """
+        Test the least recently used response is evicted past the limit.
+        """
+        cache = ResponseCache(max_entries=2)
+        cache.put('"a"', b"a")
+        cache.put('"b"', b"b")
+        self.assertEqual(cache.get('"a"'), b"a")
+        cache.put('"c"', b"c")
+        self.assertIsNone(cache.get('"b"'))
+        self.assertEqual(cache.get('"a"'), b"a")
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_etag_matches(self):
+        """
+        Test If-None-Match lists, weak validators and the wildcard.
+        """
+        etag = make_etag("healthinc", "1-2", "abc")
+        self.assertNotEqual(etag, make_etag("healthinc", "1-3", "abc"))
+        self.assertTrue(etag_matches(etag, etag))
+        self.assertTrue(etag_matches(f'"other", W/{etag}', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches('"other"', etag))
+        self.assertFalse(etag_matches(None, etag))
+
+
+class TestCompareETags(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_client = DatabaseClient("data/database.csv")
+        self.pdf_service = CountingPdfService()
+        self.response_cache = ResponseCache()
+        app.dependency_overrides.clear()
+        app.dependency_overrides[get_db_client] = lambda: self.db_client
+        app.dependency_overrides[get_pdf_service] = lambda: self.pdf_service
+        app.dependency_overrides[get_response_cache] = lambda: self.response_cache
+        self.addCleanup(app.dependency_overrides.clear)
+        self.client = TestClient(app)
+        self.url = "/compare?company_name=HealthInc&pdf=healthinc"
+
+    def test_not_modified(self):
+        """
+        Test a request with the current ETag gets a 304 without a body.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_cached_response(self):
+        """
+        Test a repeat request is served from the response cache.
+        """
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(self.response_cache.hits, 1)
+
+    def test_changed_pdf(self):
+        """
+        Test a PDF with different data gets a new ETag and a new comparison.
+        """
+        first = self.client.get(self.url)
+        self.pdf_service.data["Market Capitalization"] += 500
+        second = self.client.get(
+            self.url, headers={"If-None-Match": first.headers["ETag"]}
+        )
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.headers["ETag"], first.headers["ETag"])
+        self.assertFalse(second.json()["market_capitalization"]["Match"])
+
+    def test_changed_database(self):
+        """
+        Test a new version of the database gets a new ETag.
+        """
+        csv_file = os.path.join(self.tmp.name, "database.csv")
+        shutil.copy("data/database.csv", csv_file)
+        self.db_client = DatabaseClient(csv_file)
+        first = self.client.get(self.url)
+        with open(csv_file, "a") as f:
+            f.write("NewCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+        self.assertTrue(self.db_client.reload())
+        second = self.client.get(
+            self.url, headers={"If-None-Match": first.headers["ETag"]}
+        )
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.headers["ETag"], first.headers["ETag"])
+
+    def test_error_not_cached(self):
+        """
+        Test errors get no ETag.
+        """
+        response = self.client.get("/compare?company_name=Nobody&pdf=healthinc")
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn("ETag", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
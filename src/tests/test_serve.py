@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from src.database import DatabaseClient
+from src.serve import prepare_snapshot, shared_snapshot_path, watch_snapshot
+from src.snapshot import Snapshot
+
+
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.csv_file = os.path.join(self.tmp.name, "database.csv")
+        shutil.copy("data/database.csv", self.csv_file)
+        self.snapshot_file = shared_snapshot_path(self.csv_file, self.tmp.name)
+
+    def test_snapshot_path_per_csv(self):
+        """
+        Test each CSV file gets its own shared snapshot.
+        """
+        other = shared_snapshot_path(
+            os.path.join(self.tmp.name, "other.csv"), self.tmp.name
+        )
+        self.assertEqual(os.path.dirname(self.snapshot_file), self.tmp.name)
+        self.assertNotEqual(self.snapshot_file, other)
+
+    def test_prepare_snapshot(self):
+        """
+        Test the snapshot is compiled once, and again only after the CSV changes.
+        """
+        self.assertTrue(prepare_snapshot(self.csv_file, self.snapshot_file))
+        self.assertFalse(prepare_snapshot(self.csv_file, self.snapshot_file))
+        with open(self.csv_file, "a") as f:
+            f.write("NewCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+        self.assertTrue(prepare_snapshot(self.csv_file, self.snapshot_file))
+        self.assertTrue(Snapshot(self.snapshot_file).is_fresh(self.csv_file))
+
+    def test_watch_skips_file_mid_rewrite(self):
+        """
+        Test the watcher keeps the last snapshot while the CSV is being rewritten,
+        and compiles the new one once it is written.
+        """
+        prepare_snapshot(self.csv_file, self.snapshot_file)
+        with open(self.csv_file) as f:
+            text = f.read()
+        stop = threading.Event()
+        thread = watch_snapshot(self.csv_file, self.snapshot_file, 0.01, stop)
+        self.addCleanup(thread.join)
+        self.addCleanup(stop.set)
+
+        with open(self.csv_file, "w") as f:
+            f.write(text[:10])
+            f.flush()
+            time.sleep(0.1)
+            snapshot = Snapshot(self.snapshot_file)
+            self.assertFalse(snapshot.is_fresh(self.csv_file))
+            self.assertEqual(snapshot[0]["Company Name"], "TechCorp")
+            f.write(text[10:])
+            f.write("NewCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+        deadline = time.monotonic() + 5
+        while not Snapshot(self.snapshot_file).is_fresh(self.csv_file):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        client = DatabaseClient(self.csv_file, snapshot_file=self.snapshot_file)
+        self.assertIsInstance(client.data, Snapshot)
+        self.assertEqual(client.get_by_company_name("NewCo")["Location"], "Leeds")
+
+    def test_workers_share_the_snapshot(self):
+        """
+        Test clients attached to the shared snapshot answer lookups like one that
+        parsed the CSV.
+        """
+        prepare_snapshot(self.csv_file, self.snapshot_file)
+        csv_client = DatabaseClient(self.csv_file)
+        workers = [
+            DatabaseClient(self.csv_file, snapshot_file=self.snapshot_file)
+            for _ in range(2)
+        ]
+        for worker in workers:
+            self.assertIsInstance(worker.data, Snapshot)
+            for name in ("HealthInc", " healthinc ", "Finance LLC"):
+                self.assertEqual(
+                    worker.get_company(name, fuzzy=True),
+                    csv_client.get_company(name, fuzzy=True),
+                )
+            self.assertEqual(
+                worker.resolve("TechCorps"), csv_client.resolve("TechCorps")
+            )
+            with self.assertRaises(LookupError):
+                worker.get_by_company_name("invalid")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.database import DatabaseClient, normalize_company_name
+from src.models import Company
+from src.snapshot import Snapshot, compile_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.csv_file = os.path.join(self.tmp.name, "database.csv")
+        shutil.copy("data/database.csv", self.csv_file)
+        self.snapshot_file = os.path.join(self.tmp.name, "database.snap")
+        compile_snapshot(self.csv_file, self.snapshot_file)
+        self.csv_client = DatabaseClient(self.csv_file)
+
+    def test_rows_match_csv(self):
+        """
+        Test rows read from a snapshot hold the CSV's text, and lookups return the
+        same data as the CSV-backed client.
+        """
+        with open(self.csv_file, "a") as f:
+            f.write("OddCo,Tech,3000,01,1,1,1,1,1,1,1,1,25.0,1,1,1,.5,Leeds\n")
+            f.write("ShortCo,Tech,1,1\n")
+        compile_snapshot(self.csv_file, self.snapshot_file)
+        csv_client = DatabaseClient(self.csv_file)
+        client = DatabaseClient(self.csv_file, snapshot_file=self.snapshot_file)
+        self.assertIsInstance(client.data, Snapshot)
+        self.assertEqual(list(client), list(csv_client))
+        for name in ["HealthInc", "OddCo", "ShortCo"]:
+            self.assertEqual(
+                client.get_by_company_name(name), csv_client.get_by_company_name(name)
+            )
+        self.assertEqual(client.get_company("OddCo"), csv_client.get_company("OddCo"))
+
+    def test_typed_rows(self):
+        """
+        Test typed rows hold typed values for Company fields.
+        """
+        snapshot = Snapshot(self.snapshot_file)
+        row = snapshot.typed_row(snapshot.find("healthinc"))
+        self.assertEqual(row["Company Name"], "HealthInc")
+        self.assertEqual(row["Market Capitalization"], 3000)
+        self.assertEqual(row["ROE (Return on Equity) (%)"], 13.33)
+        # Columns without a Company field stay as strings
+        self.assertEqual(row["Net Income Margin (%)"], "8")
+
+    def test_same_companies_as_csv(self):
+        """
+        Test every row builds the same Company as the CSV-backed client.
+        """
+        client = DatabaseClient(self.csv_file, snapshot_file=self.snapshot_file)
+        self.assertEqual(len(client.data), len(self.csv_client.data))
+        for csv_row, snapshot_row in zip(self.csv_client, client):
+            self.assertEqual(Company(csv_row), Company(snapshot_row))
+
+    def test_find_every_company(self):
+        """
+        Test every company is found at its row, and the first row of a duplicated
+        name is the one found.
+        """
+        with open(self.csv_file, "a") as f:
+            f.write("HealthInc,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+        compile_snapshot(self.csv_file, self.snapshot_file)
+        snapshot = Snapshot(self.snapshot_file)
+        for i, row in enumerate(self.csv_client):
+            self.assertEqual(
+                snapshot.find(normalize_company_name(row["Company Name"])), i
+            )
+        self.assertIsNone(snapshot.find("invalid"))
+
+    def test_unknown_company(self):
+        """
+        Test getting a company that isn't in the snapshot.
+        """
+        client = DatabaseClient(self.csv_file, snapshot_file=self.snapshot_file)
+        with self.assertRaises(LookupError):
+            client.get_by_company_name("invalid")
+
+    def test_stale_snapshot_falls_back_to_csv(self):
+        """
+        Test a snapshot is ignored once the CSV has changed.
+        """
+        with open(self.csv_file, "a") as f:
+            f.write("NewCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+        self.assertFalse(Snapshot(self.snapshot_file).is_fresh(self.csv_file))
+        client = DatabaseClient(self.csv_file, snapshot_file=self.snapshot_file)
+        self.assertEqual(client.get_by_company_name("NewCo")["Location"], "Leeds")
+
+    def test_missing_snapshot_falls_back_to_csv(self):
+        """
+        Test the CSV is loaded when there is no snapshot file.
+        """
+        client = DatabaseClient(
+            self.csv_file, snapshot_file=os.path.join(self.tmp.name, "missing.snap")
+        )
+        self.assertEqual(client.data, self.csv_client.data)
+
+    def test_reload_waits_for_snapshot(self):
+        """
+        Test a client reading a snapshot reloads once the snapshot is recompiled,
+        rather than parsing the changed CSV itself.
+        """
+        client = DatabaseClient(self.csv_file, snapshot_file=self.snapshot_file)
+        with open(self.csv_file, "a") as f:
+            f.write("NewCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+        self.assertFalse(client.reload())
+        with self.assertRaises(LookupError):
+            client.get_by_company_name("NewCo")
+
+        compile_snapshot(self.csv_file, self.snapshot_file)
+        self.assertTrue(client.reload())
+        self.assertEqual(client.get_by_company_name("NewCo")["Location"], "Leeds")
+        self.assertIsInstance(client.data, Snapshot)
+
+    def test_file_without_company_names_not_compiled(self):
+        """
+        Test an empty or truncated CSV, e.g. one being rewritten, isn't compiled.
+        """
+        for text in ["", "Company Na"]:
+            with open(self.csv_file, "w") as f:
+                f.write(text)
+            with self.assertRaises(ValueError):
+                compile_snapshot(self.csv_file, self.snapshot_file)
+        self.assertEqual(len(Snapshot(self.snapshot_file)), len(self.csv_client.data))
+
+    def test_file_changed_while_compiling(self):
+        """
+        Test a CSV written to while it was being read isn't compiled.
+        """
+        csv_file = self.csv_file
+
+        class AppendingReader(csv.DictReader):
+            def __next__(self):
+                try:
+                    return super().__next__()
+                except StopIteration:
+                    with open(csv_file, "a") as f:
+                        f.write("NewCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+                    raise
+
+        os.remove(self.snapshot_file)
+        with mock.patch.object(csv, "DictReader", AppendingReader):
+            with self.assertRaises(ValueError):
+                compile_snapshot(self.csv_file, self.snapshot_file)
+        self.assertFalse(os.path.exists(self.snapshot_file))
+
+    def test_invalid_values_match_csv(self):
+        """
+        Test empty and invalid values compile, and only fail lookups of their own
+        company, as on the CSV.
+        """
+        with open(self.csv_file, "a") as f:
+            f.write("BadCo,Tech,lots,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+            f.write("EmptyCo,Tech,1,1,1,1,1,1,1,1,1,1,1,1,1,,0.1,Leeds\n")
+        compile_snapshot(self.csv_file, self.snapshot_file)
+        csv_client = DatabaseClient(self.csv_file)
+        client = DatabaseClient(self.csv_file, snapshot_file=self.snapshot_file)
+        self.assertIsInstance(client.data, Snapshot)
+
+        self.assertEqual(
+            client.get_by_company_name("BadCo")["Market Capitalization"], "lots"
+        )
+        self.assertEqual(client.get_by_company_name("EmptyCo")["Current Ratio"], "")
+        for name in ["BadCo", "EmptyCo"]:
+            with self.assertRaises(ValueError) as csv_error:
+                csv_client.get_company(name)
+            with self.assertRaises(ValueError) as snapshot_error:
+                client.get_company(name)
+            self.assertEqual(str(snapshot_error.exception), str(csv_error.exception))
+        self.assertEqual(
+            client.get_company("HealthInc"), csv_client.get_company("HealthInc")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from src.database import DatabaseClient
+from src.main import app, get_db_client, get_pdf_service, get_response_cache
+from src.pdf_service import PdfService
+from src.response_cache import ResponseCache
+from src.sqlite_database import SqliteDatabaseClient, import_csv
+
+
+class TestSqliteDatabaseClient(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_file = os.path.join(self.tmp.name, "database.sqlite")
+        self.count = import_csv("data/database.csv", self.db_file)
+        self.client = SqliteDatabaseClient(self.db_file, pool_size=2)
+        self.addCleanup(self.client.close)
+        self.csv_client = DatabaseClient("data/database.csv")
+
+    def test_import_every_row(self):
+        """
+        Test every row of the CSV is imported, in file order.
+        """
+        self.assertEqual(self.count, len(self.csv_client.data))
+        self.assertEqual(list(self.client), list(self.csv_client))
+
+    def test_same_lookups_as_csv(self):
+        """
+        Test lookups return the same data and Company as the CSV-backed client.
+        """
+        for name in ["HealthInc", "  financellc ", "RETAILCO"]:
+            self.assertEqual(
+                self.client.get_by_company_name(name),
+                self.csv_client.get_by_company_name(name),
+            )
+            self.assertEqual(
+                self.client.get_company(name), self.csv_client.get_company(name)
+            )
+
+    def test_same_fuzzy_matches_as_csv(self):
+        """
+        Test names not on file are only matched when asked, as by the CSV-backed
+        client, and resolve to the same companies.
+        """
+        for name in ["Health Inc", "FinanceLLC2", "TechCorps"]:
+            with self.assertRaises(LookupError):
+                self.client.get_company(name)
+            self.assertEqual(
+                self.client.get_company(name, fuzzy=True),
+                self.csv_client.get_company(name, fuzzy=True),
+            )
+            self.assertEqual(self.client.resolve(name), self.csv_client.resolve(name))
+
+    def test_unknown_company(self):
+        """
+        Test getting a company that isn't in the database.
+        """
+        with self.assertRaises(LookupError):
+            self.client.get_by_company_name("invalid")
+        with self.assertRaises(LookupError):
+            self.client.get_company("invalid")
+
+    def test_invalid_row(self):
+        """
+        Test a row that doesn't validate raises a ValueError when asked for.
+        """
+        csv_file = os.path.join(self.tmp.name, "invalid.csv")
+        with open("data/database.csv") as f:
+            header = f.readline()
+        with open(csv_file, "w") as f:
+            f.write(header)
+            f.write("BadCo,Tech,lots,1,1,1,1,1,1,1,1,1,1,1,1,1,0.1,Leeds\n")
+        import_csv(csv_file, self.db_file)
+        client = SqliteDatabaseClient(self.db_file, pool_size=1)
+        self.addCleanup(client.close)
+        self.assertEqual(client.get_by_company_name("BadCo")["Location"], "Leeds")
+        with self.assertRaises(ValueError):
+            client.get_company("BadCo")
+
+    def test_concurrent_lookups(self):
+        """
+        Test lookups from more threads than pooled connections.
+        """
+        names = ["HealthInc", "FinanceLLC", "RetailCo"] * 20
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            rows = list(pool.map(self.client.get_by_company_name, names))
+        self.assertEqual([row["Company Name"] for row in rows], names)
+
+    def test_concurrent_iterations(self):
+        """
+        Test as many threads as pooled connections can each look up every company
+        while iterating, and an abandoned iteration gives its connection back.
+        """
+
+        names = []
+
+        def reconcile_all():
+            names.append(
+                [
+                    self.client.get_company(row["Company Name"]).company_name
+                    for row in self.client
+                ]
+            )
+
+        abandoned = iter(self.client)
+        next(abandoned)
+        # Daemon threads, so a deadlocked pool fails the test rather than hanging it
+        threads = [threading.Thread(target=reconcile_all, daemon=True) for _ in "ab"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+            self.assertFalse(thread.is_alive())
+        expected = [row["Company Name"] for row in self.csv_client]
+        self.assertEqual(names, [expected, expected])
+
+
+class TestSqliteApi(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        db_file = os.path.join(self.tmp.name, "database.sqlite")
+        import_csv("data/database.csv", db_file)
+        self.db_client = SqliteDatabaseClient(db_file, pool_size=1)
+        self.addCleanup(self.db_client.close)
+        app.dependency_overrides.clear()
+        app.dependency_overrides[get_db_client] = lambda: self.db_client
+        app.dependency_overrides[get_pdf_service] = lambda: PdfService("TEST_KEY")
+        app.dependency_overrides[get_response_cache] = lambda: ResponseCache()
+        self.addCleanup(app.dependency_overrides.clear)
+
+    def test_waiting_for_a_connection_doesnt_block_other_requests(self):
+        """
+        Test a /compare waiting for a pooled connection leaves the event loop free to
+        serve other requests.
+        """
+        responses = []
+        with TestClient(app) as client:
+            connection = self.db_client._pool.get()
+            # Given back regardless, so a blocked event loop fails the test, not hangs it
+            release = threading.Timer(2, self.db_client._pool.put, (connection,))
+            release.start()
+            waiting = threading.Thread(
+                target=lambda: responses.append(
+                    client.get("/compare?company_name=HealthInc&pdf=healthinc")
+                )
+            )
+            waiting.start()
+            time.sleep(0.2)
+            self.assertFalse(responses)
+            start = time.monotonic()
+            self.assertEqual(client.get("/").status_code, 200)
+            self.assertLess(time.monotonic() - start, 1)
+            release.cancel()
+            self.db_client._pool.put(connection)
+            waiting.join(timeout=10)
+        self.assertEqual(responses[0].status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+# Seconds importing src.main may take, FastAPI itself included
+IMPORT_BUDGET_SECONDS = 2.0
+# Modules only some requests or configurations need, so loaded on first use
+LAZY_MODULES = [
+    "numpy",
+    "sqlite3",
+    "cProfile",
+    "pstats",
+    "uvicorn",
+    "src.portfolio",
+    "src.snapshot",
+    "src.sqlite_database",
+]
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_budget(self):
+        """
+        Test importing the app stays within its time budget and leaves the modules
+        only some requests need unloaded.
+        """
+        code = (
+            "import json, sys, src.main; "
+            f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "API_KEY": "TEST_KEY"},
+            check=True,
+        )
+        self.assertEqual(json.loads(result.stdout), [])
+
+        # Lines read "import time: self [us] | cumulative | module"
+        cumulative = next(
+            int(line.split("|")[1])
+            for line in result.stderr.splitlines()
+            if line.split("|")[-1].strip() == "src.main"
+        )
+        self.assertLess(cumulative / 1e6, IMPORT_BUDGET_SECONDS)
+
+    def test_ready_after_warm_up(self):
+        """
+        Test /ready only answers once the lifespan has warmed the app up.
+        """
+        app.dependency_overrides.clear()
+        self.assertEqual(TestClient(app).get("/ready").status_code, 503)
+        with TestClient(app) as client:
+            response = client.get("/ready")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["status"], "ready")
+            self.assertIn("database", response.json()["warm_up_seconds"])
+        self.assertEqual(TestClient(app).get("/ready").status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import os
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+from src.database import DatabaseClient
+from src.main import app, get_db_client, get_pdf_service, get_response_cache
+from src.pdf_service import PdfService
+from src.response_cache import ResponseCache
+from src.summary import SUMMARY, SummaryAggregator
+
+
+class TestSummaryAggregator(unittest.TestCase):
+    def setUp(self):
+        self.db_client = DatabaseClient("data/database.csv")
+        self.summary = SummaryAggregator()
+
+    def company(self, name, **changes):
+        return self.db_client.get_company(name).model_copy(update=changes)
+
+    def test_mismatch_rates_and_deltas(self):
+        """
+        Test each field's mismatch count, rate and mean change.
+        """
+        self.summary.add(
+            self.company("HealthInc"),
+            self.company("HealthInc", equity_millions=700, location="Boston"),
+            "2025Q1",
+        )
+        self.summary.add(
+            self.company("RetailCo"),
+            self.company("RetailCo", equity_millions=300),
+            "2025Q1",
+        )
+        summary = self.summary.summary()
+        self.assertEqual(summary["companies"], 2)
+        equity = summary["fields"]["equity_millions"]
+        self.assertEqual(equity["mismatches"], 2)
+        self.assertEqual(equity["mismatch_rate"], 1.0)
+        self.assertEqual(equity["mean_delta"], 0.0)
+        self.assertEqual(equity["mean_abs_delta"], 100.0)
+        self.assertEqual(summary["fields"]["location"]["mismatch_rate"], 0.5)
+        self.assertNotIn("mean_delta", summary["fields"]["location"])
+        self.assertEqual(summary["fields"]["ceo"]["mismatches"], 0)
+
+    def test_company_counts_once(self):
+        """
+        Test comparing a company again replaces its last comparison.
+        """
+        current = self.company("HealthInc")
+        self.summary.add(current, self.company("HealthInc", ceo="A"), "2025Q1")
+        self.summary.add(current, current, "2025Q1")
+        summary = self.summary.summary()
+        self.assertEqual(summary["companies"], 1)
+        self.assertEqual(summary["fields"]["ceo"]["mismatches"], 0)
+
+    def test_quarters_and_reset(self):
+        """
+        Test each quarter is summarized on its own, and can be reset.
+        """
+        current = self.company("HealthInc")
+        self.summary.add(current, self.company("HealthInc", ceo="A"), "2025Q1")
+        self.summary.add(self.company("RetailCo"), self.company("RetailCo"), "2025Q2")
+        self.assertEqual(self.summary.quarters(), ["2025Q1", "2025Q2"])
+        self.assertEqual(self.summary.summary("2025Q1")["companies"], 1)
+        self.assertEqual(
+            self.summary.summary("2025Q2")["fields"]["ceo"]["mismatches"], 0
+        )
+        self.assertEqual(self.summary.summary()["companies"], 2)
+
+        self.summary.reset("2025Q1")
+        self.assertEqual(self.summary.quarters(), ["2025Q2"])
+        self.assertEqual(self.summary.summary("2025Q1")["companies"], 0)
+        self.summary.reset()
+        self.assertEqual(self.summary.summary()["companies"], 0)
+
+    def test_add_again(self):
+        """
+        Test a comparison added with a source can be added again after a reset,
+        and only the most recent sources are remembered.
+        """
+        summary = SummaryAggregator(max_sources=1)
+        current = self.db_client.get_company("HealthInc")
+        summary.add(current, current, "2025Q1", source="a")
+        summary.add(current, current, "2025Q2", source="b")
+        summary.reset()
+        self.assertFalse(summary.add_again("a"))
+        self.assertTrue(summary.add_again("b"))
+        self.assertEqual(summary.quarters(), ["2025Q2"])
+
+    def test_shared_summary(self):
+        """
+        Test aggregators sharing a file, like the workers of src.serve, count the
+        same comparisons and give the same summary as one kept in memory.
+        """
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_file = os.path.join(tmp.name, "summary.sqlite")
+        workers = [SummaryAggregator(), SummaryAggregator()]
+        for worker in workers:
+            worker.share(db_file)
+        comparisons = [
+            ("HealthInc", {"equity_millions": 700, "location": "Boston"}, "2025Q1"),
+            ("RetailCo", {"equity_millions": 300}, "2025Q1"),
+            ("HealthInc", {"ceo": "A"}, "2025Q1"),
+            ("TechCorp", {}, "2025Q2"),
+        ]
+        for i, (name, changes, quarter) in enumerate(comparisons):
+            current = self.company(name)
+            new = self.company(name, **changes)
+            workers[i % 2].add(current, new, quarter)
+            self.summary.add(current, new, quarter)
+        for worker in workers:
+            self.assertEqual(worker.quarters(), ["2025Q1", "2025Q2"])
+            for quarter in [None, "2025Q1", "2025Q2"]:
+                self.assertEqual(worker.summary(quarter), self.summary.summary(quarter))
+
+        workers[0].reset("2025Q1")
+        self.assertEqual(workers[1].quarters(), ["2025Q2"])
+        workers[1].reset()
+        self.assertEqual(workers[0].summary()["companies"], 0)
+
+
+class TestSummaryApi(unittest.TestCase):
+    def setUp(self):
+        app.dependency_overrides.clear()
+        app.dependency_overrides[get_db_client] = lambda: DatabaseClient(
+            "data/database.csv"
+        )
+        app.dependency_overrides[get_pdf_service] = lambda: PdfService("TEST_KEY")
+        app.dependency_overrides[get_response_cache] = lambda: ResponseCache()
+        self.addCleanup(app.dependency_overrides.clear)
+        SUMMARY.reset()
+        self.addCleanup(SUMMARY.reset)
+        self.client = TestClient(app)
+
+    def test_summary(self):
+        """
+        Test /summary reflects comparisons, whichever fields they returned, and can
+        be reset.
+        """
+        response = self.client.get(
+            "/compare?company_name=HealthInc&pdf=healthinc&quarter=2025Q1&fields=ceo"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        summary = self.client.get("/summary").json()
+        self.assertEqual(summary["companies"], 1)
+        self.assertEqual(summary["quarters"], ["2025Q1"])
+        self.assertEqual(summary["fields"]["equity_millions"]["mismatches"], 1)
+        self.assertEqual(summary["fields"]["equity_millions"]["mean_delta"], 66.0)
+        self.assertEqual(
+            self.client.get("/summary?quarter=2025q1").json()["companies"], 1
+        )
+
+        self.assertEqual(self.client.delete("/summary").status_code, 204)
+        self.assertEqual(self.client.get("/summary").json()["companies"], 0)
+
+    def test_responses_served_again_count(self):
+        """
+        Test comparisons answered from the response cache or with a 304 count
+        towards the summary after it is reset.
+        """
+        url = "/compare?company_name=HealthInc&pdf=healthinc&quarter=2025Q1"
+        etag = self.client.get(url).headers["ETag"]
+
+        self.client.delete("/summary")
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get("/summary").json()["companies"], 1)
+
+        self.client.delete("/summary")
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        summary = self.client.get("/summary?quarter=2025Q1").json()
+        self.assertEqual(summary["companies"], 1)
+        self.assertEqual(summary["fields"]["equity_millions"]["mismatches"], 1)
+
+    def test_invalid_quarter(self):
+        """
+        Test an invalid quarter is rejected.
+        """
+        self.assertEqual(self.client.get("/summary?quarter=Q1").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()